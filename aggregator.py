@@ -0,0 +1,301 @@
+import bisect
+import gzip
+import json
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from rss_core import article_sort_key
+from refresh_scheduler import RefreshScheduler
+from text_search import matches
+
+
+# 每页默认 / 最多返回的文章数
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# 响应体超过该字节数且客户端支持时使用 gzip
+GZIP_MIN_BYTES = 1024
+
+
+class ArticleService:
+    """聚合服务的文章列表
+
+    在后台线程中用 RefreshScheduler 按各源的更新频率刷新，新文章合并进按时间降序的列表，
+    超出 weeks_limit 的文章在读取时移除。每篇文章加入时分配一个递增的序号，
+    客户端用上次响应的 cursor 作为 since 参数，只取之后新加入的文章。
+    列表每次变化 version 加一，作为响应的 ETag。
+    """
+
+    def __init__(self, fetcher, scheduler=None):
+        """
+        Args:
+            fetcher: RSSFetcher 实例
+            scheduler: RefreshScheduler 实例，默认按 fetcher 的配置创建
+        """
+        self.fetcher = fetcher
+        self.scheduler = scheduler if scheduler is not None else RefreshScheduler(fetcher)
+        # 服务实例标识，服务重启后序号从头开始，客户端据此重新全量同步
+        self.instance = uuid.uuid4().hex[:8]
+        self.cursor = 0
+        self.version = 0
+        self.updated_at = None
+        # 按时间降序的文章、排序键和加入序号，三者一一对应
+        self._articles = []
+        self._keys = []
+        self._seqs = []
+        self._links = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, articles):
+        """合并文章，已有的链接跳过
+
+        Returns:
+            int: 新加入的文章数
+        """
+        added = 0
+        with self._lock:
+            for article in articles:
+                if article['link'] in self._links:
+                    continue
+                key = article_sort_key(article)
+                index = bisect.bisect_right(self._keys, key)
+                self.cursor += 1
+                self._keys.insert(index, key)
+                self._articles.insert(index, article)
+                self._seqs.insert(index, self.cursor)
+                self._links.add(article['link'])
+                added += 1
+            if added:
+                self.version += 1
+                self.updated_at = time.time()
+        return added
+
+    def _prune(self):
+        """移除超出时间范围的文章（调用方持有锁）"""
+        cutoff = time.time() - self.fetcher.weeks_limit * 7 * 86400
+        index = bisect.bisect_right(self._keys, -cutoff)
+        if index < len(self._articles):
+            for article in self._articles[index:]:
+                self._links.discard(article['link'])
+            del self._articles[index:]
+            del self._keys[index:]
+            del self._seqs[index:]
+            self.version += 1
+
+    def etag(self, version=None):
+        """列表的 ETag，version 为 None 时取当前版本"""
+        if version is None:
+            with self._lock:
+                self._prune()
+                version = self.version
+        return f'W/"{self.instance}-{version}"'
+
+    def page(self, offset=0, limit=PAGE_SIZE, since=None, until=None, after=None, query=None):
+        """分页读取文章
+
+        Args:
+            offset: 跳过的文章数
+            limit: 最多返回的文章数
+            since: 只返回序号大于该值的文章（上次响应的 cursor）
+            until: 只返回序号不大于该值的文章；翻页时传入第一页的 cursor，
+                   翻页过程中新加入的文章不会让后面的页错位
+            after: 只返回发布时间不早于该时间戳（UTC 秒）的文章
+            query: 搜索词；启用文章库时在全部历史文章中搜索，否则在当前列表中筛选
+
+        Returns:
+            dict: 响应内容
+        """
+        with self._lock:
+            self._prune()
+            cursor = self.cursor
+            version = self.version
+            if query and self.fetcher.store:
+                items = None
+            else:
+                items = [
+                    article for article, seq in zip(self._articles, self._seqs)
+                    if (since is None or seq > since) and (until is None or seq <= until)
+                ]
+        if items is None:
+            # 文章库自带锁，不占用列表的锁
+            items = self.fetcher.search(query)
+        elif query:
+            items = [article for article in items if matches(article, query)]
+        if after is not None:
+            # 按时间降序，截断到第一篇早于 after 的文章
+            index = bisect.bisect_right([article_sort_key(article) for article in items], -after)
+            items = items[:index]
+
+        articles = items[offset:offset + limit]
+        more = offset + len(articles) < len(items)
+        return {
+            'articles': [dict(article) for article in articles],
+            'total': len(items),
+            'offset': offset,
+            'limit': limit,
+            'next_offset': offset + len(articles) if more else None,
+            'cursor': cursor,
+            'instance': self.instance,
+            'version': version,
+            'updated_at': self.updated_at,
+        }
+
+    def status(self):
+        """服务状态"""
+        with self._lock:
+            self._prune()
+            status = {
+                'instance': self.instance,
+                'articles': len(self._articles),
+                'cursor': self.cursor,
+                'version': self.version,
+                'updated_at': self.updated_at,
+            }
+        status['feeds'] = len(self.fetcher.rss_feeds)
+        status['next_refresh'] = self.scheduler.next_due()
+        metrics = self.fetcher.last_metrics
+        if metrics is not None:
+            status['last_refresh'] = {
+                'started_at': metrics.started_at,
+                'duration': metrics.duration,
+                'statuses': metrics.summary()['statuses'],
+            }
+        # 连续失败的源及其失败记录（failures / open_until / last_error），源恢复后移除
+        failed_feeds = {}
+        for feed_url in self.fetcher.rss_feeds:
+            info = self.fetcher.breaker.info(feed_url)
+            if info:
+                failed_feeds[feed_url] = info
+        status['failed_feeds'] = failed_feeds
+        return status
+
+    def start(self):
+        """启动后台刷新线程"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止后台刷新，中止进行中的刷新"""
+        self._stop.set()
+        self.fetcher.cancel()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.scheduler.save()
+
+    def _run(self):
+        # 先提供文章库中已有的文章，再完整刷新一次，之后按各源的刷新间隔获取；
+        # 某次刷新出错时只打印错误，后台刷新继续（见 RefreshScheduler.run）
+        try:
+            if self.fetcher.store:
+                self.add(self.fetcher.load_articles())
+            for feed_url, articles in self.fetcher.iter_articles():
+                if self.fetcher.feed_failed(feed_url):
+                    # 失败的源不改变刷新间隔，由调度器稍后重试（见 RefreshScheduler.defer_feed）
+                    self.scheduler.defer_feed(feed_url)
+                else:
+                    self.scheduler.update_feed(feed_url, articles)
+                    self.add(articles)
+                if self._stop.is_set():
+                    return
+        except Exception as e:
+            print(f"后台刷新出错: {str(e)}")
+        self.scheduler.save()
+        self.scheduler.run(self._stop, lambda feed_url, articles: self.add(articles))
+
+
+class AggregatorServer:
+    """聚合服务的 HTTP JSON 接口
+
+    GET /articles  按时间降序分页返回文章，参数：
+        limit / offset  分页（limit 默认 PAGE_SIZE，最大 MAX_PAGE_SIZE）
+        since           只返回上次响应的 cursor 之后新加入的文章
+        until           翻页时固定在第一页的 cursor
+        after           只返回该时间戳（UTC 秒）之后发布的文章
+        q               搜索标题、摘要和来源
+    GET /status    文章数、cursor、上次刷新的结果等
+
+    响应带 ETag，请求的 If-None-Match 与之相同时返回 304；客户端支持时用 gzip 压缩。
+    """
+
+    def __init__(self, service, host='127.0.0.1', port=8765):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def _make_handler(self):
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, data, etag=None):
+                body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Cache-Control', 'no-cache')
+                if etag:
+                    self.send_header('ETag', etag)
+                if len(body) > GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == '/status':
+                    self._send_json(200, service.status())
+                    return
+                if url.path != '/articles':
+                    self._send_json(404, {'error': f'未知的路径: {url.path}'})
+                    return
+
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    limit = min(max(int(params.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+                    offset = max(int(params.get('offset', 0)), 0)
+                    since = int(params['since']) if 'since' in params else None
+                    until = int(params['until']) if 'until' in params else None
+                    after = float(params['after']) if 'after' in params else None
+                except ValueError as e:
+                    self._send_json(400, {'error': f'参数错误: {str(e)}'})
+                    return
+
+                etag = service.etag()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                data = service.page(offset, limit, since, until, after, params.get('q'))
+                # 检查之后列表可能又有变化，以实际返回的版本为准
+                self._send_json(200, data, service.etag(data['version']))
+
+        return Handler
+
+    def start(self):
+        """在后台线程中开始监听，返回服务地址"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
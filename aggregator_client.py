@@ -0,0 +1,204 @@
+import threading
+from datetime import datetime, timedelta
+
+from article import Article
+from content_decoder import ACCEPT_ENCODING
+from rss_core import RSSFetcher, ArticlePager, article_sort_key
+
+
+# 同步时每页请求的文章数（不超过服务端的 MAX_PAGE_SIZE）
+SYNC_PAGE_SIZE = 1000
+
+
+def create_fetcher(config):
+    """按配置创建文章来源：server_url 非空时使用聚合服务，否则直接请求各 RSS 源"""
+    if config.get('server_url'):
+        return AggregatorClient(config)
+    return RSSFetcher(config)
+
+
+class AggregatorClient:
+    """聚合服务（aggregator.AggregatorServer）的客户端
+
+    提供终端和 GUI 用到的 RSSFetcher 接口（iter_articles、fetch_all_articles、search 等），
+    文章从聚合服务读取，不直接请求各 RSS 源。第一次同步时分页取回全部文章，
+    之后带上次的 cursor 只取新加入的文章，列表没有变化时服务返回 304。
+    """
+
+    def __init__(self, config):
+        """
+        Args:
+            config: 配置字典，server_url 为聚合服务地址
+        """
+        self.config = config
+        self.server_url = config['server_url'].rstrip('/')
+        # 在进度显示中聚合服务算作一个源
+        self.rss_feeds = [self.server_url]
+        self.weeks_limit = config.get('weeks_limit', 1)
+        self.max_articles = config.get('max_articles', 0)
+        self.max_workers = config.get('max_workers', 5)
+        self.request_timeout = config.get('request_timeout', 30)
+        self.connect_timeout = config.get('connect_timeout', 10)
+        self.store = None
+        self.late_feeds = []
+        self.metrics_file = ''
+        self.last_metrics = None
+        self.progress_callback = None
+        self._session = None
+        self._cancel_event = threading.Event()
+        # 已同步的文章（按时间降序）、服务实例、cursor 和 ETag
+        self._articles = []
+        self._instance = None
+        self._cursor = None
+        self._etag = None
+
+    @property
+    def searchable(self):
+        """聚合服务总是可以搜索"""
+        return True
+
+    @property
+    def session(self):
+        """HTTP 会话，第一次请求时才导入 requests 并创建"""
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+            self._session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        return self._session
+
+    def set_progress_callback(self, callback):
+        """设置进度回调函数，参数同 RSSFetcher.set_progress_callback"""
+        self.progress_callback = callback
+
+    def _update_progress(self, status, progress):
+        if self.progress_callback:
+            self.progress_callback(self.server_url, status, progress)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+    def cancel(self):
+        """停止同步，已取回的页面保留"""
+        self._cancel_event.set()
+
+    def _cutoff(self):
+        return (datetime.now() - timedelta(weeks=self.weeks_limit)).timestamp()
+
+    def _get(self, params, headers=None, deadline=None):
+        """请求 /articles
+
+        Returns:
+            tuple: (响应内容, ETag)，服务返回 304 时响应内容为 None
+        """
+        read_timeout = self.request_timeout if deadline is None else min(self.request_timeout, deadline)
+        response = self.session.get(
+            f'{self.server_url}/articles', params=params, headers=headers,
+            timeout=(self.connect_timeout, read_timeout)
+        )
+        if response.status_code == 304:
+            return None, response.headers.get('ETag')
+        response.raise_for_status()
+        return response.json(), response.headers.get('ETag')
+
+    def _sync(self, deadline=None):
+        """从聚合服务取回新文章，合并到已同步的列表"""
+        params = {'limit': SYNC_PAGE_SIZE, 'after': self._cutoff()}
+        headers = {}
+        if self._cursor is not None:
+            params['since'] = self._cursor
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+        page, etag = self._get(params, headers, deadline)
+        if page is None:
+            self._articles = [article for article in self._articles if (article['timestamp'] or 0) >= params['after']]
+            return self._articles
+        if page['instance'] != self._instance and self._cursor is not None:
+            # 服务已重启，序号重新开始，改为全量同步
+            self._instance = None
+            self._cursor = None
+            self._articles = []
+            return self._sync(deadline)
+
+        new_articles = page['articles']
+        cursor = page['cursor']
+        while page['next_offset'] is not None:
+            if self._cancel_event.is_set():
+                # 没有取完，下次仍从原来的 cursor 开始同步
+                self.late_feeds = [self.server_url]
+                break
+            page, _ = self._get(dict(params, offset=page['next_offset'], until=cursor), deadline=deadline)
+            new_articles.extend(page['articles'])
+
+        links = {article['link'] for article in self._articles}
+        articles = [article for article in self._articles if (article['timestamp'] or 0) >= params['after']]
+        articles.extend(Article.from_dict(article) for article in new_articles if article['link'] not in links)
+        articles.sort(key=article_sort_key)
+        self._articles = articles
+        if not self.late_feeds:
+            self._instance = page['instance']
+            self._cursor = cursor
+            self._etag = etag
+        return articles
+
+    def iter_articles(self, feed_urls=None, deadline=None):
+        """从聚合服务同步文章
+
+        Args:
+            feed_urls: 忽略，聚合服务按自己的订阅刷新
+            deadline: 同步的超时秒数
+
+        Yields:
+            tuple: (聚合服务地址, 时间范围内的全部文章)
+        """
+        from requests import RequestException
+
+        self._cancel_event = threading.Event()
+        self.late_feeds = []
+        self._update_progress('processing', 0)
+        try:
+            articles = self._sync(deadline)
+        except (RequestException, ValueError, KeyError) as e:
+            print(f"聚合服务请求错误 {self.server_url}: {str(e)}")
+            self._update_progress('error', 0)
+            return
+        self._update_progress('completed', 100)
+        yield self.server_url, list(articles)
+
+    def feed_failed(self, feed_url):
+        """同步失败时 iter_articles 不产出结果，产出的总是成功的同步
+
+        聚合服务中各个源的失败看不到，只能从服务的 GET /status 的 failed_feeds 查看。
+        """
+        return False
+
+    def fetch_all_articles(self, deadline=None, limit=None, offset=0):
+        """从聚合服务同步文章，按时间降序返回，limit / offset 同 RSSFetcher.fetch_all_articles"""
+        articles = []
+        for _, feed_articles in self.iter_articles(deadline=deadline):
+            articles.extend(feed_articles)
+        if limit is None:
+            limit = self.max_articles
+        return articles[offset:offset + limit] if limit else articles[offset:]
+
+    def load_articles(self, limit=None, offset=0):
+        """上次同步的文章，不访问网络"""
+        cutoff = self._cutoff()
+        articles = [article for article in self._articles if (article['timestamp'] or 0) >= cutoff]
+        return articles[offset:offset + limit] if limit else articles[offset:]
+
+    def pager(self, runs, page_size=None):
+        """分页浏览同步结果，参数同 RSSFetcher.pager"""
+        return ArticlePager.from_runs(runs, self.max_articles if page_size is None else page_size)
+
+    def search(self, query, limit=SYNC_PAGE_SIZE):
+        """在聚合服务中搜索文章（服务启用了文章库时包括历史文章）"""
+        from requests import RequestException
+
+        try:
+            page, _ = self._get({'q': query, 'limit': limit})
+        except (RequestException, ValueError) as e:
+            print(f"聚合服务请求错误 {self.server_url}: {str(e)}")
+            return []
+        return [Article.from_dict(article) for article in page['articles']] if page else []
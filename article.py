@@ -0,0 +1,77 @@
+import sys
+from collections.abc import Mapping
+
+
+# 字段名，按名称取值时用来判断键是否存在
+_FIELDS = frozenset(('guid', 'title', 'link', 'published', 'source', 'timestamp', 'summary'))
+
+
+class Article(Mapping):
+    """文章记录
+
+    用 __slots__ 保存字段，比同样内容的字典省内存（每篇文章省去一个哈希表），
+    来源名称经过 sys.intern，同一个源的文章共用一个字符串。
+    实现了只读的 Mapping 接口，article['title']、article.get('timestamp')、
+    dict(article)、json.dump(..., default=dict) 等原有按字典使用的写法不需要改动。
+
+    字段：guid、title、link、published、source、timestamp（UTC 秒，float，可能为 None）、summary
+
+    与字段相同的字典比较相等；和字典一样不可哈希（__hash__ 为 None），不能放进 set 或用作字典的键。
+    """
+
+    __slots__ = ('guid', 'title', 'link', 'published', 'source', 'timestamp', 'summary')
+
+    def __init__(self, guid='', title='', link='', published='', source='', timestamp=None, summary=''):
+        self.guid = guid
+        self.title = title
+        self.link = link
+        self.published = published
+        self.source = sys.intern(source)
+        self.timestamp = None if timestamp is None else float(timestamp)
+        self.summary = summary
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典（缓存文件、旧代码）创建，缺少的字段取默认值"""
+        if isinstance(data, cls):
+            return data
+        return cls(
+            data.get('guid') or data.get('link', ''),
+            data.get('title', ''),
+            data.get('link', ''),
+            data.get('published', ''),
+            data.get('source', ''),
+            data.get('timestamp'),
+            data.get('summary', ''),
+        )
+
+    def __getitem__(self, key):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in _FIELDS
+
+    def __eq__(self, other):
+        if isinstance(other, Article):
+            return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        if isinstance(other, Mapping):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    # 字段可以修改，与字典一样不提供哈希
+    __hash__ = None
+
+    def __reduce__(self):
+        # pickle 后经 __init__ 重建，来源名称重新 intern
+        return (Article, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f'Article({self.title!r}, {self.link!r})'
@@ -0,0 +1,374 @@
+import sqlite3
+import threading
+import time
+
+from article import Article
+from dedup import DedupIndex
+from text_search import index_text, match_query
+
+
+# INSERT ... ON CONFLICT ... RETURNING 需要 SQLite 3.35，更早的版本逐行先查询再写入
+UPSERT_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _to_signed(value):
+    """64 位无符号整数转为 SQLite 能保存的有符号整数"""
+    return value - (1 << 64) if value is not None and value >= 1 << 63 else value
+
+
+def _to_unsigned(value):
+    return value & ((1 << 64) - 1) if value is not None else None
+
+
+class ArticleStore:
+    """本地文章库（SQLite）
+
+    按 (源, guid) 去重保存文章，guid 缺失时使用链接。刷新时只写入新文章或有变化的文章，
+    按时间范围查询走 timestamp 索引，超出 weeks_limit 的历史文章也会保留。
+    标题、摘要和来源写入 FTS5 全文索引（中文按二元组切分，见 text_search），
+    随文章写入增量更新；SQLite 不支持 FTS5 时搜索退回 LIKE 扫描。
+    跨源去重的键（规范化链接的哈希、标题 simhash，见 dedup.DedupIndex）随文章保存，
+    其他源已经保存了同一链接的文章不会再写入，重新启动后用 dedup_entries 恢复去重索引。
+    写入使用 SQLite 3.35 起支持的 UPSERT ... RETURNING，更早的版本退回先查询再写入（较慢）。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY,
+            feed_url TEXT NOT NULL,
+            guid TEXT NOT NULL,
+            title TEXT NOT NULL,
+            link TEXT NOT NULL,
+            published TEXT NOT NULL,
+            source TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            fetched_at REAL NOT NULL,
+            summary TEXT NOT NULL DEFAULT '',
+            link_key INTEGER,
+            simhash INTEGER,
+            title_numbers TEXT NOT NULL DEFAULT '',
+            UNIQUE (feed_url, guid)
+        );
+        CREATE INDEX IF NOT EXISTS idx_articles_timestamp ON articles (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_articles_feed ON articles (feed_url, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_articles_link ON articles (link);
+    """
+
+    # 全文索引，rowid 与 articles.id 相同，tokens 为 text_search.index_text 的结果
+    FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(tokens)"
+
+    # 去重键的索引，旧数据库在补上 link_key 列之后才能创建
+    KEY_INDEX = "CREATE INDEX IF NOT EXISTS idx_articles_link_key ON articles (link_key)"
+
+    # 数据库结构版本（PRAGMA user_version）
+    VERSION = 2
+
+    def __init__(self, path='articles.db'):
+        """
+        初始化文章库
+
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        self.upsert_returning = UPSERT_RETURNING
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+        try:
+            self._conn.execute(self.FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._migrate()
+        self._conn.execute(self.KEY_INDEX)
+        self._conn.commit()
+
+    def _migrate(self):
+        """升级旧版本的数据库
+
+        版本 1：补上摘要列，为已有文章建立全文索引。
+        版本 2：补上去重键的列，为已有文章计算去重键，并删除之前已经保存的跨源重复文章
+        （按写入顺序，先写入的源是所有者）。
+        """
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= self.VERSION:
+            return
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(articles)')}
+        if 'summary' not in columns:
+            self._conn.execute("ALTER TABLE articles ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+        for column, definition in (
+            ('link_key', 'INTEGER'), ('simhash', 'INTEGER'), ('title_numbers', "TEXT NOT NULL DEFAULT ''")
+        ):
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE articles ADD COLUMN {column} {definition}')
+        if version < 1 and self.fts:
+            rows = self._conn.execute('SELECT id, title, summary, source FROM articles').fetchall()
+            self._conn.execute('DELETE FROM articles_fts')
+            self._conn.executemany(
+                'INSERT INTO articles_fts (rowid, tokens) VALUES (?, ?)',
+                [
+                    (row_id, index_text({'title': title, 'summary': summary, 'source': source}))
+                    for row_id, title, summary, source in rows
+                ]
+            )
+        if version < 2:
+            self._migrate_dedup_keys()
+        self._conn.execute(f'PRAGMA user_version = {self.VERSION}')
+
+    def _migrate_dedup_keys(self):
+        """为已有文章计算去重键，删除其他源已经保存过的同一篇文章"""
+        rows = self._conn.execute('SELECT id, feed_url, title, link, timestamp FROM articles ORDER BY id').fetchall()
+        index = DedupIndex(max(len(rows), 1))
+        updates = []
+        duplicates = []
+        for row_id, feed_url, title, link, timestamp in rows:
+            kept, keys = index.filter_with_keys(feed_url, [{'title': title, 'link': link, 'timestamp': timestamp}])
+            if not kept:
+                duplicates.append((row_id,))
+                continue
+            link_key, simhash, numbers = keys[0]
+            updates.append((_to_signed(link_key), _to_signed(simhash), ' '.join(numbers), row_id))
+        self._conn.executemany(
+            'UPDATE articles SET link_key = ?, simhash = ?, title_numbers = ? WHERE id = ?', updates
+        )
+        if duplicates:
+            self._conn.executemany('DELETE FROM articles WHERE id = ?', duplicates)
+            if self.fts:
+                self._conn.executemany('DELETE FROM articles_fts WHERE rowid = ?', duplicates)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, feed_url, articles, keys=None):
+        """写入某个源的文章
+
+        已存在且内容未变化的文章不会产生写入，新增或更新的文章同时更新全文索引。
+        带去重键时，其他源已经保存了同一链接（规范化后）的文章不写入。
+
+        Args:
+            feed_url: RSS 源 URL
+            articles: 文章列表（带 timestamp 字段）
+            keys: 各文章的去重键 [(链接哈希, simhash, 数字), ...]（DedupIndex.filter_with_keys 的结果），
+                  None 表示未启用去重
+
+        Returns:
+            int: 新增或更新的文章数
+        """
+        now = time.time()
+        if keys is None:
+            keys = [(None, None, ())] * len(articles)
+        rows = [
+            (
+                feed_url,
+                article.get('guid') or article.get('link', ''),
+                article.get('title', ''),
+                article.get('link', ''),
+                article.get('published', ''),
+                article.get('source', ''),
+                article['timestamp'],
+                now,
+                article.get('summary', ''),
+                _to_signed(link_key),
+                _to_signed(simhash),
+                ' '.join(numbers),
+                _to_signed(link_key),
+                feed_url,
+            )
+            for article, (link_key, simhash, numbers) in zip(articles, keys)
+        ]
+        with self._lock:
+            changed = []
+            for row in rows:
+                if not self.upsert_returning:
+                    changed.extend(self._upsert_row(row))
+                    continue
+                # RETURNING 只返回真正插入或更新的行；其他源已有同一链接时不插入
+                changed.extend(self._conn.execute(
+                    """
+                    INSERT INTO articles (
+                        feed_url, guid, title, link, published, source, timestamp, fetched_at, summary,
+                        link_key, simhash, title_numbers
+                    )
+                    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                    WHERE NOT EXISTS (SELECT 1 FROM articles WHERE link_key = ? AND feed_url != ?)
+                    ON CONFLICT (feed_url, guid) DO UPDATE SET
+                        title = excluded.title,
+                        link = excluded.link,
+                        published = excluded.published,
+                        timestamp = excluded.timestamp,
+                        summary = excluded.summary,
+                        link_key = excluded.link_key,
+                        simhash = excluded.simhash,
+                        title_numbers = excluded.title_numbers
+                    WHERE title != excluded.title
+                       OR link != excluded.link
+                       OR published != excluded.published
+                       OR timestamp != excluded.timestamp
+                       OR summary != excluded.summary
+                       OR link_key IS NOT excluded.link_key
+                    RETURNING id, title, summary, source
+                    """,
+                    row,
+                ).fetchall())
+            if self.fts and changed:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO articles_fts (rowid, tokens) VALUES (?, ?)',
+                    [
+                        (row_id, index_text({'title': title, 'summary': summary, 'source': source}))
+                        for row_id, title, summary, source in changed
+                    ]
+                )
+            self._conn.commit()
+            return len(changed)
+
+    def _upsert_row(self, row):
+        """不支持 RETURNING 时写入一篇文章，结果与 upsert 中的 UPSERT 语句相同
+
+        Returns:
+            list: 插入或更新的行 [(id, 标题, 摘要, 来源)]，没有写入时为空
+        """
+        (feed_url, guid, title, link, published, source, timestamp, fetched_at, summary,
+         link_key, simhash, numbers, _, _) = row
+        if link_key is not None and self._conn.execute(
+            'SELECT 1 FROM articles WHERE link_key = ? AND feed_url != ? LIMIT 1', (link_key, feed_url)
+        ).fetchone():
+            return []
+        existing = self._conn.execute(
+            """
+            SELECT id, title, link, published, source, timestamp, summary, link_key FROM articles
+            WHERE feed_url = ? AND guid = ?
+            """,
+            (feed_url, guid)
+        ).fetchone()
+        if existing is None:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO articles (
+                    feed_url, guid, title, link, published, source, timestamp, fetched_at, summary,
+                    link_key, simhash, title_numbers
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                row[:12]
+            )
+            return [(cursor.lastrowid, title, summary, source)]
+        row_id, old_title, old_link, old_published, old_source, old_timestamp, old_summary, old_key = existing
+        if (old_title, old_link, old_published, old_timestamp, old_summary, old_key) == (
+            title, link, published, timestamp, summary, link_key
+        ):
+            return []
+        self._conn.execute(
+            """
+            UPDATE articles SET title = ?, link = ?, published = ?, timestamp = ?, summary = ?,
+                link_key = ?, simhash = ?, title_numbers = ?
+            WHERE id = ?
+            """,
+            (title, link, published, timestamp, summary, link_key, simhash, numbers, row_id)
+        )
+        return [(row_id, title, summary, old_source)]
+
+    def dedup_entries(self, limit):
+        """最近写入的 limit 篇文章的去重键，用于重新启动后恢复 DedupIndex
+
+        Returns:
+            list: [(源, 链接哈希, simhash, 数字, 时间戳), ...]，按写入顺序
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT feed_url, link_key, simhash, title_numbers, timestamp FROM articles
+                WHERE link_key IS NOT NULL ORDER BY id DESC LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        return [
+            (feed_url, _to_unsigned(link_key), _to_unsigned(simhash), tuple(numbers.split()), timestamp)
+            for feed_url, link_key, simhash, numbers, timestamp in reversed(rows)
+        ]
+
+    def query(self, since=None, feed_urls=None, limit=None, offset=0):
+        """按时间降序查询文章
+
+        Args:
+            since: 只返回该时间戳（UTC 秒）之后的文章，None 表示不限制
+            feed_urls: 只返回这些源的文章，None 表示全部
+            limit: 最多返回的文章数
+            offset: 跳过最新的多少篇，与 limit 一起用于分页
+
+        Returns:
+            list: 文章列表
+        """
+        return self._select([], [], since, feed_urls, limit, offset)
+
+    def search(self, query, since=None, feed_urls=None, limit=None):
+        """全文搜索标题、摘要和来源，按时间降序返回
+
+        Args:
+            query: 搜索词，多个词以空格分隔，全部匹配才返回
+            since: 只返回该时间戳（UTC 秒）之后的文章，None 表示不限制
+            feed_urls: 只返回这些源的文章，None 表示全部
+            limit: 最多返回的文章数
+
+        Returns:
+            list: 文章列表
+        """
+        expression = match_query(query)
+        if expression is None:
+            return []
+        if self.fts:
+            return self._select(
+                ['id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)'], [expression],
+                since, feed_urls, limit
+            )
+        # 没有 FTS5 时逐行匹配
+        conditions = []
+        params = []
+        for term in query.split():
+            conditions.append("(title || ' ' || summary || ' ' || source) LIKE ?")
+            params.append(f'%{term}%')
+        return self._select(conditions, params, since, feed_urls, limit)
+
+    def _where(self, conditions, params, since, feed_urls):
+        """拼接 WHERE 子句
+
+        Returns:
+            tuple: (WHERE 子句, 参数)，feed_urls 为空列表时返回 (None, None)
+        """
+        conditions = list(conditions)
+        params = list(params)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if feed_urls is not None:
+            feed_urls = list(feed_urls)
+            if not feed_urls:
+                return None, None
+            conditions.append(f"feed_url IN ({','.join('?' * len(feed_urls))})")
+            params.extend(feed_urls)
+        return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
+
+    def _select(self, conditions, params, since, feed_urls, limit, offset=0):
+        where, params = self._where(conditions, params, since, feed_urls)
+        if where is None:
+            return []
+        sql = 'SELECT guid, title, link, published, source, timestamp, summary FROM articles' + where
+        sql += ' ORDER BY timestamp DESC'
+        if limit is not None or offset:
+            # LIMIT -1 表示不限制条数
+            sql += ' LIMIT ? OFFSET ?'
+            params += [-1 if limit is None else limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Article(*row) for row in rows]
+
+    def count(self, since=None, feed_urls=None):
+        """文章数，参数同 query"""
+        where, params = self._where([], [], since, feed_urls)
+        if where is None:
+            return 0
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM articles' + where, params).fetchone()[0]
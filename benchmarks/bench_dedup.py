@@ -0,0 +1,95 @@
+"""跨源去重基准：每篇文章的去重耗时随索引大小的变化，以及重复文章的识别率
+
+合成若干个源，其中一部分文章被其他源转载：链接换成 https、加上 www. 和 utm_* 参数，
+或者换成镜像站的链接并在标题末尾加一个词。按批次加入 DedupIndex，
+报告每批的平均耗时（索引达到上限后不再变大）、两类转载各自的识别率和误判数。
+
+用法：
+    python benchmarks/bench_dedup.py --articles 100000 --dup-rate 0.2
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article import Article  # noqa: E402
+from dedup import DedupIndex  # noqa: E402
+
+WORDS = (
+    'python release performance database kernel browser compiler network security cloud '
+    'storage update vulnerability framework benchmark server memory cache latency design'
+).split()
+
+
+def make_articles(count, feeds, dup_rate):
+    """生成 (源, 文章, 转载方式) 列表，dup_rate 的文章是之前某篇文章的转载
+
+    转载方式为 None（原创）、'链接变体' 或 '镜像改标题'
+    """
+    now = time.time()
+    originals = []
+    items = []
+    for i in range(count):
+        feed = f'feed{i % feeds}'
+        if originals and random.random() < dup_rate:
+            source_feed, original = random.choice(originals)
+            if source_feed == feed:
+                feed = f'feed{(i + 1) % feeds}'
+            if random.random() < 0.5:
+                link = original['link'].replace('http://', 'https://www.') + '?utm_source=rss'
+                title = original['title']
+                kind = '链接变体'
+            else:
+                link = f'http://mirror{i % 7}.example.org/{i}'
+                title = original['title'] + ' ' + random.choice(WORDS)
+                kind = '镜像改标题'
+            items.append((feed, Article(link, title, link, '', 'mirror', original['timestamp'] + 600), kind))
+            continue
+        title = ' '.join(random.sample(WORDS, 6)) + f' {i}'
+        link = f'http://{feed}.example.com/posts/{i}'
+        article = Article(link, title, link, '', feed, now - random.uniform(0, 7 * 86400))
+        originals.append((feed, article))
+        items.append((feed, article, None))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000, help='合成文章数')
+    parser.add_argument('--feeds', type=int, default=200, help='源数量')
+    parser.add_argument('--dup-rate', type=float, default=0.2, help='转载文章的比例')
+    parser.add_argument('--batches', type=int, default=5, help='分几批加入，报告每批的耗时')
+    parser.add_argument('--max-entries', type=int, default=50000, help='索引保存的文章数上限')
+    args = parser.parse_args()
+
+    random.seed(0)
+    items = make_articles(args.articles, args.feeds, args.dup_rate)
+    index = DedupIndex(args.max_entries)
+    batch_size = -(-len(items) // args.batches)
+    found = {}
+    totals = {}
+    false_positives = 0
+    print(f"{args.articles} 篇文章，{args.feeds} 个源，转载比例 {args.dup_rate:.0%}")
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        elapsed = 0.0
+        for feed, article, kind in batch:
+            begin = time.perf_counter()
+            kept = index.filter(feed, [article])
+            elapsed += time.perf_counter() - begin
+            if kind is None:
+                false_positives += not kept
+                continue
+            totals[kind] = totals.get(kind, 0) + 1
+            found[kind] = found.get(kind, 0) + (not kept)
+        print(f"第 {start // batch_size + 1} 批  索引 {len(index):>6} 篇  每篇 {elapsed / len(batch) * 1e6:>6.1f} µs")
+    for kind, total in totals.items():
+        print(f"{kind}：识别出 {found[kind]} / {total} 篇（{found[kind] / total:.1%}）")
+    print(f"原创文章误判为重复 {false_positives} 篇")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""线程池与 asyncio 抓取模式的扩展性对比
+
+用法：
+    python benchmarks/bench_fetch_scaling.py --sizes 10,100,1000,5000 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_core import RSSFetcher, load_aiohttp  # noqa: E402
+from feed_server import FeedServer  # noqa: E402
+
+
+def run_once(server, mode, feeds, args):
+    config = {
+        'rss_feeds': server.feed_urls(feeds),
+        'weeks_limit': 1,
+        'max_workers': args.workers,
+        'max_concurrency': args.concurrency,
+        'per_host_limit': args.per_host_limit,
+        'pool_maxsize': max(args.workers, 10),
+        'request_timeout': 30,
+        'cache_file': '',
+        'db_file': '',
+        'health_file': '',
+        'fetch_mode': mode,
+    }
+    fetcher = RSSFetcher(config)
+    try:
+        start = time.perf_counter()
+        articles = fetcher.fetch_all_articles()
+        elapsed = time.perf_counter() - start
+    finally:
+        # 关闭连接池，不同规模之间不共享连接
+        fetcher.close()
+    return elapsed, len(articles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,1000,5000', help='源数量列表，逗号分隔')
+    parser.add_argument('--latency', type=float, default=0.05, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--entries', type=int, default=20, help='每个源的条目数')
+    parser.add_argument('--workers', type=int, default=5, help='线程池模式的 max_workers')
+    parser.add_argument('--concurrency', type=int, default=100, help='asyncio 模式的 max_concurrency')
+    parser.add_argument('--per-host-limit', type=int, default=0,
+                        help='每个主机的最大并发数（所有合成源都在同一主机上，默认不限制）')
+    args = parser.parse_args()
+
+    modes = ['thread']
+    if load_aiohttp() is not None:
+        modes.append('async')
+    else:
+        print('未安装 aiohttp，只测试线程池模式')
+
+    with FeedServer(entries=args.entries, latency=args.latency) as server:
+        print(f"{'源数量':>8} {'模式':>8} {'耗时(秒)':>10} {'源/秒':>10} {'文章数':>8}")
+        for feeds in [int(n) for n in args.sizes.split(',')]:
+            for mode in modes:
+                elapsed, count = run_once(server, mode, feeds, args)
+                print(f"{feeds:>8} {mode:>8} {elapsed:>10.2f} {feeds / elapsed:>10.1f} {count:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""相对时间显示的单行开销：旧 format_time vs date_parser
+
+用法：
+    python benchmarks/bench_format_time.py --rows 2000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+import feedparser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from date_parser import parse_date, relative_labels  # noqa: E402
+from rss_core import format_time  # noqa: E402
+
+
+def legacy_format_time(published_str):
+    """旧实现：RFC 2822 失败时对日期字符串跑整个 feedparser"""
+    if not published_str:
+        return ""
+    published_time = None
+    try:
+        published_time = parsedate_to_datetime(published_str)
+    except Exception:
+        try:
+            parsed = feedparser.parse(published_str)
+            if parsed and isinstance(parsed, dict) and 'published_parsed' in parsed:
+                published_time = datetime(*parsed['published_parsed'][:6])
+        except Exception:
+            pass
+    if published_time is None and 'T' in published_str:
+        match = re.match(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', published_str)
+        if match:
+            published_time = datetime.fromisoformat(match.group(1))
+    if published_time:
+        if published_time.tzinfo:
+            now = datetime.now(published_time.tzinfo)
+        else:
+            now = datetime.now()
+        total_seconds = int((now - published_time).total_seconds())
+        days = total_seconds // 86400
+        if days >= 7:
+            return f"{days // 7}周前"
+        if days > 0:
+            return f"{days}天前"
+        return f"{total_seconds // 3600}小时前"
+    return published_str[:20]
+
+
+def make_dates(rows):
+    """生成混合格式的日期字符串：RFC 2822、ISO 8601、中文日期"""
+    now = time.time()
+    dates = []
+    for i in range(rows):
+        timestamp = now - i * 600
+        kind = i % 3
+        if kind == 0:
+            dates.append(formatdate(timestamp))
+        elif kind == 1:
+            dates.append(time.strftime('%Y-%m-%dT%H:%M:%S+08:00', time.localtime(timestamp)))
+        else:
+            local = time.localtime(timestamp)
+            dates.append(f"{local.tm_year}年{local.tm_mon}月{local.tm_mday}日 {local.tm_hour:02d}:{local.tm_min:02d}")
+    return dates
+
+
+def bench(label, func, rows):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000:>10.1f} ms {elapsed / rows * 1e6:>10.1f} us/行")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000, help='行数')
+    args = parser.parse_args()
+
+    dates = make_dates(args.rows)
+    rows = len(dates)
+
+    bench('旧 format_time', lambda: [legacy_format_time(d) for d in dates], rows)
+    parse_date.cache_clear()
+    bench('新 format_time（冷缓存）', lambda: [format_time(d) for d in dates], rows)
+    bench('新 format_time（重复显示）', lambda: [format_time(d) for d in dates], rows)
+    timestamps = [parse_date(d) for d in dates]
+    bench('relative_labels（时间戳批量）', lambda: relative_labels(timestamps), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""文章记录内存基准：字典 vs Article（__slots__ + intern 来源名称）
+
+模拟从文章库或缓存文件读出的文章（每行的来源字符串都是新对象），
+用 tracemalloc 测量常驻内存，并比较 get_domain 缓存前后 main.py 显示路径的耗时。
+
+用法：
+    python benchmarks/bench_memory.py --articles 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article import Article  # noqa: E402
+from rss_core import get_domain  # noqa: E402
+
+
+FIELDS = ('guid', 'title', 'link', 'published', 'source', 'timestamp', 'summary')
+
+
+def make_rows(count, summary_size):
+    """生成 count 行合成文章，字段顺序同 FIELDS"""
+    now = time.time()
+    return [
+        (
+            f'http://site{i % 100}.example.com/posts/{i}',
+            f'合成文章 {i}',
+            f'http://site{i % 100}.example.com/posts/{i}',
+            time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(now - i)),
+            # 与从 SQLite / JSON 读出时一样，每行都是新的字符串对象
+            ''.join(['site', str(i % 100), '.example.com']),
+            now - i,
+            '摘' * summary_size,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(label, build, rows):
+    """测量 build(rows) 结果常驻的内存（不含 rows 本身）"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    articles = build(rows)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {current / 1024 / 1024:>10.1f} MB {elapsed * 1000:>10.1f} ms")
+    return articles, current
+
+
+def legacy_get_domain(url):
+    """缓存之前的 get_domain"""
+    if not url.startswith(('http://', 'https://')):
+        parsed = urlparse('http://' + url)
+    else:
+        parsed = urlparse(url)
+    return parsed.netloc
+
+
+def bench_domains(articles, repeat):
+    def legacy():
+        for article in articles:
+            article.get('source', legacy_get_domain(article['link']))
+
+    def current():
+        for article in articles:
+            article.get('source') or get_domain(article['link'])
+
+    for label, func in (('get_domain 每行解析', legacy), ('get_domain 缓存', current)):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<28} {best * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000, help='合成文章数')
+    parser.add_argument('--summary-size', type=int, default=0, help='每篇摘要的字符数（两种记录相同，只影响总量）')
+    parser.add_argument('--repeat', type=int, default=3, help='get_domain 测试的重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    rows = make_rows(args.articles, args.summary_size)
+    print(f"{args.articles} 篇文章")
+    # 字段字符串由两种记录共享，只有来源名称在 Article 中被 intern，所以差值就是记录本身的开销
+    dicts, before = measure('字典', lambda rows: [dict(zip(FIELDS, row)) for row in rows], rows)
+    del dicts
+    articles, after = measure('Article', lambda rows: [Article(*row) for row in rows], rows)
+    print(f"每 10 万篇节省: {(before - after) / args.articles * 100000 / 1024 / 1024:.1f} MB")
+    bench_domains([dict(zip(FIELDS, row)) for row in rows], args.repeat)
+
+
+if __name__ == '__main__':
+    main()
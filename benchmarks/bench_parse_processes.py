@@ -0,0 +1,63 @@
+"""解析阶段的多核扩展性：线程内解析 vs 进程池解析
+
+用法：
+    python benchmarks/bench_parse_processes.py --feeds 200 --entries 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_core import RSSFetcher  # noqa: E402
+from feed_server import FeedServer  # noqa: E402
+
+
+def run_once(server, args, process_parse, parse_processes):
+    config = {
+        'rss_feeds': server.feed_urls(args.feeds),
+        'weeks_limit': 1,
+        'max_workers': args.workers,
+        'per_host_limit': 0,
+        'pool_maxsize': args.workers,
+        'cache_file': '',
+        'db_file': '',
+        'health_file': '',
+        'process_parse': process_parse,
+        'parse_processes': parse_processes,
+    }
+    fetcher = RSSFetcher(config)
+    if process_parse:
+        # 预先启动进程池，不把进程启动时间算进去
+        fetcher._get_parse_pool().submit(int).result()
+    start = time.perf_counter()
+    fetcher.fetch_all_articles()
+    elapsed = time.perf_counter() - start
+    fetcher.close()
+    return elapsed
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feeds', type=int, default=200, help='源数量')
+    parser.add_argument('--entries', type=int, default=200, help='每个源的条目数')
+    parser.add_argument('--workers', type=int, default=max(cpus * 2, 5), help='下载线程数')
+    args = parser.parse_args()
+
+    process_counts = sorted({n for n in (1, 2, 4, 8, 16, cpus) if n <= cpus})
+
+    with FeedServer(entries=args.entries) as server:
+        print(f"CPU 核数: {cpus}，{args.feeds} 个源 x {args.entries} 条目")
+        print(f"{'解析方式':<16} {'耗时(秒)':>10} {'源/秒':>10}")
+        elapsed = run_once(server, args, False, 0)
+        print(f"{'线程内':<16} {elapsed:>10.2f} {args.feeds / elapsed:>10.1f}")
+        for count in process_counts:
+            elapsed = run_once(server, args, True, count)
+            label = f'进程池 x{count}'
+            print(f"{label:<16} {elapsed:>10.2f} {args.feeds / elapsed:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
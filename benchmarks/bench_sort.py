@@ -0,0 +1,104 @@
+"""文章排序基准：按 published 字符串重新解析排序 vs 按 timestamp 字段排序，
+以及只取最新一页时 k 路归并各源 vs 全部排序
+
+用法：
+    python benchmarks/bench_sort.py --articles 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_core import article_sort_key, merge_newest  # noqa: E402
+
+
+def make_articles(count):
+    """生成 count 篇发布时间随机的合成文章"""
+    now = time.time()
+    articles = []
+    for i in range(count):
+        timestamp = now - random.uniform(0, 7 * 86400)
+        articles.append({
+            'title': f'合成文章 {i}',
+            'link': f'http://example.com/posts/{i}',
+            'published': formatdate(timestamp),
+            'source': f'site{i % 100}.example.com',
+            'timestamp': timestamp,
+        })
+    return articles
+
+
+def legacy_seconds_ago(article):
+    """旧的排序键：每次比较前重新解析 published 字符串"""
+    pub = article.get('published', '')
+    if not pub:
+        return float('inf')
+    try:
+        pub_time = parsedate_to_datetime(pub)
+        if hasattr(pub_time, 'tzinfo') and pub_time.tzinfo:
+            now = datetime.now(pub_time.tzinfo)
+        else:
+            now = datetime.now()
+        return (now - pub_time).total_seconds()
+    except Exception:
+        return float('inf')
+
+
+def bench(label, func, articles, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        data = list(articles)
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<36} {best * 1000:>10.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100000, help='合成文章数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最快一次）')
+    parser.add_argument('--feeds', type=int, default=200, help='k 路归并的源数量')
+    parser.add_argument('--page-size', type=int, default=50, help='k 路归并取的文章数')
+    args = parser.parse_args()
+
+    random.seed(0)
+    articles = make_articles(args.articles)
+    print(f"{args.articles} 篇文章")
+
+    def legacy(data):
+        # 旧流程：fetch_all_articles 和 main.py 各排序一次
+        data.sort(key=legacy_seconds_ago)
+        data.sort(key=legacy_seconds_ago)
+
+    def current(data):
+        data.sort(key=article_sort_key)
+
+    old = bench('重新解析字符串（排序两次）', legacy, articles, args.repeat)
+    new = bench('timestamp 字段（排序一次）', current, articles, args.repeat)
+    print(f"加速比: {old / new:.1f}x")
+
+    # 各源按时间降序（与源的实际顺序一致），取最新的一页
+    runs = [sorted(articles[i::args.feeds], key=article_sort_key) for i in range(args.feeds)]
+
+    def full_sort(data):
+        combined = [article for run in runs for article in run]
+        combined.sort(key=article_sort_key)
+        return combined[:args.page_size]
+
+    def top_page(data):
+        return merge_newest(runs, args.page_size)
+
+    old = bench(f'合并后全部排序（取前 {args.page_size} 篇）', full_sort, articles, args.repeat)
+    new = bench(f'{args.feeds} 路归并（取前 {args.page_size} 篇）', top_page, articles, args.repeat)
+    print(f"加速比: {old / new:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
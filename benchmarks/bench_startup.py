@@ -0,0 +1,201 @@
+"""启动时间基准：导入耗时与首屏时间
+
+每次测量都启动新的 Python 进程（冷启动，模块没有缓存在进程中），测量：
+    python -c pass       解释器本身的启动时间，作为基线
+    import main / gui    导入终端版和 GUI 版主程序
+    终端首屏             导入 main、读取配置和快照、输出第一页文章（不访问网络）
+    GUI 首屏             创建 RSSReaderGUI 并显示快照中的文章（需要图形环境，否则跳过）
+并检查导入主程序后没有加载 feedparser / requests / aiohttp / colorama 等较慢的依赖，
+列出 import main 中耗时最多的模块（python -X importtime）。
+
+首屏时间超过 --budget-ms 或较慢的依赖被提前导入时退出码为 1，可以放在 CI 中防止启动变慢。
+
+用法：
+    python benchmarks/bench_startup.py --feeds 50 --per-feed 40 --budget-ms 400
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from article import Article  # noqa: E402
+from snapshot import ArticleSnapshot  # noqa: E402
+
+
+# 启动时不应导入的模块（第一次刷新或打开对应功能时才导入）
+DEFERRED_MODULES = ('feedparser', 'requests', 'urllib3', 'aiohttp', 'colorama', 'asyncio', 'http.server')
+
+# 终端首屏：与 main.main() 相同的步骤，输出的文章列表丢弃
+TERMINAL_PAINT = '''
+import io, sys, time
+start = time.perf_counter()
+import main
+from rss_core import load_config
+from aggregator_client import create_fetcher
+from snapshot import ArticleSnapshot
+config = load_config()
+fetcher = create_fetcher(config)
+stdout, sys.stdout = sys.stdout, io.StringIO()
+runs = main.show_snapshot(ArticleSnapshot(config['snapshot_file']), fetcher, {page_size})
+sys.stdout = stdout
+print(time.perf_counter() - start, sum(len(run) for run in runs.values()))
+'''
+
+# GUI 首屏：创建窗口、显示快照并处理完界面事件（后台刷新的源地址不可达，不影响测量）
+GUI_PAINT = '''
+import time
+start = time.perf_counter()
+import tkinter as tk
+import gui
+root = tk.Tk()
+app = gui.RSSReaderGUI(root)
+root.update()
+while app.pending_articles:
+    app.insert_pending()
+root.update()
+print(time.perf_counter() - start, len(app.view_keys))
+root.destroy()
+'''
+
+# 导入后检查哪些较慢的依赖已经加载
+CHECK_DEFERRED = '''
+import sys
+import {module}
+print(','.join(name for name in {deferred!r} if name in sys.modules))
+'''
+
+
+def make_snapshot(path, feeds, per_feed):
+    """写入 feeds 个源、每个源 per_feed 篇文章的快照"""
+    now = time.time()
+    snapshot = ArticleSnapshot(path)
+    snapshot.load()
+    feed_urls = []
+    for feed in range(feeds):
+        feed_url = f'http://127.0.0.1:9/feed/{feed}.xml'
+        feed_urls.append(feed_url)
+        snapshot.update(feed_url, [
+            Article(
+                f'http://site{feed}.example.com/posts/{i}', f'合成文章 {feed}-{i}',
+                f'http://site{feed}.example.com/posts/{i}',
+                time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(now - i * 3600 - feed)),
+                f'site{feed}.example.com', now - i * 3600 - feed,
+            )
+            for i in range(per_feed)
+        ])
+    snapshot.save()
+    return feed_urls
+
+
+def run_python(args, workdir):
+    """在新进程中运行，返回 (耗时秒数, 标准输出)"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable] + args, cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    return time.perf_counter() - start, result.stdout.strip()
+
+
+def measure(label, args, workdir, repeat):
+    """重复 repeat 次取中位数，返回毫秒数和最后一次的输出"""
+    times = []
+    output = ''
+    for _ in range(repeat):
+        elapsed, output = run_python(args, workdir)
+        times.append(elapsed * 1000)
+    median = statistics.median(times)
+    print(f"{label:<24} {median:>10.1f} ms  (最快 {min(times):.1f} ms)")
+    return median, output
+
+
+def gui_available():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.destroy()
+        return True
+    except Exception as e:
+        print(f"跳过 GUI 首屏：{str(e)}")
+        return False
+
+
+def print_import_profile(workdir, top):
+    """按 python -X importtime 列出 import main 中累计耗时最多的模块"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=workdir, env=env,
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    print(f"\nimport main 累计耗时最多的 {top} 个模块：")
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:>8.1f} ms {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feeds', type=int, default=50, help='快照中的源数量')
+    parser.add_argument('--per-feed', type=int, default=40, help='快照中每个源的文章数')
+    parser.add_argument('--page-size', type=int, default=50, help='终端首屏显示的文章数')
+    parser.add_argument('--repeat', type=int, default=5, help='每项测量的重复次数（取中位数）')
+    parser.add_argument('--budget-ms', type=float, default=400, help='首屏时间上限（毫秒，含解释器启动）')
+    parser.add_argument('--top', type=int, default=10, help='列出耗时最多的模块数')
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        # 在临时目录中运行，不碰真实的配置、缓存和文章库；源地址不可达，GUI 的后台刷新会立即失败
+        feed_urls = make_snapshot(os.path.join(workdir, 'snapshot.json'), args.feeds, args.per_feed)
+        with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'rss_feeds': feed_urls, 'cache_file': '', 'db_file': '', 'health_file': '',
+                'snapshot_file': 'snapshot.json', 'max_articles': args.page_size,
+            }, f)
+        print(f"快照：{args.feeds} 个源，共 {args.feeds * args.per_feed} 篇文章\n")
+
+        measure('python -c pass', ['-c', 'pass'], workdir, args.repeat)
+        measure('import main', ['-c', 'import main'], workdir, args.repeat)
+        measure('import gui', ['-c', 'import gui'], workdir, args.repeat)
+        paint, output = measure(
+            '终端首屏', ['-c', TERMINAL_PAINT.format(page_size=args.page_size)], workdir, args.repeat
+        )
+        print(f"{'':<24} 进程内 {float(output.split()[0]) * 1000:.1f} ms，快照 {output.split()[1]} 篇")
+        paints = [('终端首屏', paint)]
+        if gui_available():
+            paint, output = measure('GUI 首屏', ['-c', GUI_PAINT], workdir, args.repeat)
+            print(f"{'':<24} 进程内 {float(output.split()[0]) * 1000:.1f} ms，列表 {output.split()[1]} 行")
+            paints.append(('GUI 首屏', paint))
+
+        print()
+        for module in ('main', 'gui'):
+            _, loaded = run_python(['-c', CHECK_DEFERRED.format(module=module, deferred=DEFERRED_MODULES)], workdir)
+            if loaded:
+                print(f"import {module} 提前导入了: {loaded}")
+                failed = True
+            else:
+                print(f"import {module} 没有导入 {', '.join(DEFERRED_MODULES)}")
+        for label, paint in paints:
+            if paint > args.budget_ms:
+                print(f"{label} {paint:.1f} ms 超出预算 {args.budget_ms:.0f} ms")
+                failed = True
+            else:
+                print(f"{label} {paint:.1f} ms，预算 {args.budget_ms:.0f} ms")
+
+        print_import_profile(workdir, args.top)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
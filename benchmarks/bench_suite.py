@@ -0,0 +1,268 @@
+"""综合基准：在本地合成源服务器上测试抓取、时间格式化、排序和 GUI 填充
+
+每项报告吞吐量、p50 / p99 延迟和峰值内存（tracemalloc，单独运行一遍测量，不影响计时）。
+用 --json 保存结果，用 --compare 与之前保存的结果对比，便于在不同提交之间比较。
+
+用法：
+    python benchmarks/bench_suite.py --feeds 200 --entries 50 --latency 0.02
+    python benchmarks/bench_suite.py --error-rate 0.05 --validators --json before.json
+    python benchmarks/bench_suite.py --compress --entry-size 2000
+    python benchmarks/bench_suite.py --compare before.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rss_core import RSSFetcher, format_time, article_sort_key, load_aiohttp  # noqa: E402
+from date_parser import parse_date  # noqa: E402
+from feed_server import FeedServer  # noqa: E402
+from bench_format_time import make_dates  # noqa: E402
+from bench_sort import make_articles  # noqa: E402
+
+
+def percentile(values, q):
+    """最近秩百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(len(ordered) * q / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+def measure(name, scenario, unit):
+    """运行场景两次：第一次计时，第二次在 tracemalloc 下测峰值内存
+
+    Args:
+        name: 场景名称
+        scenario: 无参函数，返回 (单次操作耗时列表, 操作数)
+        unit: 吞吐量单位
+    """
+    start = time.perf_counter()
+    latencies, ops = scenario()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        scenario()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'name': name,
+        'ops': ops,
+        'unit': unit,
+        'seconds': elapsed,
+        'throughput': ops / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_kb': peak / 1024,
+    }
+
+
+def fetch_scenario(server, args, mode, workdir, warm):
+    """RSSFetcher.fetch_all_articles；延迟为各源从发起请求到处理完成的耗时"""
+    cache_file = os.path.join(workdir, f'cache-{mode}.json') if warm else ''
+    config = {
+        'rss_feeds': server.feed_urls(args.feeds, args.format),
+        'weeks_limit': 1,
+        'max_workers': args.workers,
+        'max_concurrency': args.concurrency,
+        'per_host_limit': 0,
+        'pool_maxsize': max(args.workers, 10),
+        'cache_file': cache_file,
+        'db_file': '',
+        'health_file': '',
+        'fetch_mode': mode,
+        'stream_parse': args.stream_parse,
+    }
+
+    if warm:
+        # 先刷新一次填充缓存，计时的是之后带条件请求的刷新
+        fetcher = RSSFetcher(config)
+        fetcher.fetch_all_articles()
+        fetcher.close()
+
+    def scenario():
+        fetcher = RSSFetcher(config)
+        fetcher.fetch_all_articles()
+        latencies = [timing.duration for timing in fetcher.last_metrics.feeds() if timing.duration is not None]
+        fetcher.close()
+        return latencies, args.feeds
+
+    return scenario
+
+
+def format_time_scenario(rows):
+    dates = make_dates(rows)
+
+    def scenario():
+        parse_date.cache_clear()
+        latencies = []
+        for date in dates:
+            start = time.perf_counter()
+            format_time(date)
+            latencies.append(time.perf_counter() - start)
+        return latencies, len(dates)
+
+    return scenario
+
+
+def sort_scenario(count, repeat):
+    random.seed(0)
+    articles = make_articles(count)
+
+    def scenario():
+        latencies = []
+        for _ in range(repeat):
+            data = list(articles)
+            start = time.perf_counter()
+            data.sort(key=article_sort_key)
+            latencies.append(time.perf_counter() - start)
+        return latencies, count * repeat
+
+    return scenario
+
+
+def gui_scenario(count, batch_size, workdir):
+    """RSSReaderGUI.display_articles 按源分批填充文章列表；没有图形环境时返回 None"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.destroy()
+    except Exception as e:
+        print(f"跳过 GUI 填充：{str(e)}")
+        return None
+
+    import gui
+
+    random.seed(1)
+    articles = make_articles(count)
+    batches = [
+        sorted(articles[i:i + batch_size], key=article_sort_key)
+        for i in range(0, len(articles), batch_size)
+    ]
+    # RSSReaderGUI 从当前目录读取 config.json，在临时目录中运行，不碰真实的缓存和文章库
+    with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+        json.dump({'rss_feeds': [], 'cache_file': '', 'db_file': '', 'health_file': ''}, f)
+
+    def scenario():
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        root = tk.Tk()
+        root.withdraw()
+        try:
+            app = gui.RSSReaderGUI(root)
+            latencies = []
+            for index, batch in enumerate(batches):
+                start = time.perf_counter()
+                app.display_articles([(f'feed{index}', batch)])
+                # 分批插入：处理完这一批排队的行并刷新界面
+                while app.pending_articles:
+                    app.insert_pending()
+                root.update_idletasks()
+                latencies.append(time.perf_counter() - start)
+            return latencies, len(articles)
+        finally:
+            root.destroy()
+            os.chdir(cwd)
+
+    return scenario
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return ''
+
+
+def print_results(results):
+    print(f"{'场景':<28} {'操作数':>8} {'吞吐量':>14} {'p50(ms)':>10} {'p99(ms)':>10} {'峰值内存(KB)':>12}")
+    for result in results:
+        throughput = f"{result['throughput']:.1f} {result['unit']}"
+        print(f"{result['name']:<28} {result['ops']:>8} {throughput:>14} "
+              f"{result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f} {result['peak_kb']:>12.0f}")
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {result['name']: result for result in baseline['results']}
+    print(f"\n与 {baseline_path}（{baseline.get('commit') or '未知提交'}）对比：")
+    print(f"{'场景':<28} {'吞吐量':>10} {'p50':>10} {'p99':>10} {'峰值内存':>10}")
+    for result in results:
+        old = before.get(result['name'])
+        if not old:
+            continue
+
+        def ratio(key):
+            return f"{result[key] / old[key]:.2f}x" if old[key] else '-'
+
+        print(f"{result['name']:<28} {ratio('throughput'):>10} {ratio('p50_ms'):>10} "
+              f"{ratio('p99_ms'):>10} {ratio('peak_kb'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feeds', type=int, default=200, help='合成源数量')
+    parser.add_argument('--entries', type=int, default=50, help='每个源的条目数')
+    parser.add_argument('--entry-size', type=int, default=200, help='每个条目额外填充的字节数')
+    parser.add_argument('--format', choices=['rss', 'atom', 'mixed'], default='mixed', help='源格式')
+    parser.add_argument('--latency', type=float, default=0.02, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='服务器返回 500 的概率')
+    parser.add_argument('--validators', action='store_true', help='服务器支持 ETag / Last-Modified，并测试缓存命中的刷新')
+    parser.add_argument('--compress', action='store_true', help='服务器支持 gzip 压缩传输')
+    parser.add_argument('--stream-parse', action='store_true', help='开启流式解析')
+    parser.add_argument('--workers', type=int, default=10, help='线程池模式的 max_workers')
+    parser.add_argument('--concurrency', type=int, default=100, help='asyncio 模式的 max_concurrency')
+    parser.add_argument('--rows', type=int, default=5000, help='format_time 的行数')
+    parser.add_argument('--articles', type=int, default=100000, help='排序的文章数')
+    parser.add_argument('--gui-articles', type=int, default=5000, help='GUI 填充的文章数')
+    parser.add_argument('--json', metavar='FILE', help='把结果保存为 JSON')
+    parser.add_argument('--compare', metavar='FILE', help='与之前保存的 JSON 结果对比')
+    args = parser.parse_args()
+
+    modes = ['thread'] + (['async'] if load_aiohttp() is not None else [])
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        with FeedServer(
+            entries=args.entries, latency=args.latency, entry_size=args.entry_size,
+            error_rate=args.error_rate, validators=args.validators, compress=args.compress
+        ) as server:
+            for mode in modes:
+                results.append(measure(f'fetch/{mode}', fetch_scenario(server, args, mode, workdir, False), '源/秒'))
+                if args.validators:
+                    results.append(measure(
+                        f'fetch/{mode}/warm', fetch_scenario(server, args, mode, workdir, True), '源/秒'
+                    ))
+            print(f"服务器：{server.requests} 个请求，{server.errors} 个 500，{server.not_modified} 个 304，"
+                  f"发送 {server.bytes_sent / 1024:.0f} KB")
+
+        results.append(measure('format_time', format_time_scenario(args.rows), '行/秒'))
+        results.append(measure('sort', sort_scenario(args.articles, 5), '篇/秒'))
+        scenario = gui_scenario(args.gui_articles, args.entries, workdir)
+        if scenario is not None:
+            results.append(measure('gui/display_articles', scenario, '篇/秒'))
+
+    print_results(results)
+    if args.compare:
+        print_comparison(results, args.compare)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'commit': git_commit(), 'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存到 {args.json}")
+
+
+if __name__ == '__main__':
+    main()
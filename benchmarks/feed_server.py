@@ -0,0 +1,215 @@
+"""本地合成 RSS / Atom 源服务器，供基准测试使用（无需外网）"""
+import gzip
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def _padding(size):
+    """条目摘要的填充文本，用于控制响应体大小"""
+    return 'x' * max(size, 0)
+
+
+def make_rss(entries=20, interval=3600, entry_size=0, feed=0):
+    """生成 RSS 2.0 内容
+
+    Args:
+        entries: 条目数
+        interval: 相邻条目的发布时间间隔（秒）
+        entry_size: 每个条目摘要额外填充的字节数
+        feed: 源编号，条目的链接（site{feed}.example.com）和标题各不相同，不会被当作重复文章
+    """
+    now = time.time()
+    padding = _padding(entry_size)
+    site = f'site{feed}.example.com'
+    items = []
+    for i in range(entries):
+        items.append(
+            f"<item><title>合成文章 {feed}-{i}</title>"
+            f"<link>http://{site}/posts/{i}</link>"
+            f"<guid>http://{site}/posts/{i}</guid>"
+            f"<pubDate>{formatdate(now - i * interval)}</pubDate>"
+            f"<description>正文摘要 {i}{padding}</description></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel><title>合成源</title>'
+        f'<link>http://{site}/</link>'
+        + ''.join(items) +
+        '</channel></rss>'
+    ).encode('utf-8')
+
+
+def make_atom(entries=20, interval=3600, entry_size=0, feed=0):
+    """生成 Atom 内容，参数同 make_rss"""
+    now = time.time()
+    padding = _padding(entry_size)
+    site = f'site{feed}.example.com'
+    items = []
+    for i in range(entries):
+        updated = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now - i * interval))
+        items.append(
+            f"<entry><title>合成文章 {feed}-{i}</title>"
+            f'<link href="http://{site}/atom/{i}"/>'
+            f"<id>http://{site}/atom/{i}</id>"
+            f"<updated>{updated}</updated>"
+            f"<summary>正文摘要 {i}{padding}</summary></entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>合成源</title>'
+        f'<id>http://{site}/</id>'
+        + ''.join(items) +
+        '</feed>'
+    ).encode('utf-8')
+
+
+class FeedServer:
+    """在后台线程中运行的合成 RSS / Atom 源服务器
+
+    以 .atom 结尾的路径返回 Atom，其他路径返回 RSS 2.0。每个路径的条目链接使用不同的主机名
+    （/feed/3.xml 对应 site3.example.com）和标题，各源的文章互不重复；响应体按路径第一次请求时生成并缓存。
+    每个请求先等待 latency 秒模拟网络延迟，按 error_rate 的概率返回 500。
+    开启 validators 时响应带 ETag / Last-Modified，条件请求命中时返回 304。
+    开启 compress 时对声明支持 gzip 的请求返回 gzip 压缩的响应体。
+    """
+
+    def __init__(self, entries=20, latency=0.0, entry_size=0, error_rate=0.0, validators=False, seed=0,
+                 compress=False):
+        """
+        Args:
+            entries: 每个源的条目数
+            latency: 每个请求的模拟延迟（秒）
+            entry_size: 每个条目额外填充的字节数，用来控制响应体大小
+            error_rate: 返回 500 的概率（0-1）
+            validators: 是否支持 ETag / Last-Modified 条件请求
+            seed: 错误注入的随机种子，保证多次运行可比
+            compress: 是否支持 gzip 压缩传输
+        """
+        self.entries = entries
+        self.entry_size = entry_size
+        # 路径 -> (响应体, gzip 响应体, ETag)
+        self._bodies = {}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.validators = validators
+        self.compress = compress
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def body(self):
+        """RSS 2.0 响应体（/feed/0.xml）"""
+        return self.render('/feed/0.xml')[0]
+
+    def render(self, path):
+        """路径对应的 (响应体, gzip 响应体, ETag)"""
+        with self._lock:
+            cached = self._bodies.get(path)
+        if cached is not None:
+            return cached
+        feed = path.rsplit('/', 1)[-1].split('.', 1)[0]
+        make = make_atom if path.endswith('.atom') else make_rss
+        body = make(self.entries, entry_size=self.entry_size, feed=feed)
+        cached = (body, gzip.compress(body), '"%s"' % hashlib.sha1(body).hexdigest()[:16])
+        with self._lock:
+            return self._bodies.setdefault(path, cached)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_empty(self, status):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    failed = server.error_rate and server._random.random() < server.error_rate
+                    if failed:
+                        server.errors += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if failed:
+                    self._send_empty(500)
+                    return
+
+                fmt = 'atom' if self.path.endswith('.atom') else 'rss'
+                body, gzipped, etag = server.render(self.path)
+                if server.validators and (
+                    self.headers.get('If-None-Match') == etag
+                    or self.headers.get('If-Modified-Since') == server.last_modified
+                ):
+                    with server._lock:
+                        server.not_modified += 1
+                    self._send_empty(304)
+                    return
+
+                self.send_response(200)
+                content_type = 'application/atom+xml' if fmt == 'atom' else 'application/rss+xml'
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                if server.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzipped
+                    self.send_header('Content-Encoding', 'gzip')
+                with server._lock:
+                    server.bytes_sent += len(body)
+                self.send_header('Content-Length', str(len(body)))
+                if server.validators:
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', server.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        """启动服务器，返回基础 URL"""
+        ThreadingHTTPServer.request_queue_size = 4096
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    def feed_urls(self, count, fmt='rss'):
+        """生成 count 个不同的源 URL
+
+        Args:
+            count: 源数量
+            fmt: 'rss'、'atom' 或 'mixed'（两种格式交替）
+        """
+        base = f'http://127.0.0.1:{self._server.server_address[1]}'
+        urls = []
+        for i in range(count):
+            atom = fmt == 'atom' or (fmt == 'mixed' and i % 2)
+            urls.append(f'{base}/feed/{i}.atom' if atom else f'{base}/feed/{i}.xml')
+        return urls
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,118 @@
+import json
+import os
+import random
+import threading
+import time
+
+
+class CircuitBreaker:
+    """按源的熔断器
+
+    持久化每个源的连续失败次数。连续失败达到 threshold 次后熔断，
+    在退避时间内不再请求该源；退避时间按指数增长并加随机抖动，
+    到期后放行一次试探请求（半开），成功则恢复，失败则继续退避。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, path='feed_health.json', threshold=3, base_delay=300, max_delay=86400):
+        """
+        初始化熔断器
+
+        Args:
+            path: 状态文件路径，为空时只在内存中记录
+            threshold: 连续失败多少次后熔断
+            base_delay: 第一次熔断的退避秒数
+            max_delay: 退避秒数上限
+        """
+        self.path = path
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._feeds = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """从文件加载状态"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._feeds = data
+        except Exception as e:
+            print(f"熔断状态加载失败: {str(e)}，重新开始")
+            self._feeds = {}
+
+    def save(self):
+        """保存状态到文件（仅在有改动时写入）"""
+        if not self.path:
+            return True
+        with self._lock:
+            if not self._dirty:
+                return True
+            data = dict(self._feeds)
+            self._dirty = False
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"保存熔断状态失败: {str(e)}")
+            return False
+
+    def state(self, feed_url, now=None):
+        """源当前的熔断状态：closed / open / half_open"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            entry = self._feeds.get(feed_url)
+        if not entry or entry.get('failures', 0) < self.threshold:
+            return self.CLOSED
+        if now < entry.get('open_until', 0):
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def info(self, feed_url):
+        """源的失败记录：failures / open_until / last_error"""
+        with self._lock:
+            return dict(self._feeds.get(feed_url, {}))
+
+    def allow(self, feed_url, now=None):
+        """是否允许请求该源（熔断中返回 False）"""
+        return self.state(feed_url, now) != self.OPEN
+
+    def record_success(self, feed_url):
+        """请求成功，清除失败记录"""
+        with self._lock:
+            if feed_url in self._feeds:
+                del self._feeds[feed_url]
+                self._dirty = True
+
+    def record_failure(self, feed_url, error, now=None):
+        """记录一次失败，达到阈值后熔断
+
+        Returns:
+            str: 记录后的熔断状态
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            entry = dict(self._feeds.get(feed_url, {}))
+            failures = entry.get('failures', 0) + 1
+            entry['failures'] = failures
+            entry['last_error'] = str(error)[:200]
+            if failures >= self.threshold:
+                # 指数退避，取一半固定、一半随机，避免大量源同时恢复
+                delay = min(self.base_delay * 2 ** (failures - self.threshold), self.max_delay)
+                entry['open_until'] = now + delay / 2 + random.uniform(0, delay / 2)
+            self._feeds[feed_url] = entry
+            self._dirty = True
+        return self.state(feed_url, now)
@@ -0,0 +1,129 @@
+import zlib
+
+# brotli / zstd 解码（可选）
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def supported_encodings():
+    """本机能解码的 Content-Encoding，按优先顺序"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append('zstd')
+    if brotli is not None:
+        encodings.append('br')
+    encodings.extend(['gzip', 'deflate'])
+    return encodings
+
+
+# 请求时声明的 Accept-Encoding
+ACCEPT_ENCODING = ', '.join(supported_encodings())
+
+# 限制解压后大小时声明的 Accept-Encoding：只有 gzip / deflate 能限制每次解压的输出，
+# brotli / zstd 的一小块数据可能解压出极大的输出，在检查大小之前就已占用内存
+BOUNDED_ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class ContentDecodingError(Exception):
+    """响应体的 Content-Encoding 不支持或数据损坏"""
+
+
+class ContentDecoder:
+    """增量解码压缩的响应体
+
+    每收到一块原始数据就解码一块，不需要先缓存整个压缩响应体；
+    gzip / deflate 每次最多输出 chunk_size 字节，调用方边解码边检查大小，
+    压缩比极高的响应在超过上限时立即中止，而不是先全部解压到内存。
+    brotli / zstd 按收到的数据块整块解码，输出大小无法限制，
+    有大小上限的请求只声明 BOUNDED_ACCEPT_ENCODING，不请求这两种格式。
+    """
+
+    def __init__(self, encoding, chunk_size=16384):
+        """
+        Args:
+            encoding: 响应头 Content-Encoding，为空或 identity 时原样输出
+            chunk_size: gzip / deflate 每次输出的最大字节数
+        """
+        self.encoding = (encoding or 'identity').strip().lower()
+        self.chunk_size = chunk_size
+        self._obj = None
+        self._first = True
+        if self.encoding in ('gzip', 'x-gzip'):
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == 'deflate':
+            self._obj = zlib.decompressobj()
+        elif self.encoding == 'br' and brotli is not None:
+            self._obj = brotli.Decompressor()
+        elif self.encoding == 'zstd' and zstandard is not None:
+            self._obj = zstandard.ZstdDecompressor().decompressobj()
+        elif self.encoding != 'identity':
+            raise ContentDecodingError(f"不支持的 Content-Encoding: {self.encoding}")
+
+    def decode(self, data):
+        """解码一块原始数据
+
+        Yields:
+            bytes: 解码后的数据块
+        """
+        try:
+            if self._obj is None:
+                if data:
+                    yield data
+            elif self.encoding == 'br':
+                out = self._obj.process(data)
+                if out:
+                    yield out
+            elif self.encoding == 'zstd':
+                out = self._obj.decompress(data)
+                if out:
+                    yield out
+            else:
+                yield from self._decode_zlib(data)
+        except (zlib.error, ContentDecodingError) as e:
+            raise ContentDecodingError(f"{self.encoding} 解码失败: {str(e)}") from e
+        except Exception as e:
+            # brotli.error / zstandard.ZstdError
+            if self.encoding in ('br', 'zstd'):
+                raise ContentDecodingError(f"{self.encoding} 解码失败: {str(e)}") from e
+            raise
+
+    def _decode_zlib(self, data):
+        if self._first and data and self.encoding == 'deflate':
+            self._first = False
+            # 有的服务器发送不带 zlib 头的原始 deflate 数据
+            try:
+                probe = zlib.decompressobj()
+                probe.decompress(data[:64], 1)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        while True:
+            out = self._obj.decompress(data, self.chunk_size)
+            data = self._obj.unconsumed_tail
+            if out:
+                yield out
+            if self._obj.eof:
+                if self._obj.unused_data and self.encoding != 'deflate':
+                    # gzip 可以由多个成员拼接而成
+                    data = self._obj.unused_data
+                    self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    continue
+                return
+            if not data and len(out) < self.chunk_size:
+                return
+
+    def flush(self):
+        """输入结束，输出剩余数据"""
+        if self._obj is None or self.encoding in ('br', 'zstd'):
+            return
+        if not self._obj.eof:
+            yield from self._decode_zlib(b'')
+            out = self._obj.flush()
+            if out:
+                yield out
@@ -0,0 +1,168 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_tz, mktime_tz
+from functools import lru_cache
+
+
+# ISO 8601：2026-01-09T00:11:26Z、2026-01-09 00:11:26.123+08:00、2026-01-09T00:11
+_ISO_RE = re.compile(
+    r'^\s*(\d{4})-(\d{1,2})-(\d{1,2})'
+    r'(?:[T\s](\d{1,2}):(\d{2})(?::(\d{2})(?:[.,](\d+))?)?)?'
+    r'\s*(Z|[+-]\d{2}:?\d{2}|[+-]\d{2})?\s*$',
+    re.IGNORECASE
+)
+
+# 斜杠或点分隔的日期：2026/01/09 00:11:26、2026.1.9
+_SLASH_RE = re.compile(
+    r'^\s*(\d{4})[/.](\d{1,2})[/.](\d{1,2})'
+    r'(?:\s+(\d{1,2}):(\d{2})(?::(\d{2}))?)?\s*$'
+)
+
+# 中文日期：2026年1月9日 08:30
+_CN_RE = re.compile(
+    r'^\s*(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日'
+    r'(?:\s*(\d{1,2})[:：](\d{2})(?:[:：](\d{2}))?)?\s*$'
+)
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+# 英文月份：January 9, 2026、Jan 9 2026 08:30
+_MONTH_FIRST_RE = re.compile(
+    r'^\s*(?:[A-Za-z]+,?\s+)??([A-Za-z]{3})[A-Za-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})'
+    r'(?:\s+(\d{1,2}):(\d{2})(?::(\d{2}))?)?\s*$'
+)
+
+# 日在前：9 January 2026、09 Jan 2026 08:30（缺少时区的 RFC 2822 变体）
+_DAY_FIRST_RE = re.compile(
+    r'^\s*(?:[A-Za-z]+,?\s+)?(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?,?\s+(\d{4})'
+    r'(?:\s+(\d{1,2}):(\d{2})(?::(\d{2}))?)?\s*$'
+)
+
+
+def _timestamp(year, month, day, hour=0, minute=0, second=0, microsecond=0, tz=None):
+    """各字段转为时间戳，没有时区信息的按本地时间处理"""
+    dt = datetime(year, month, day, hour, minute, second, microsecond, tzinfo=tz)
+    return dt.timestamp()
+
+
+def _parse_offset(text):
+    """解析 Z / +08:00 / +0800 / +08 形式的时区"""
+    if text.upper() == 'Z':
+        return timezone.utc
+    sign = -1 if text[0] == '-' else 1
+    digits = text[1:].replace(':', '')
+    hours = int(digits[:2])
+    minutes = int(digits[2:4]) if len(digits) > 2 else 0
+    return timezone(sign * timedelta(hours=hours, minutes=minutes))
+
+
+def _int(value, default=0):
+    return int(value) if value else default
+
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """把日期字符串解析为时间戳（UTC 秒）
+
+    支持 RFC 2822、带时区偏移的 ISO 8601，以及博客常见的非标准格式
+    （2026/01/09 00:11、2026年1月9日、January 9, 2026 等）。
+    结果按字符串缓存（有界 LRU），同一日期反复显示时不会重复解析。
+
+    Args:
+        text (str): 日期字符串
+
+    Returns:
+        float: 时间戳，无法解析时返回 None
+    """
+    if not text:
+        return None
+
+    try:
+        # RFC 2822
+        parsed = parsedate_tz(text)
+        if parsed and parsed[0] >= 1000:
+            if parsed[9] is None:
+                return time.mktime(parsed[:8] + (-1,))
+            return float(mktime_tz(parsed))
+
+        match = _ISO_RE.match(text)
+        if match:
+            year, month, day, hour, minute, second, fraction, offset = match.groups()
+            microsecond = int((fraction or '0')[:6].ljust(6, '0'))
+            tz = _parse_offset(offset) if offset else None
+            return _timestamp(int(year), int(month), int(day), _int(hour), _int(minute),
+                              _int(second), microsecond, tz)
+
+        for pattern in (_SLASH_RE, _CN_RE):
+            match = pattern.match(text)
+            if match:
+                year, month, day, hour, minute, second = match.groups()
+                return _timestamp(int(year), int(month), int(day), _int(hour), _int(minute), _int(second))
+
+        match = _MONTH_FIRST_RE.match(text)
+        if match:
+            month_name, day, year, hour, minute, second = match.groups()
+            month = _MONTHS.get(month_name.lower())
+            if month:
+                return _timestamp(int(year), month, int(day), _int(hour), _int(minute), _int(second))
+
+        match = _DAY_FIRST_RE.match(text)
+        if match:
+            day, month_name, year, hour, minute, second = match.groups()
+            month = _MONTHS.get(month_name.lower())
+            if month:
+                return _timestamp(int(year), month, int(day), _int(hour), _int(minute), _int(second))
+    except (ValueError, OverflowError):
+        pass
+
+    return None
+
+
+def format_relative(timestamp, now=None):
+    """把时间戳格式化为相对时间
+
+    Args:
+        timestamp (float): 发布时间戳（UTC 秒）
+        now (float): 当前时间戳，默认为 time.time()
+
+    Returns:
+        str: 相对时间字符串（如"3天前"、"2小时前"）
+    """
+    if now is None:
+        now = time.time()
+
+    total_seconds = int(now - timestamp)
+    days = total_seconds // 86400
+    hours = (total_seconds % 86400) // 3600
+    minutes = (total_seconds % 3600) // 60
+
+    if days > 0:
+        if days >= 7:
+            weeks = days // 7
+            return f"{weeks}周前"
+        return f"{days}天前"
+    elif hours > 0:
+        return f"{hours}小时前"
+    elif minutes > 0:
+        return f"{minutes}分钟前"
+    else:
+        return "刚刚"
+
+
+def relative_labels(timestamps, now=None):
+    """批量计算相对时间，整批使用同一个当前时间
+
+    Args:
+        timestamps: 时间戳序列，元素为 None 时对应空字符串
+        now (float): 当前时间戳，默认为 time.time()
+
+    Returns:
+        list: 相对时间字符串列表
+    """
+    if now is None:
+        now = time.time()
+    return ["" if timestamp is None else format_relative(timestamp, now) for timestamp in timestamps]
@@ -0,0 +1,254 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from text_search import tokenize
+
+
+# 跟踪参数，规范化链接时去掉
+TRACKING_PARAMS = frozenset((
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'ref', 'ref_src', 'spm',
+))
+
+# 路径末尾可以省略的默认页面
+INDEX_PAGES = ('index.html', 'index.htm', 'index.php')
+
+# 标题 simhash 的海明距离不超过该值视为近似重复
+TITLE_DISTANCE = 4
+
+# simhash 分为 TITLE_DISTANCE + 1 段 (起始位, 掩码)，近似重复的两个标题至少有一段完全相同（抽屉原理）
+_BAND_BITS = 64 // (TITLE_DISTANCE + 1)
+BANDS = [
+    (band * _BAND_BITS, (1 << (_BAND_BITS if band < TITLE_DISTANCE else 64 - band * _BAND_BITS)) - 1)
+    for band in range(TITLE_DISTANCE + 1)
+]
+
+# 标题至少有这么多个不同的词才做近似匹配，太短的标题（如“周报”）容易误判
+MIN_TITLE_TOKENS = 4
+
+# 近似重复的两篇文章发布时间相差不超过该秒数（转载通常在几天之内）
+TITLE_WINDOW = 3 * 86400
+
+# 每个 LSH 桶最多保存的文章数，保证每次查找的比较次数有上限
+BUCKET_LIMIT = 16
+
+# simhash 的每一位展开为一个字节，把各词的哈希相加就得到每一位上为 1 的词数；
+# _LANES[i][byte] 是哈希第 i 个字节展开后的值（已移到第 i 组 64 位）
+_SPREAD = [
+    sum(((byte >> bit) & 1) << (8 * bit) for bit in range(8))
+    for byte in range(256)
+]
+_LANES = [[spread << (64 * lane) for spread in _SPREAD] for lane in range(8)]
+
+# _MAJORITY[n] 把每位的词数换成 '1'（超过 n 个词的一半）或 '0'，用于 bytes.translate
+_MAJORITY = [bytes(ord('1') if count * 2 > n else ord('0') for count in range(256)) for n in range(256)]
+
+
+def canonical_url(url):
+    """规范化文章链接，同一篇文章的不同写法得到相同的结果
+
+    忽略协议（http / https）、主机名大小写和 www. 前缀、默认端口、片段、
+    跟踪参数（utm_* 等）、查询参数的顺序、路径末尾的斜杠和 index.html。
+
+    Args:
+        url: 文章链接
+
+    Returns:
+        str: 规范化的链接（不含协议），无法解析时返回去掉首尾空白的原链接
+    """
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f'{host}:{port}'
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    for page in INDEX_PAGES:
+        if path.endswith('/' + page):
+            path = path[:-len(page)]
+            break
+    path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return host + path + ('?' + urlencode(query) if query else '')
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def title_simhash(title):
+    """标题的 64 位 simhash
+
+    以 text_search.tokenize 的词（英文单词、中文二元组）为特征，
+    只改动个别词的标题得到的 simhash 只有少数几位不同。
+
+    Returns:
+        tuple: (simhash, 标题中按顺序出现的数字)；不同的词少于 MIN_TITLE_TOKENS 个时 simhash 为 None
+    """
+    tokens = tokenize(title)
+    # 数字按出现顺序保留，“第 1 期第 2 篇”和“第 2 期第 1 篇”不同
+    numbers = tuple(token for token in tokens if token.isdigit())
+    tokens = set(tokens)
+    if len(tokens) < MIN_TITLE_TOKENS:
+        return None, numbers
+    # 每位的计数放在一个字节里，词数不超过 255
+    tokens = sorted(tokens)[:255]
+    total = 0
+    for token in tokens:
+        for lane, byte in zip(_LANES, _hash64(token).to_bytes(8, 'little')):
+            total += lane[byte]
+    # 第 0 位的词数在最低字节，翻转后按二进制字符串解析
+    bits = total.to_bytes(64, 'little').translate(_MAJORITY[len(tokens)])
+    return int(bits[::-1], 2), numbers
+
+
+def _band_keys(simhash):
+    """simhash 各段所在的 LSH 桶"""
+    return [(shift, (simhash >> shift) & mask) for shift, mask in BANDS]
+
+
+class DedupIndex:
+    """跨源文章去重索引
+
+    同一篇文章经常出现在多个订阅中（镜像站、聚合源、http / https 或带不带 www 的同一个源）。
+    每篇文章按规范化链接的哈希精确匹配，再按标题 simhash 的分段（LSH）查找近似重复的标题，
+    第一次见到文章的源是它的所有者，之后其他源的同一篇文章被去掉，所有者再次刷新时照常保留。
+
+    索引只保存最近的 max_entries 篇文章（先进先出），每个 LSH 桶最多 BUCKET_LIMIT 篇，
+    每篇文章的去重开销固定，与文章库的大小无关。所有者随文章写入文章库（见 filter_with_keys），
+    重新启动后由 loader 从文章库恢复，下次刷新时先完成的源不会抢走其他源已有的文章。
+    """
+
+    def __init__(self, max_entries=50000, loader=None):
+        """
+        Args:
+            max_entries: 索引保存的文章数上限
+            loader: 第一次去重前调用一次，返回之前保存的
+                    [(所有者, 链接哈希, simhash, 数字, 时间戳), ...]（按加入顺序），None 表示从空索引开始
+        """
+        self.max_entries = max_entries
+        # 链接哈希 -> (所有者, simhash, 数字, 时间戳)，按加入顺序
+        self._entries = OrderedDict()
+        # (段的起始位, 段的值) -> [链接哈希, ...]
+        self._buckets = {}
+        self._loader = loader
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def filter(self, feed_url, articles):
+        """去掉其他源已经有的文章，新文章记为 feed_url 所有
+
+        Args:
+            feed_url: 文章所属的源
+            articles: 文章列表
+
+        Returns:
+            list: 去重后的文章，保持原来的顺序
+        """
+        return self.filter_with_keys(feed_url, articles)[0]
+
+    def filter_with_keys(self, feed_url, articles):
+        """同 filter，同时返回保留的文章的去重键，供写入文章库
+
+        Returns:
+            tuple: (去重后的文章, 对应的 [(链接哈希, simhash, 数字), ...])，
+                   simhash 为 None 表示标题太短或没有发布时间，不做近似匹配
+        """
+        kept = []
+        keys = []
+        with self._lock:
+            self._ensure_loaded()
+            for article in articles:
+                article_keys = self._add(feed_url, article)
+                if article_keys is not None:
+                    kept.append(article)
+                    keys.append(article_keys)
+        return kept, keys
+
+    def _ensure_loaded(self):
+        """第一次去重前恢复之前保存的索引（调用方持有锁）"""
+        if self._loader is None:
+            return
+        loader, self._loader = self._loader, None
+        try:
+            entries = loader()
+        except Exception as e:
+            print(f"去重索引恢复失败: {str(e)}，从空索引开始")
+            return
+        for feed_url, key, simhash, numbers, timestamp in entries:
+            if key not in self._entries:
+                self._insert(key, (feed_url, simhash, numbers, timestamp))
+
+    def _add(self, feed_url, article):
+        """加入一篇文章，返回它的去重键；是其他源的重复文章时返回 None（调用方持有锁）"""
+        key = _hash64(canonical_url(article['link']))
+        entry = self._entries.get(key)
+        if entry is not None:
+            return (key, entry[1], entry[2]) if entry[0] == feed_url else None
+
+        simhash, numbers = title_simhash(article['title'])
+        timestamp = article['timestamp']
+        if timestamp is None:
+            simhash = None
+        if simhash is not None:
+            owner = self._find_similar(simhash, numbers, timestamp)
+            if owner is not None and owner != feed_url:
+                return None
+
+        self._insert(key, (feed_url, simhash, numbers, timestamp))
+        return key, simhash, numbers
+
+    def _insert(self, key, entry):
+        """记录一篇文章，超过 max_entries 时移除最早加入的（调用方持有锁）"""
+        self._entries[key] = entry
+        simhash = entry[1]
+        if simhash is not None:
+            for band_key in _band_keys(simhash):
+                bucket = self._buckets.setdefault(band_key, [])
+                if len(bucket) >= BUCKET_LIMIT:
+                    del bucket[0]
+                bucket.append(key)
+        if len(self._entries) > self.max_entries:
+            self._evict()
+
+    def _find_similar(self, simhash, numbers, timestamp):
+        """查找标题近似、数字相同且发布时间相近的文章，返回其所有者"""
+        for band_key in _band_keys(simhash):
+            bucket = self._buckets.get(band_key)
+            if not bucket:
+                continue
+            for key in bucket:
+                owner, other, other_numbers, other_timestamp = self._entries[key]
+                if (other_numbers == numbers and abs(other_timestamp - timestamp) <= TITLE_WINDOW
+                        and bin(other ^ simhash).count('1') <= TITLE_DISTANCE):
+                    return owner
+        return None
+
+    def _evict(self):
+        """移除最早加入的文章"""
+        key, (_, simhash, _, _) = self._entries.popitem(last=False)
+        if simhash is None:
+            return
+        for band_key in _band_keys(simhash):
+            bucket = self._buckets.get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band_key]
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+
+from article import Article
+
+
+class FeedCache:
+    """RSS 源条件请求缓存
+
+    按源保存 ETag / Last-Modified 校验值和响应体哈希，以及上次解析出的文章，
+    源未更新时（304 或内容哈希一致）可以直接复用，跳过下载后的解析。
+    缓存文件在第一次查找或更新时才读取，启动时不需要等待。
+    """
+
+    def __init__(self, path='feed_cache.json'):
+        """
+        初始化缓存
+
+        Args:
+            path: 缓存文件路径，为空时只在内存中缓存
+        """
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def hash_content(content):
+        """计算响应体哈希"""
+        return hashlib.sha256(content).hexdigest()
+
+    def load(self):
+        """从文件加载缓存"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                for entry in data.values():
+                    if 'articles' in entry:
+                        entry['articles'] = [Article.from_dict(article) for article in entry['articles']]
+                self._entries = data
+        except Exception as e:
+            print(f"缓存文件加载失败: {str(e)}，忽略缓存")
+            self._entries = {}
+
+    def _ensure_loaded(self):
+        """第一次使用时读取缓存文件（刷新的工作线程中，不占用启动时间）"""
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load()
+                    self._loaded = True
+
+    def save(self):
+        """保存缓存到文件（仅在有改动时写入）"""
+        if not self.path:
+            return True
+        with self._lock:
+            if not self._dirty:
+                return True
+            data = dict(self._entries)
+            self._dirty = False
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=dict)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"保存缓存失败: {str(e)}")
+            return False
+
+    def lookup(self, feed_url, cutoff):
+        """查找可用的缓存记录
+
+        缓存只保存截止时间之后的文章，若本次截止时间更早（时间范围变大），
+        缓存内容不完整，视为无缓存。
+
+        Args:
+            feed_url: RSS 源 URL
+            cutoff: 本次的截止时间戳（UTC 秒）
+
+        Returns:
+            dict: 缓存记录，不可用时返回 None
+        """
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(feed_url)
+        if not entry or 'articles' not in entry or entry.get('cutoff', float('inf')) > cutoff:
+            return None
+        return entry
+
+    def request_headers(self, feed_url, cutoff):
+        """生成条件请求头"""
+        headers = {}
+        entry = self.lookup(feed_url, cutoff)
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, feed_url, etag, last_modified, content_hash, cutoff, articles, hints=None):
+        """更新某个源的缓存记录
+
+        Args:
+            articles: 文章列表（带 timestamp 字段）
+            hints: 源自带的更新频率提示（ttl / sy:updatePeriod 等）
+        """
+        self._ensure_loaded()
+        with self._lock:
+            self._entries[feed_url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_hash': content_hash,
+                'cutoff': cutoff,
+                'articles': list(articles),
+                'hints': hints or {},
+            }
+            self._dirty = True
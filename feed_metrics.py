@@ -0,0 +1,269 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# 单个源的计时阶段
+PHASES = ('connect', 'ttfb', 'download', 'parse', 'filter', 'store')
+
+# 当前线程中建立连接（含 TLS 握手）累计的秒数，由 TimedHTTPAdapter 写入
+_connect_time = threading.local()
+
+
+def reset_connect_time():
+    """清零当前线程的连接计时"""
+    _connect_time.seconds = 0.0
+
+
+def connect_time():
+    """当前线程自上次清零以来建立连接花费的秒数，复用 keep-alive 连接时为 0"""
+    return getattr(_connect_time, 'seconds', 0.0)
+
+
+def _timed_adapter_class():
+    """创建 TimedHTTPAdapter 类
+
+    导入 requests / urllib3 较慢，放在第一次用到时，启动时只用到计时部分的模块不需要等待。
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _TimedConnectMixin:
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                _connect_time.seconds = connect_time() + time.perf_counter() - start
+
+    class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+        pass
+
+    class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+        pass
+
+    class _TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = _TimedHTTPConnection
+
+    class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = _TimedHTTPSConnection
+
+    class TimedHTTPAdapter(HTTPAdapter):
+        """记录建立连接耗时的 HTTPAdapter，耗时通过 connect_time() 读取"""
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                'http': _TimedHTTPConnectionPool,
+                'https': _TimedHTTPSConnectionPool,
+            }
+
+    return TimedHTTPAdapter
+
+
+def __getattr__(name):
+    # from feed_metrics import TimedHTTPAdapter 时才创建，之后作为模块属性缓存
+    if name == 'TimedHTTPAdapter':
+        adapter_class = globals()['TimedHTTPAdapter'] = _timed_adapter_class()
+        return adapter_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class FeedTiming:
+    """单个源一次获取的计时与计数
+
+    status 取值：
+        'ok'            下载并解析
+        'not_modified'  源返回 304
+        'unchanged'     响应体与上次相同，未解析
+        'error'         请求或解析失败
+        'open'          源已熔断，本次跳过
+        'late'          刷新截止或取消时仍未完成
+    """
+
+    def __init__(self, feed_url):
+        self.feed_url = feed_url
+        self.started_at = time.time()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.http_status = None
+        # 解压后的响应体字节数、实际传输的字节数和压缩格式
+        self.bytes = 0
+        self.wire_bytes = 0
+        self.encoding = None
+        self.entries = 0
+        self.articles = 0
+        # 与其他源重复、被去掉的文章数
+        self.duplicates = 0
+        self.status = None
+        self.error = None
+        self.duration = None
+        self._start = time.perf_counter()
+
+    def add(self, phase, seconds):
+        """累加某个阶段的耗时"""
+        self.phases[phase] += seconds
+
+    @contextmanager
+    def phase(self, phase):
+        """统计 with 块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - start
+
+    def finish(self, status, error=None):
+        """结束计时"""
+        self.status = status
+        self.error = error
+        self.duration = time.perf_counter() - self._start
+        return self
+
+    def as_dict(self):
+        """转为可以 JSON 序列化的字典"""
+        return {
+            'feed_url': self.feed_url,
+            'status': self.status,
+            'http_status': self.http_status,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'phases': dict(self.phases),
+            'bytes': self.bytes,
+            'wire_bytes': self.wire_bytes,
+            'encoding': self.encoding,
+            'entries': self.entries,
+            'articles': self.articles,
+            'duplicates': self.duplicates,
+            'error': self.error,
+        }
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RefreshMetrics:
+    """一次刷新的汇总指标
+
+    每个源的 FeedTiming 完成后通过 add() 加入，可以导出为 JSON 或 Prometheus 文本格式。
+    """
+
+    def __init__(self, mode, feed_count):
+        self.mode = mode
+        self.feed_count = feed_count
+        self.started_at = time.time()
+        self.duration = None
+        self._start = time.perf_counter()
+        self._feeds = {}
+        self._lock = threading.Lock()
+
+    def add(self, timing):
+        """加入一个源的计时，已记为 late 的源不会被之后完成的结果覆盖"""
+        with self._lock:
+            existing = self._feeds.get(timing.feed_url)
+            if existing is not None and existing.status == 'late' and timing.status != 'late':
+                return
+            self._feeds[timing.feed_url] = timing
+
+    def status(self, feed_url):
+        """某个源在本次刷新中的结果（FeedTiming.status），还没有结果时返回 None"""
+        with self._lock:
+            timing = self._feeds.get(feed_url)
+        return timing.status if timing is not None else None
+
+    def finish(self):
+        """结束本次刷新的计时"""
+        self.duration = time.perf_counter() - self._start
+        return self
+
+    def feeds(self):
+        """各源的计时，按耗时降序"""
+        with self._lock:
+            timings = list(self._feeds.values())
+        return sorted(timings, key=lambda timing: timing.duration or 0, reverse=True)
+
+    def summary(self):
+        """汇总字典：总耗时、各状态的源数量、各阶段耗时合计以及每个源的明细"""
+        timings = self.feeds()
+        statuses = {}
+        phases = dict.fromkeys(PHASES, 0.0)
+        for timing in timings:
+            statuses[timing.status] = statuses.get(timing.status, 0) + 1
+            for phase, seconds in timing.phases.items():
+                phases[phase] += seconds
+        return {
+            'mode': self.mode,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'feed_count': self.feed_count,
+            'statuses': statuses,
+            'phases': phases,
+            'bytes': sum(timing.bytes for timing in timings),
+            'wire_bytes': sum(timing.wire_bytes for timing in timings),
+            'entries': sum(timing.entries for timing in timings),
+            'articles': sum(timing.articles for timing in timings),
+            'duplicates': sum(timing.duplicates for timing in timings),
+            'feeds': [timing.as_dict() for timing in timings],
+        }
+
+    def to_json(self, indent=2):
+        """导出为 JSON 文本"""
+        return json.dumps(self.summary(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self):
+        """导出为 Prometheus 文本格式（可供 node_exporter 的 textfile 收集器读取）"""
+        summary = self.summary()
+        lines = [
+            '# HELP rss_refresh_duration_seconds Wall time of the last refresh.',
+            '# TYPE rss_refresh_duration_seconds gauge',
+            f"rss_refresh_duration_seconds {summary['duration'] or 0:.6f}",
+            '# HELP rss_refresh_timestamp_seconds Start time of the last refresh.',
+            '# TYPE rss_refresh_timestamp_seconds gauge',
+            f"rss_refresh_timestamp_seconds {summary['started_at']:.3f}",
+            '# HELP rss_refresh_feeds Feeds in the last refresh by outcome.',
+            '# TYPE rss_refresh_feeds gauge',
+        ]
+        for status, count in sorted(summary['statuses'].items(), key=lambda item: str(item[0])):
+            lines.append(f'rss_refresh_feeds{{status="{_escape_label(status)}"}} {count}')
+
+        per_feed = (
+            ('rss_feed_duration_seconds', 'Wall time to fetch one feed.', lambda t: f'{t.duration or 0:.6f}'),
+            ('rss_feed_bytes', 'Response body bytes read, after decompression.', lambda t: str(t.bytes)),
+            ('rss_feed_wire_bytes', 'Response body bytes transferred, before decompression.', lambda t: str(t.wire_bytes)),
+            ('rss_feed_entries', 'Entries seen in the feed.', lambda t: str(t.entries)),
+            ('rss_feed_articles', 'Entries inside the time window.', lambda t: str(t.articles)),
+            ('rss_feed_duplicates', 'Articles dropped as duplicates of another feed.', lambda t: str(t.duplicates)),
+        )
+        timings = self.feeds()
+        for name, help_text, value in per_feed:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for timing in timings:
+                lines.append(
+                    f'{name}{{feed="{_escape_label(timing.feed_url)}",status="{_escape_label(timing.status)}"}} '
+                    f'{value(timing)}'
+                )
+
+        lines.append('# HELP rss_feed_phase_seconds Time spent in each phase of one feed.')
+        lines.append('# TYPE rss_feed_phase_seconds gauge')
+        for timing in timings:
+            feed = _escape_label(timing.feed_url)
+            for phase in PHASES:
+                lines.append(f'rss_feed_phase_seconds{{feed="{feed}",phase="{phase}"}} {timing.phases[phase]:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path):
+        """写入文件，扩展名为 .prom 时使用 Prometheus 文本格式，否则为 JSON"""
+        text = self.to_prometheus() if path.endswith('.prom') else self.to_json()
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"保存刷新指标失败: {str(e)}")
+            return False
@@ -2,7 +2,25 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, simpledialog
 import threading
 import webbrowser
-from rss_core import load_config, save_config, RSSFetcher, format_time, get_domain
+import bisect
+import queue
+from datetime import datetime, timedelta
+from pathlib import Path
+from rss_core import load_config, save_config, get_domain, article_sort_key, sort_run, merge_newest
+from aggregator_client import create_fetcher
+from date_parser import format_relative, relative_labels
+from snapshot import ArticleSnapshot
+from page_cache import create_prefetcher
+from text_search import matches
+
+# 每次空闲回调最多插入的行数，插入大量文章时界面仍能响应
+ROW_CHUNK = 200
+
+# 主线程处理工作线程更新的间隔（毫秒）
+UI_TICK_MS = 50
+
+# 搜索框停止输入多久后开始搜索（毫秒）
+SEARCH_DELAY_MS = 200
 
 class RSSReaderGUI:
     def __init__(self, root):
@@ -11,9 +29,36 @@ class RSSReaderGUI:
         self.root.geometry("1000x700")
         
         # 初始化变量
-        self.articles = []
+        # 各源的文章：源 URL -> 按时间降序的列表（None 为文章库中补上的文章），
+        # 分页时 k 路归并出当前页，不对全部文章排序
+        self.article_runs = {}
+        # 文章还是上次刷新（或启动时的快照）的源，本次刷新完成后替换
+        self.stale_feeds = set()
+        # 列表显示的文章来源（无搜索时为全部文章，有搜索时为搜索结果），同样按批保存
+        self.view_runs = []
+        # 分页显示时当前页（从 0 开始）和当前页的链接
+        self.page = 0
+        self.page_links = None
+        self.page_scheduled = False
+        # 列表中显示的文章：排序键、链接、行 id -> 文章
+        self.view_keys = []
+        self.view_links = set()
+        self.item_articles = {}
+        # 等待插入列表的文章，由 insert_pending 分批插入
+        self.pending_articles = []
+        # 当前搜索词，None 表示显示全部文章
+        self.search_query = None
+        self.search_job = None
+        self.insert_scheduled = False
+        # 刷新结束后的汇总状态，所有文章插入完成后显示
+        self.final_status = None
+        # 工作线程 -> 主线程的更新队列，由 process_ui_queue 定时合并处理
+        self.ui_queue = queue.Queue()
+        self.fetch_progress = 0
         self.current_feed_index = 0
         self.is_fetching = False
+        # 本次刷新的 RefreshProfiler，未开启性能分析时为 None
+        self.profiler = None
         
         # 加载配置
         self.config = load_config()
@@ -21,12 +66,26 @@ class RSSReaderGUI:
         self.weeks_limit = self.config.get('weeks_limit', 1)
         self.max_workers = self.config.get('max_workers', 5)
         self.request_timeout = self.config.get('request_timeout', 30)
+        # 每页显示的文章数，0 表示不分页
+        self.page_size = self.config.get('max_articles', 0)
+        
+        # 创建 RSS 获取器（配置了 server_url 时从聚合服务读取）
+        self.fetcher = create_fetcher(self.config)
         
-        # 创建 RSS 获取器
-        self.fetcher = RSSFetcher(self.config)
+        # 上次刷新结果的快照，启动时立即显示
+        self.snapshot = ArticleSnapshot(self.config.get('snapshot_file', 'snapshot.json'))
+        
+        # 刷新后在后台预取最新文章的网页，右键菜单可以打开缓存的副本（prefetch_pages 为 0 时不预取）
+        self.prefetcher = create_prefetcher(self.config, self.fetcher)
         
         # 创建界面
         self.create_widgets()
+        self.root.after(UI_TICK_MS, self.process_ui_queue)
+        
+        # 先显示快照，再在后台刷新，刷新完成的源替换快照中的文章
+        self.show_snapshot()
+        if self.rss_feeds or self.config.get('server_url'):
+            self.root.after_idle(self.start_fetch_articles)
     
     def create_widgets(self):
         """创建界面组件"""
@@ -60,6 +119,19 @@ class RSSReaderGUI:
         )
         self.refresh_btn.pack(fill=tk.X, pady=(0, 5))
         
+        # 取消按钮：停止刷新，保留已获取的文章
+        self.cancel_btn = ttk.Button(
+            control_frame, 
+            text="取消", 
+            command=self.cancel_fetch,
+            state=tk.DISABLED
+        )
+        self.cancel_btn.pack(fill=tk.X, pady=(0, 5))
+        
+        # 性能分析开关：勾选后每次刷新都用 cProfile + tracemalloc 剖析，结束时写入报告
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="性能分析", variable=self.profile_var).pack(anchor=tk.W, pady=(0, 5))
+        
         # 配置按钮
         ttk.Button(
             control_frame, 
@@ -89,7 +161,17 @@ class RSSReaderGUI:
         articles_frame = ttk.LabelFrame(self.main_frame, text="文章列表", padding="10")
         articles_frame.grid(row=1, column=1, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0))
         articles_frame.columnconfigure(0, weight=1)
-        articles_frame.rowconfigure(0, weight=1)
+        articles_frame.rowconfigure(1, weight=1)
+        
+        # 搜索框：输入后在文章库中全文搜索（标题、摘要、来源）
+        search_frame = ttk.Frame(articles_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="搜索:").grid(row=0, column=0, padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self.on_search_changed)
+        ttk.Entry(search_frame, textvariable=self.search_var).grid(row=0, column=1, sticky=(tk.W, tk.E))
+        ttk.Button(search_frame, text="清除", command=lambda: self.search_var.set("")).grid(row=0, column=2, padx=(5, 0))
         
         # 创建 Treeview 显示文章
         columns = ('title', 'source', 'time')
@@ -103,16 +185,32 @@ class RSSReaderGUI:
         self.articles_tree.column('source', width=150)
         self.articles_tree.column('time', width=100)
         
-        self.articles_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.articles_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # 文章列表滚动条
         articles_scrollbar = ttk.Scrollbar(articles_frame, orient=tk.VERTICAL, command=self.articles_tree.yview)
-        articles_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        articles_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
         self.articles_tree.config(yscrollcommand=articles_scrollbar.set)
         
         # 双击打开文章
         self.articles_tree.bind('<Double-1>', self.open_article)
         
+        # 右键菜单：在浏览器中打开或打开缓存的网页
+        self.article_menu = tk.Menu(self.articles_tree, tearoff=0)
+        self.article_menu.add_command(label="在浏览器中打开", command=lambda: self.open_article(None))
+        self.article_menu.add_command(label="打开缓存的网页", command=self.open_cached_article)
+        self.articles_tree.bind('<Button-3>', self.show_article_menu)
+        
+        # 翻页（配置了每页文章数时显示）
+        self.pager_frame = ttk.Frame(articles_frame)
+        self.prev_btn = ttk.Button(self.pager_frame, text="上一页", command=self.prev_page)
+        self.prev_btn.pack(side=tk.LEFT)
+        self.page_var = tk.StringVar()
+        ttk.Label(self.pager_frame, textvariable=self.page_var).pack(side=tk.LEFT, padx=10)
+        self.next_btn = ttk.Button(self.pager_frame, text="下一页", command=self.next_page)
+        self.next_btn.pack(side=tk.LEFT)
+        self.update_pager()
+        
         # 状态栏
         self.status_var = tk.StringVar()
         self.status_var.set("就绪")
@@ -147,12 +245,16 @@ class RSSReaderGUI:
     
     def save_config(self):
         """保存配置"""
-        config = {
+        # 保留配置文件中的其他字段
+        config = dict(self.config)
+        config.update({
             'rss_feeds': self.rss_feeds,
             'weeks_limit': self.weeks_limit,
             'max_workers': self.max_workers,
-            'request_timeout': self.request_timeout
-        }
+            'request_timeout': self.request_timeout,
+            'max_articles': self.page_size
+        })
+        self.config = config
         if not save_config(config):
             messagebox.showerror("错误", "保存配置失败")
     
@@ -180,21 +282,29 @@ class RSSReaderGUI:
         timeout_var = tk.StringVar(value=str(self.request_timeout))
         ttk.Entry(frame, textvariable=timeout_var, width=10).grid(row=2, column=1, sticky=tk.W, pady=5)
         
+        # 每页文章数
+        ttk.Label(frame, text="每页文章数(0不分页):").grid(row=3, column=0, sticky=tk.W, pady=5)
+        page_size_var = tk.StringVar(value=str(self.page_size))
+        ttk.Entry(frame, textvariable=page_size_var, width=10).grid(row=3, column=1, sticky=tk.W, pady=5)
+        
         def save_and_close():
             try:
                 self.weeks_limit = int(weeks_var.get())
                 self.max_workers = int(workers_var.get())
                 self.request_timeout = int(timeout_var.get())
+                page_size = max(int(page_size_var.get()), 0)
+                self.set_page_size(page_size)
                 self.save_config()
                 # 更新 fetcher 的配置
                 self.fetcher.weeks_limit = self.weeks_limit
                 self.fetcher.max_workers = self.max_workers
                 self.fetcher.request_timeout = self.request_timeout
+                self.fetcher.max_articles = self.page_size
                 config_window.destroy()
             except ValueError:
                 messagebox.showerror("错误", "请输入有效的数字")
         
-        ttk.Button(frame, text="保存", command=save_and_close).grid(row=3, column=0, columnspan=2, pady=20)
+        ttk.Button(frame, text="保存", command=save_and_close).grid(row=4, column=0, columnspan=2, pady=20)
     
     def start_fetch_articles(self):
         """开始获取文章（在新线程中）"""
@@ -202,89 +312,423 @@ class RSSReaderGUI:
             messagebox.showwarning("警告", "正在获取文章，请稍候...")
             return
         
-        if not self.rss_feeds:
+        if not self.rss_feeds and not self.config.get('server_url'):
             messagebox.showwarning("警告", "请先添加 RSS 源")
             return
         
         self.is_fetching = True
+        if self.prefetcher is not None:
+            # 刷新期间不预取，把连接和带宽留给刷新
+            self.prefetcher.cancel()
         self.refresh_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
         self.status_var.set("正在获取文章...")
+        self.load_feeds_list()
         
-        # 清空当前文章列表
-        for item in self.articles_tree.get_children():
-            self.articles_tree.delete(item)
+        # 当前的文章保留显示，各源完成后再替换；已经删除的源的文章直接移除
+        feeds = set(self.fetcher.rss_feeds)
+        removed = [feed_url for feed_url in self.article_runs if feed_url is not None and feed_url not in feeds]
+        for feed_url in removed:
+            del self.article_runs[feed_url]
+        self.stale_feeds = set(self.article_runs)
+        if removed:
+            self.view_runs = self.source_runs()
+            self.render_view()
+        self.final_status = None
+        self.fetch_progress = 0
+        
+        # 勾选了性能分析时在启动工作线程之前开始剖析，获取线程、刷新的工作线程和界面线程都被记录
+        if self.profile_var.get() and self.profiler is None:
+            from profiler import RefreshProfiler
+            
+            self.profiler = RefreshProfiler()
+            self.profiler.start(self.fetcher)
         
-        # 在新线程中获取文章
-        thread = threading.Thread(target=self.fetch_articles)
+        # 在新线程中获取文章（剖析时获取线程也在剖析范围内）
+        target = self.fetch_articles if self.profiler is None else self.profiler.wrap(self.fetch_articles)
+        thread = threading.Thread(target=target)
         thread.daemon = True
         thread.start()
     
     def fetch_articles(self):
-        """获取文章"""
+        """获取文章（工作线程）
+        
+        不直接操作界面，所有更新放入 ui_queue，由主线程定时合并处理。
+        """
         try:
             # 设置进度回调
             def progress_callback(feed_url, status, progress):
-                if status == 'processing':
-                    self.root.after(0, lambda f=feed_url: self.update_progress(progress, f))
-                elif status == 'completed':
-                    self.root.after(0, lambda p=progress, f=feed_url: self.update_progress(p, f))
-                elif status == 'error':
-                    self.root.after(0, lambda f=feed_url: self.status_var.set(f"错误: {f}"))
+                self.ui_queue.put(('progress', feed_url, status, progress))
             
             self.fetcher.set_progress_callback(progress_callback)
             
-            # 获取文章
-            articles = self.fetcher.fetch_all_articles()
+            # 每完成一个源就用它的文章替换列表中该源之前的文章，失败的源保留之前的文章
+            for feed_url, feed_articles in self.fetcher.iter_articles():
+                if self.fetcher.feed_failed(feed_url):
+                    continue
+                self.ui_queue.put(('articles', feed_url, feed_articles))
+                self.snapshot.update(feed_url, feed_articles)
+            self.snapshot.save(self.fetcher.rss_feeds)
             
-            # 更新文章列表
-            self.articles = articles
-            self.root.after(0, self.display_articles)
+            # 补上文章库中已保存、但本次没有获取到的文章（如请求失败的源）
+            stored = self.fetcher.load_articles()
+            late_count = len(self.fetcher.late_feeds)
+            self.ui_queue.put(('call', lambda: self.merge_stored_articles(stored, late_count)))
             
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("错误", f"获取文章失败: {str(e)}"))
+            message = f"获取文章失败: {str(e)}"
+            self.ui_queue.put(('call', lambda: messagebox.showerror("错误", message)))
         finally:
             self.is_fetching = False
-            self.root.after(0, lambda: self.refresh_btn.config(state=tk.NORMAL))
+            self.ui_queue.put(('call', self.finish_fetch))
+    
+    def process_ui_queue(self):
+        """每隔 UI_TICK_MS 取出工作线程的全部更新并合并处理
+        
+        进度只保留每个源的最新状态，新到达的文章合并为一批插入，
+        每次刷新的界面开销取决于刷新时长，而不是源的数量。
+        """
+        progress = {}
+        batches = []
+        calls = []
+        while True:
+            try:
+                kind, *payload = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                feed_url, status, value = payload
+                # 移到末尾，最后一个元素就是最近更新的源
+                progress.pop(feed_url, None)
+                progress[feed_url] = (status, value)
+            elif kind == 'articles':
+                batches.append(payload)
+            else:
+                calls.append(payload[0])
+        
+        if batches:
+            self.display_articles(batches)
+        if progress:
+            self.apply_progress(progress)
+        for call in calls:
+            call()
+        self.root.after(UI_TICK_MS, self.process_ui_queue)
+    
+    def apply_progress(self, states):
+        """应用合并后的进度：标出未完成的源，状态栏只显示最近的一条"""
+        for feed_url, (status, value) in states.items():
+            if status == 'completed':
+                self.fetch_progress = max(self.fetch_progress, value)
+            elif status == 'late':
+                self.mark_late_feed(feed_url)
+        
+        feed_url, (status, value) = next(reversed(states.items()))
+        if status in ('processing', 'completed'):
+            self.update_progress(self.fetch_progress, feed_url)
+        elif status == 'error':
+            self.status_var.set(f"错误: {feed_url}")
+        elif status == 'open':
+            self.status_var.set(f"已熔断，暂时跳过: {get_domain(feed_url)}")
+    
+    def cancel_fetch(self):
+        """停止正在进行的刷新，已获取的文章保留在列表中"""
+        if self.is_fetching:
+            self.fetcher.cancel()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.status_var.set("正在停止...")
+    
+    def finish_fetch(self):
+        """刷新结束后恢复按钮状态，在后台预取最新文章的网页"""
+        self.refresh_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        if self.profiler is not None:
+            self.root.after_idle(self.finish_profile)
+        elif self.prefetcher is not None:
+            self.start_prefetch()
+    
+    def start_prefetch(self):
+        """在后台预取最新文章的网页"""
+        runs = [run for feed_url, run in self.article_runs.items() if feed_url is not None]
+        self.prefetcher.start(merge_newest(runs, self.prefetcher.limit, presorted=True))
+    
+    def finish_profile(self):
+        """文章全部插入列表后停止剖析，保存报告并显示各阶段的汇总"""
+        if self.pending_articles:
+            self.root.after(UI_TICK_MS, self.finish_profile)
+            return
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        report = profiler.save(getattr(self.fetcher, 'last_metrics', None), self.config.get('process_parse', False))
+        summary = '\n\n'.join(report.split('\n\n')[:2])
+        messagebox.showinfo("性能分析", f"{summary}\n\n完整报告: {profiler.report_path}\n调用关系: {profiler.prof_path}")
+        if self.prefetcher is not None:
+            self.start_prefetch()
+    
+    def mark_late_feed(self, feed_url):
+        """在源列表中标出截止或取消时仍未完成的源"""
+        if feed_url in self.rss_feeds:
+            self.feeds_listbox.itemconfig(self.rss_feeds.index(feed_url), foreground='orange')
     
     def update_progress(self, progress, feed_url):
         """更新进度"""
         self.status_var.set(f"正在获取: {get_domain(feed_url)} ({progress:.1f}%)")
     
-    def display_articles(self):
-        """显示文章列表"""
-        # 清空现有列表
-        for item in self.articles_tree.get_children():
-            self.articles_tree.delete(item)
-        
-        # 添加新文章
-        for article in self.articles:
+    def display_articles(self, batches):
+        """加入新到达的各源文章，替换这些源之前（上次刷新或快照）的文章
+        
+        正在搜索时只显示匹配的文章（在文章库或聚合服务中搜索时重新搜索），分页时重新生成当前页。
+        旧文章都还在新结果中时只插入新增的文章，否则重建列表。
+        
+        Args:
+            batches: [(源 URL, 文章列表), ...]
+        """
+        new_runs = []
+        replaced = False
+        removed = False
+        for feed_url, articles in batches:
+            articles = sort_run(articles)
+            old = self.article_runs.get(feed_url)
+            self.article_runs[feed_url] = articles
+            self.stale_feeds.discard(feed_url)
+            if old is not None:
+                replaced = True
+                links = {article['link'] for article in articles}
+                removed = removed or any(article['link'] not in links for article in old)
+            if self.search_query is not None:
+                articles = [article for article in articles if matches(article, self.search_query)]
+            new_runs.append(articles)
+        
+        store_search = self.search_query is not None and self.fetcher.searchable
+        if store_search:
+            # 库中的搜索结果已经包括这些源的新文章，重新搜索而不是追加，避免重复
+            self.view_runs = [self.fetcher.search(self.search_query)]
+        elif replaced:
+            # 列表来源中这些源的旧文章换成新文章
+            self.view_runs = self.source_runs()
+        else:
+            self.view_runs.extend(run for run in new_runs if run)
+        if removed or (store_search and not self.page_size):
+            # 有旧文章不在新结果中（超出时间范围或被源删除），重建列表
+            self.render_view()
+        elif self.page_size:
+            self.schedule_page()
+        else:
+            self.show_articles([article for run in new_runs for article in run])
+    
+    def source_runs(self):
+        """按当前搜索词从各源文章生成列表来源（未搜索时为全部文章）"""
+        runs = list(self.article_runs.values())
+        if self.search_query is None:
+            return runs
+        return [[article for article in run if matches(article, self.search_query)] for run in runs]
+    
+    def article_total(self):
+        """各源的文章总数"""
+        return sum(len(run) for run in self.article_runs.values())
+    
+    def show_snapshot(self):
+        """显示上次刷新结果的快照，不等待网络"""
+        cutoff = (datetime.now() - timedelta(weeks=self.fetcher.weeks_limit)).timestamp()
+        runs = self.snapshot.load(cutoff, self.fetcher.rss_feeds)
+        if runs:
+            self.display_articles(list(runs.items()))
+            self.stale_feeds = set(runs)
+    
+    def render_view(self):
+        """按 view_runs 重建列表"""
+        if self.page_size:
+            self.page_links = None
+            self.show_page()
+        else:
+            self.clear_view()
+            self.show_articles(merge_newest(self.view_runs, presorted=True))
+        self.update_pager()
+    
+    def view_total(self):
+        """列表来源中的文章数"""
+        return sum(len(run) for run in self.view_runs)
+    
+    def page_count(self):
+        """分页时的总页数"""
+        return max((self.view_total() + self.page_size - 1) // self.page_size, 1)
+    
+    def schedule_page(self):
+        """新文章到达后在空闲时重新生成当前页，同一轮的多批文章只生成一次"""
+        if not self.page_scheduled:
+            self.page_scheduled = True
+            self.root.after_idle(self.show_page)
+    
+    def show_page(self):
+        """k 路归并出当前页，页面内容有变化时才重建列表"""
+        self.page_scheduled = False
+        self.page = min(self.page, self.page_count() - 1)
+        page = merge_newest(self.view_runs, self.page_size, self.page * self.page_size, presorted=True)
+        links = [article['link'] for article in page]
+        if links != self.page_links:
+            self.page_links = links
+            self.clear_view()
+            self.show_articles(page)
+        elif not self.insert_scheduled:
+            self.show_article_count()
+        self.update_pager()
+    
+    def prev_page(self):
+        if self.page > 0:
+            self.page -= 1
+            self.show_page()
+            self.show_article_count()
+    
+    def next_page(self):
+        if self.page < self.page_count() - 1:
+            self.page += 1
+            self.show_page()
+            self.show_article_count()
+    
+    def update_pager(self):
+        """更新页码和翻页按钮，不分页时隐藏"""
+        if not self.page_size:
+            self.pager_frame.grid_remove()
+            return
+        self.pager_frame.grid(row=2, column=0, columnspan=2, pady=(5, 0))
+        pages = self.page_count()
+        self.page_var.set(f"第 {self.page + 1}/{pages} 页")
+        self.prev_btn.config(state=tk.NORMAL if self.page > 0 else tk.DISABLED)
+        self.next_btn.config(state=tk.NORMAL if self.page < pages - 1 else tk.DISABLED)
+    
+    def set_page_size(self, page_size):
+        """修改每页文章数，按新的页大小重建列表"""
+        if page_size == self.page_size:
+            return
+        self.page_size = page_size
+        self.page = 0
+        self.render_view()
+        self.show_article_count()
+    
+    def show_articles(self, articles):
+        """把文章加入待插入队列，在空闲回调中分批插入列表，已显示的链接不再重复插入"""
+        self.pending_articles.extend(articles)
+        if not self.insert_scheduled:
+            self.insert_scheduled = True
+            self.root.after_idle(self.insert_pending)
+    
+    def clear_view(self):
+        """清空列表（一次删除所有行）"""
+        self.articles_tree.delete(*self.articles_tree.get_children())
+        self.view_keys = []
+        self.view_links = set()
+        self.item_articles = {}
+        self.pending_articles = []
+    
+    def insert_pending(self):
+        """按时间顺序插入最多 ROW_CHUNK 篇待插入的文章，还有剩余时让出主循环后继续"""
+        batch = self.pending_articles[:ROW_CHUNK]
+        del self.pending_articles[:ROW_CHUNK]
+        batch = [article for article in batch if article['link'] not in self.view_links]
+        
+        labels = relative_labels([article.get('timestamp') for article in batch])
+        for article, time_str in zip(batch, labels):
+            key = article_sort_key(article)
+            index = bisect.bisect_right(self.view_keys, key)
+            self.view_keys.insert(index, key)
+            self.view_links.add(article['link'])
+            
             title = article['title']
             if len(title) > 50:
                 title = title[:47] + "..."
             
-            time_str = format_time(article['published'])
-            
-            self.articles_tree.insert('', tk.END, values=(
+            item = self.articles_tree.insert('', index, values=(
                 title,
                 article['source'],
                 time_str
             ))
-        
-        self.status_var.set(f"找到 {len(self.articles)} 篇文章")
+            self.item_articles[item] = article
+        
+        if self.pending_articles:
+            self.root.after(1, self.insert_pending)
+            self.status_var.set(f"已显示 {len(self.view_keys)} 篇文章，正在显示...")
+        else:
+            self.insert_scheduled = False
+            self.show_article_count()
+    
+    def show_article_count(self):
+        """在状态栏显示文章数，刷新结束后附带汇总信息"""
+        page_info = f"（第 {self.page + 1}/{self.page_count()} 页）" if self.page_size else ""
+        if self.search_query is not None:
+            self.status_var.set(f"搜索“{self.search_query}”：找到 {self.view_total()} 篇文章{page_info}")
+        elif self.final_status is None and self.stale_feeds:
+            stale = sum(len(self.article_runs[feed_url]) for feed_url in self.stale_feeds)
+            saved = f"，{format_relative(self.snapshot.saved_at)}" if self.snapshot.saved_at else ""
+            self.status_var.set(f"已显示 {self.article_total()} 篇文章{page_info}，其中 {stale} 篇来自上次刷新{saved}")
+        elif self.final_status is None:
+            self.status_var.set(f"已获取 {self.article_total()} 篇文章{page_info}")
+        else:
+            self.status_var.set(f"找到 {self.article_total()} 篇文章{page_info}{self.final_status}")
+    
+    def merge_stored_articles(self, stored, late_count=0):
+        """把文章库中尚未显示的文章插入列表"""
+        shown = {article['link'] for feed_url, run in self.article_runs.items() if feed_url is not None for article in run}
+        self.final_status = f"，{late_count} 个源未完成（已标为橙色）" if late_count else ""
+        self.display_articles([(None, [article for article in stored if article['link'] not in shown])])
+        if not self.insert_scheduled:
+            self.show_article_count()
+    
+    def on_search_changed(self, *args):
+        """搜索框内容变化，停止输入 SEARCH_DELAY_MS 后再搜索"""
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY_MS, self.apply_search)
+    
+    def apply_search(self):
+        """按搜索框内容重建列表，清空搜索框时恢复显示全部文章
+        
+        启用文章库时在库中全文搜索（包括时间范围之外的历史文章），使用聚合服务时由服务搜索，
+        否则在本次获取的文章中筛选。
+        """
+        self.search_job = None
+        query = self.search_var.get().strip()
+        self.search_query = query or None
+        if self.search_query is not None and self.fetcher.searchable:
+            self.view_runs = [self.fetcher.search(query)]
+        else:
+            self.view_runs = self.source_runs()
+        self.page = 0
+        self.render_view()
+        self.root.after_idle(self.show_article_count)
+    
+    def selected_article(self):
+        """列表中选中的文章，没有选中时为 None"""
+        selection = self.articles_tree.selection()
+        return self.item_articles.get(selection[0]) if selection else None
     
     def open_article(self, event):
         """在浏览器中打开文章"""
-        selection = self.articles_tree.selection()
-        if selection:
-            item = self.articles_tree.item(selection[0])
-            title = item['values'][0]
-            
-            # 查找对应的完整文章信息
-            for article in self.articles:
-                if article['title'].startswith(title.replace('...', '')):
-                    webbrowser.open(article['link'])
-                    self.status_var.set(f"已打开: {article['title']}")
-                    break
+        article = self.selected_article()
+        if article:
+            webbrowser.open(article['link'])
+            self.status_var.set(f"已打开: {article['title']}")
+    
+    def show_article_menu(self, event):
+        """选中右键点击的文章并弹出菜单，没有缓存的文章不能打开缓存的网页"""
+        item = self.articles_tree.identify_row(event.y)
+        if not item:
+            return
+        self.articles_tree.selection_set(item)
+        article = self.item_articles.get(item)
+        cached = self.prefetcher is not None and article is not None and article['link'] in self.prefetcher.cache
+        self.article_menu.entryconfig(1, state=tk.NORMAL if cached else tk.DISABLED)
+        self.article_menu.tk_popup(event.x_root, event.y_root)
+    
+    def open_cached_article(self):
+        """在浏览器中打开预取的本地副本，不访问原网站"""
+        article = self.selected_article()
+        if not article or self.prefetcher is None:
+            return
+        path = self.prefetcher.cache.open_path(article['link'])
+        if path is None:
+            self.status_var.set(f"网页还没有缓存: {article['title']}")
+            return
+        webbrowser.open(Path(path).as_uri())
+        self.status_var.set(f"已打开缓存的网页: {article['title']}")
 
 
 def main():
@@ -0,0 +1,54 @@
+from collections import OrderedDict, deque
+
+
+class HostScheduler:
+    """按主机限制并发的请求调度器
+
+    同一主机的 URL 排在同一个队列里，各主机轮流出队，
+    每个主机同时进行的请求数不超过 per_host_limit。
+    """
+
+    def __init__(self, urls, per_host_limit, key):
+        """
+        初始化调度器
+
+        Args:
+            urls: 待请求的 URL 列表
+            per_host_limit: 每个主机的最大并发数，0 或 None 表示不限制
+            key: 从 URL 计算主机名的函数
+        """
+        self.per_host_limit = per_host_limit
+        self.key = key
+        self._queues = OrderedDict()
+        self._active = {}
+        for url in urls:
+            self._queues.setdefault(key(url), deque()).append(url)
+
+    def __len__(self):
+        """尚未出队的 URL 数"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def next_ready(self):
+        """取出下一个所在主机仍有空闲名额的 URL，没有则返回 None"""
+        for host in list(self._queues):
+            if self.per_host_limit and self._active.get(host, 0) >= self.per_host_limit:
+                continue
+            queue = self._queues.pop(host)
+            url = queue.popleft()
+            if queue:
+                # 放到队尾，实现各主机轮流出队
+                self._queues[host] = queue
+            self._active[host] = self._active.get(host, 0) + 1
+            return url
+        return None
+
+    def drain(self):
+        """取出所有尚未出队的 URL（放弃调度时使用）"""
+        urls = [url for queue in self._queues.values() for url in queue]
+        self._queues.clear()
+        return urls
+
+    def release(self, url):
+        """URL 请求结束，释放其主机的名额"""
+        host = self.key(url)
+        self._active[host] = max(self._active.get(host, 0) - 1, 0)
@@ -1,15 +1,16 @@
 import webbrowser
 import logging
 import sys
-from rss_core import load_config, RSSFetcher, format_time, get_domain
-
-# Windows 终端颜色支持
-if sys.platform == 'win32':
-    try:
-        from colorama import init
-        init()
-    except ImportError:
-        pass
+import argparse
+import time
+from pathlib import Path
+from datetime import datetime, timedelta
+from rss_core import load_config, RSSFetcher, ArticlePager, get_domain, merge_newest
+from date_parser import format_relative, relative_labels
+from aggregator_client import create_fetcher
+from snapshot import ArticleSnapshot
+from page_cache import create_prefetcher
+from text_search import matches
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,27 +28,49 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+def enable_colors():
+    """Windows 终端颜色支持（只在 Windows 上导入 colorama）"""
+    if sys.platform == 'win32':
+        try:
+            from colorama import init
+            init()
+        except ImportError:
+            pass
+
 def print_color(text, color=Colors.RESET):
     """打印带颜色的文本"""
     print(f"{color}{text}{Colors.RESET}")
 
 
-def display_articles(articles):
-    """显示文章列表"""
+def display_articles(articles, empty_message="没有找到一周内的文章。", pager=None, page=0):
+    """显示文章列表
+    
+    Args:
+        articles: 要显示的文章（分页时为当前页）
+        empty_message: 没有文章时的提示
+        pager: ArticlePager，分页时用于显示总数、页码和全局编号
+        page: 当前页（从 0 开始）
+    """
     if not articles:
-        print_color("\n没有找到一周内的文章。", Colors.YELLOW)
+        print_color("\n" + empty_message, Colors.YELLOW)
         return
 
     # 打印分隔线
     print_color("\n" + "=" * 80, Colors.CYAN)
-    print_color(f"  找到 {len(articles)} 篇文章", Colors.BOLD + Colors.GREEN)
+    if pager is not None and pager.pages > 1:
+        print_color(f"  找到 {pager.total} 篇文章（第 {page + 1}/{pager.pages} 页）", Colors.BOLD + Colors.GREEN)
+    else:
+        print_color(f"  找到 {len(articles)} 篇文章", Colors.BOLD + Colors.GREEN)
     print_color("=" * 80, Colors.CYAN)
     print()
     
-    for index, article in enumerate(articles, start=1):
+    # 整个列表的相对时间一次算好
+    labels = relative_labels([article.get('timestamp') for article in articles])
+    start = pager.offset(page) + 1 if pager is not None else 1
+    for index, (article, relative_time) in enumerate(zip(articles, labels), start=start):
         # 截取过长的标题
         title = article['title']
-        url = article.get('source', get_domain(article['link']))
+        url = article.get('source') or get_domain(article['link'])
         
         # 计算可用长度（总宽度100 - 序号 - 网址 - 时间 - 分隔符）
         max_title_length = 60
@@ -56,30 +79,39 @@ def display_articles(articles):
         
         # 格式化时间
         time_str = ""
-        if 'published' in article and article['published']:
-            relative_time = format_time(article['published'])
+        if relative_time:
             time_str = f" {Colors.YELLOW}[{relative_time}]{Colors.RESET}"
         
         # 格式化输出 - 同一行显示
         print(f"{Colors.BLUE}{index:3d}.{Colors.RESET} {Colors.BOLD}{title}{Colors.RESET}  {Colors.CYAN}[{url}]{Colors.RESET}{time_str}")
 
 
+def display_batch(articles):
+    """显示刚完成的一个源的文章（已按时间降序排列）"""
+    labels = relative_labels([article.get('timestamp') for article in articles])
+    for article, relative_time in zip(articles, labels):
+        title = article['title']
+        if len(title) > 60:
+            title = title[:57] + "..."
+        time_str = ""
+        if relative_time:
+            time_str = f" {Colors.YELLOW}[{relative_time}]{Colors.RESET}"
+        print(f"     {Colors.BLUE}+{Colors.RESET} {title}{time_str}")
 
-def main():
-    """主函数"""
-    # 打印欢迎界面
-    print_color("\n" + "╔" + "═" * 78 + "╗", Colors.CYAN)
-    print_color("║" + " " * 78 + "║", Colors.CYAN)
-    print_color("║" + " " * 31 + "RSS 订阅阅读器" + " " * 31 + "║", Colors.BOLD + Colors.CYAN)
-    print_color("║" + " " * 78 + "║", Colors.CYAN)
-    print_color("╚" + "═" * 78 + "╝\n", Colors.CYAN)
-    
-    # 加载配置
-    config = load_config()
+
+def refresh_articles(fetcher, deadline=None, snapshot=None, stale_runs=None):
+    """获取最新文章，每完成一个源立即显示该源的文章
     
-    # 创建 RSS 获取器
-    fetcher = RSSFetcher(config)
+    Args:
+        fetcher: RSSFetcher 或 AggregatorClient
+        deadline: 本次刷新的截止秒数
+        snapshot: ArticleSnapshot，刷新结果写入快照，下次启动时立即显示
+        stale_runs: 启动时显示的快照文章（源 URL -> 文章），这些文章不再逐条显示；
+                    本次没有完成的源（截止、取消或失败）继续使用快照中的文章
     
+    Returns:
+        list: 各源的文章列表，交给 fetcher.pager 分页
+    """
     # 设置进度回调
     total_feeds = len(fetcher.rss_feeds)
     completed_feeds = 0
@@ -96,64 +128,254 @@ def main():
             print(f"\n{Colors.GREEN}[OK]{Colors.RESET} 完成: {get_domain(feed_url)}")
         elif status == "error":
             print(f"\n{Colors.RED}[FAIL]{Colors.RESET} 失败: {get_domain(feed_url)}")
+        elif status == "open":
+            info = fetcher.breaker.info(feed_url)
+            retry_minutes = max(int((info.get('open_until', 0) - time.time()) / 60), 0)
+            print(f"\n{Colors.YELLOW}[SKIP]{Colors.RESET} 熔断: {get_domain(feed_url)}"
+                  f"（连续失败 {info.get('failures', 0)} 次，约 {retry_minutes} 分钟后重试）")
+        elif status == "late":
+            print(f"\n{Colors.YELLOW}[LATE]{Colors.RESET} 未完成: {get_domain(feed_url)}")
     
     fetcher.set_progress_callback(progress_callback)
     
-    print_color("正在获取最新文章，请稍候...", Colors.YELLOW)
+    print_color("正在获取最新文章，请稍候...（按 Ctrl+C 停止并显示已获取的文章）", Colors.YELLOW)
     print_color("-" * 80, Colors.CYAN)
     print()
     
-    # 采集最新文章
-    articles = fetcher.fetch_all_articles()
+    # 采集最新文章，每完成一个源立即显示该源的文章
+    stale_runs = dict(stale_runs or {})
+    known_links = {article['link'] for run in stale_runs.values() for article in run}
+    runs = []
+    batches = fetcher.iter_articles(deadline=deadline)
+    try:
+        for feed_url, feed_articles in batches:
+            if fetcher.feed_failed(feed_url):
+                # 失败的源继续使用快照中的文章，快照也不更新
+                continue
+            display_batch([article for article in feed_articles if article['link'] not in known_links])
+            runs.append(feed_articles)
+            stale_runs.pop(feed_url, None)
+            if snapshot is not None:
+                snapshot.update(feed_url, feed_articles)
+    except KeyboardInterrupt:
+        # 停止刷新，未完成的源记入 late_feeds
+        fetcher.cancel()
+        batches.close()
+        print_color("\n\n已停止刷新", Colors.YELLOW)
+    
+    if fetcher.late_feeds:
+        print_color(f"\n{len(fetcher.late_feeds)} 个源未在截止前完成，显示部分结果", Colors.YELLOW)
+    
+    print()
+    print_color("-" * 80, Colors.CYAN)
+    if snapshot is not None:
+        snapshot.save(fetcher.rss_feeds)
+    runs.extend(stale_runs.values())
+    return runs
+
+
+def show_snapshot(snapshot, fetcher, page_size):
+    """启动时立即显示上次刷新的文章（第一页），不等待网络
+    
+    Returns:
+        dict: 源 URL -> 快照中的文章，没有快照时为空字典
+    """
+    cutoff = (datetime.now() - timedelta(weeks=fetcher.weeks_limit)).timestamp()
+    runs = snapshot.load(cutoff, fetcher.rss_feeds)
+    if not runs:
+        return runs
+    pager = ArticlePager.from_runs(list(runs.values()), page_size)
+    saved = f"（{format_relative(snapshot.saved_at)}）" if snapshot.saved_at else ""
+    print_color(f"上次刷新的文章{saved}，正在获取更新：", Colors.YELLOW)
+    display_articles(pager.page(0), pager=pager)
+    print()
+    return runs
+
+
+def run_daemon(fetcher):
+    """常驻模式：按各源学习到的刷新间隔定时获取，只显示新文章"""
+    from refresh_scheduler import RefreshScheduler
+    
+    scheduler = RefreshScheduler(fetcher)
+    print_color("常驻模式已启动，按 Ctrl+C 退出", Colors.YELLOW)
+    print_color("-" * 80, Colors.CYAN)
+    
+    def on_new_articles(feed_url, articles):
+        print(f"{Colors.GREEN}[NEW]{Colors.RESET} {time.strftime('%H:%M:%S')} {get_domain(feed_url)}: {len(articles)} 篇新文章")
+        display_batch(articles)
     
-    # 按相对时间降序排序（最新的在前）
     try:
-        from email.utils import parsedate_to_datetime
-        from datetime import datetime
-        
-        def get_seconds_ago(article):
-            pub = article.get('published', '')
-            if not pub:
-                return float('inf')
-            try:
-                pub_time = parsedate_to_datetime(pub)
-                # 转换为本地时间
-                if hasattr(pub_time, 'tzinfo') and pub_time.tzinfo:
-                    now = datetime.now(pub_time.tzinfo)
-                else:
-                    now = datetime.now()
-                delta = now - pub_time
-                return delta.total_seconds()
-            except:
-                return float('inf')
-        
-        articles.sort(key=get_seconds_ago)
-    except Exception as e:
-        pass  # 排序失败不影响程序运行
+        scheduler.run(on_new_articles=on_new_articles)
+    except KeyboardInterrupt:
+        scheduler.save()
+        print_color("\n\n常驻模式已退出，再见！", Colors.YELLOW)
+
+
+def run_server(fetcher, config):
+    """聚合服务模式：后台刷新所有源，通过 HTTP JSON 接口提供文章"""
+    from aggregator import ArticleService, AggregatorServer
     
+    service = ArticleService(fetcher)
+    server = AggregatorServer(service, config.get('server_host', '127.0.0.1'), config.get('server_port', 8765))
+    url = server.start()
+    service.start()
+    print_color(f"聚合服务已启动: {url}/articles，按 Ctrl+C 退出", Colors.YELLOW)
+    print_color(f"客户端使用 python main.py --server {url} 或在配置中设置 server_url", Colors.CYAN)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        service.stop()
+        print_color("\n\n聚合服务已退出，再见！", Colors.YELLOW)
+
+
+def show_profile(profiler, fetcher, config):
+    """保存性能分析结果，输出各阶段的汇总"""
+    report = profiler.save(getattr(fetcher, 'last_metrics', None), config.get('process_parse', False))
     print()
     print_color("-" * 80, Colors.CYAN)
+    # 报告的前两段：总体情况和各阶段汇总
+    print('\n\n'.join(report.split('\n\n')[:2]))
+    print_color(f"完整报告: {profiler.report_path}，调用关系: {profiler.prof_path}", Colors.GREEN)
+    print_color("-" * 80, Colors.CYAN)
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="RSS 订阅阅读器（终端版）")
+    parser.add_argument('--daemon', action='store_true', help="常驻模式：按各源的更新频率自动刷新")
+    parser.add_argument('--serve', action='store_true',
+                        help="聚合服务模式：后台刷新所有源，通过 HTTP JSON 接口提供文章（地址取配置 server_host / server_port）")
+    parser.add_argument('--server', metavar='URL', default=None,
+                        help="从聚合服务读取文章，不直接请求各 RSS 源（默认取配置 server_url）")
+    parser.add_argument('--deadline', type=float, default=None,
+                        help="本次刷新的截止秒数，到时显示已获取的文章（默认取配置 refresh_deadline）")
+    parser.add_argument('--search', metavar='QUERY', default=None,
+                        help="搜索文章库中的文章（标题、摘要、来源），不刷新；未启用文章库时在本次获取的文章中筛选")
+    parser.add_argument('--page-size', type=int, default=None,
+                        help="每页显示的文章数，0 表示不分页（默认取配置 max_articles）")
+    parser.add_argument('--page', type=int, default=1, help="先显示第几页（默认为 1）")
+    parser.add_argument('--metrics', metavar='FILE', default=None,
+                        help="把本次刷新各源的耗时写入文件（.prom 为 Prometheus 文本格式，否则为 JSON）")
+    parser.add_argument('--profile', metavar='PREFIX', nargs='?', const='refresh_profile', default=None,
+                        help="剖析本次刷新（cProfile + tracemalloc），按获取、解析、筛选、排序、显示归类时间和内存，"
+                             "写入 PREFIX.txt 报告和 PREFIX.prof（默认 PREFIX 为 refresh_profile）")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    enable_colors()
+    
+    # 打印欢迎界面
+    print_color("\n" + "╔" + "═" * 78 + "╗", Colors.CYAN)
+    print_color("║" + " " * 78 + "║", Colors.CYAN)
+    print_color("║" + " " * 31 + "RSS 订阅阅读器" + " " * 31 + "║", Colors.BOLD + Colors.CYAN)
+    print_color("║" + " " * 78 + "║", Colors.CYAN)
+    print_color("╚" + "═" * 78 + "╝\n", Colors.CYAN)
+    
+    # 加载配置
+    config = load_config()
+    if args.server is not None:
+        config['server_url'] = args.server
+    
+    # 创建 RSS 获取器；服务和常驻模式直接请求各源，其他情况下配置了聚合服务时从服务读取
+    fetcher = RSSFetcher(config) if args.serve or args.daemon else create_fetcher(config)
+    if args.metrics:
+        fetcher.metrics_file = args.metrics
+    
+    if args.serve:
+        run_server(fetcher, config)
+        return
+    
+    if args.daemon:
+        run_daemon(fetcher)
+        return
+    
+    page_size = fetcher.max_articles if args.page_size is None else args.page_size
+    # 刷新后在后台预取最新文章的网页（配置 prefetch_pages 为 0 时不预取）
+    prefetcher = create_prefetcher(config, fetcher)
+    prefetch_runs = None
+    # 剖析从刷新到显示第一页的过程，不开启时不导入也不安装任何钩子
+    profiler = None
+    if args.profile:
+        from profiler import RefreshProfiler
+        
+        profiler = RefreshProfiler(args.profile)
+        profiler.start(fetcher)
+    if args.search and fetcher.searchable:
+        # 直接搜索文章库或聚合服务，不刷新
+        pager = ArticlePager.from_runs([fetcher.search(args.search)], page_size)
+        print_color(f"搜索“{args.search}”：", Colors.YELLOW)
+    else:
+        # 先显示上次刷新的快照，刷新时只逐条显示快照中没有的文章
+        snapshot = ArticleSnapshot(config.get('snapshot_file', 'snapshot.json'))
+        stale_runs = {} if args.search else show_snapshot(snapshot, fetcher, page_size)
+        runs = refresh_articles(fetcher, args.deadline, snapshot, stale_runs)
+        if args.search:
+            # 未启用文章库，只能在本次获取的文章中筛选
+            runs = [[article for article in run if matches(article, args.search)] for run in runs]
+            pager = ArticlePager.from_runs(runs, page_size)
+        else:
+            # 只读取要显示的一页：启用文章库时按页查询，否则 k 路归并各源的文章
+            pager = fetcher.pager(runs, page_size)
+            prefetch_runs = runs
 
     # 在终端输出文章列表
-    display_articles(articles)
+    page = min(max(args.page - 1, 0), pager.pages - 1)
+    articles = pager.page(page)
+    empty_message = "没有找到匹配的文章。" if args.search else "没有找到一周内的文章。"
+    display_articles(articles, empty_message, pager, page)
+    if profiler is not None:
+        profiler.stop()
+        show_profile(profiler, fetcher, config)
+    if prefetcher is not None and prefetch_runs:
+        prefetcher.start(merge_newest(prefetch_runs, prefetcher.limit))
 
     if not articles:
+        if prefetcher is not None:
+            prefetcher.stop()
         return
 
     # 等待用户输入选择哪篇文章查看
+    hint = "，n 下一页，p 上一页" if pager.pages > 1 else ""
+    if prefetcher is not None:
+        hint += "，c+编号 打开缓存的网页"
     while True:
         try:
-            choice = input(f"\n{Colors.GREEN}输入文章编号查看详情（输入0退出）: {Colors.RESET}").strip()
+            choice = input(f"\n{Colors.GREEN}输入文章编号查看详情（输入0退出{hint}）: {Colors.RESET}").strip().lower()
+            first = pager.offset(page) + 1
             if choice == "0":
                 print_color("\n再见！", Colors.YELLOW)
                 break
-            elif choice.isdigit() and 1 <= int(choice) <= len(articles):
-                selected_article = articles[int(choice) - 1]
+            elif choice in ("n", "p"):
+                new_page = page + 1 if choice == "n" else page - 1
+                if 0 <= new_page < pager.pages:
+                    page = new_page
+                    articles = pager.page(page)
+                    display_articles(articles, empty_message, pager, page)
+                else:
+                    print_color("已经是最后一页。" if choice == "n" else "已经是第一页。", Colors.YELLOW)
+            elif choice.isdigit() and first <= int(choice) < first + len(articles):
+                selected_article = articles[int(choice) - first]
                 print_color(f"\n正在打开: {selected_article['title']}", Colors.CYAN)
                 webbrowser.open(selected_article['link'])
                 print_color(f"[OK] 已在浏览器中打开: {selected_article['title']}", Colors.GREEN)
                 # 重新显示文章列表
-                display_articles(articles)
+                display_articles(articles, empty_message, pager, page)
+            elif (prefetcher is not None and choice.startswith("c") and choice[1:].strip().isdigit()
+                    and first <= int(choice[1:]) < first + len(articles)):
+                # 打开预取的本地副本，不访问原网站
+                selected_article = articles[int(choice[1:]) - first]
+                path = prefetcher.cache.open_path(selected_article['link'])
+                if path is None:
+                    print_color("这篇文章的网页还没有缓存，请输入编号在浏览器中打开。", Colors.YELLOW)
+                    continue
+                webbrowser.open(Path(path).as_uri())
+                print_color(f"[OK] 已打开缓存的网页: {selected_article['title']}", Colors.GREEN)
+                display_articles(articles, empty_message, pager, page)
             else:
                 print_color("无效的选择，请重新输入。", Colors.RED)
         except KeyboardInterrupt:
@@ -161,6 +383,9 @@ def main():
             break
         except Exception as e:
             print_color(f"发生错误: {str(e)}", Colors.RED)
+    
+    if prefetcher is not None:
+        prefetcher.stop()
 
 
 if __name__ == "__main__":
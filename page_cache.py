@@ -0,0 +1,363 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from content_decoder import ContentDecoder, BOUNDED_ACCEPT_ENCODING
+from dedup import canonical_url
+
+
+# 每个网页（解压后）的字节数上限，超过的不缓存
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+# 预取时每个请求之间的间隔（秒），给用户自己的请求让出带宽
+PREFETCH_PAUSE = 0.2
+
+# 预取下载时每次读取的字节数
+PREFETCH_CHUNK_SIZE = 65536
+
+# 索引格式版本，格式变化时旧索引直接忽略（对象文件在加载时清理）
+PAGE_CACHE_VERSION = 1
+
+_HEAD_TAG = re.compile(rb'<head[^>]*>', re.IGNORECASE)
+
+
+def create_prefetcher(config, fetcher):
+    """按配置创建网页预取器，prefetch_pages 为 0 或没有设置缓存目录时返回 None"""
+    limit = config.get('prefetch_pages', 0)
+    directory = config.get('page_cache_dir', 'page_cache')
+    if not limit or not directory:
+        return None
+    cache = PageCache(directory, config.get('page_cache_max_bytes', 100 * 1024 * 1024))
+    return PagePrefetcher(cache, fetcher, limit)
+
+
+class PageCache:
+    """文章网页的磁盘缓存
+
+    网页按内容的 SHA-256 保存为 gzip 压缩的对象文件（objects/ab/abcd….gz），
+    内容相同的网页（同一篇文章的不同链接）只保存一份。索引按规范化链接（dedup.canonical_url）
+    记录对象、大小、类型和下载时间，按最近使用的顺序排列；对象文件的总字节数超过 max_bytes 时
+    从最久没有使用的网页开始移除，缓存目录不会无限增长。
+
+    索引在第一次使用时才读取；读取时删除索引中没有记录的对象文件（上次退出前没有保存索引时留下的）。
+
+    索引文件格式：
+        {"version": 1, "pages": [[链接, 内容哈希, 压缩后字节数, Content-Type, 下载时间], ...]}
+        （按最近使用的顺序，最久没有使用的在前）
+    """
+
+    def __init__(self, directory='page_cache', max_bytes=100 * 1024 * 1024):
+        """
+        Args:
+            directory: 缓存目录
+            max_bytes: 对象文件（压缩后）的总字节数上限
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        # 规范化链接 -> [原链接, 内容哈希, 压缩后字节数, Content-Type, 下载时间]
+        self._entries = OrderedDict()
+        # 内容哈希 -> 引用它的链接数
+        self._refs = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._loaded = False
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, 'index.json')
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest + '.gz')
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def __contains__(self, link):
+        self._ensure_loaded()
+        return canonical_url(link) in self._entries
+
+    def _ensure_loaded(self):
+        """第一次使用时读取索引（调用方不能持有锁）"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+                    self._loaded = True
+
+    def _load(self):
+        """读取索引，清理没有记录的对象文件，按实际文件大小统计总字节数"""
+        pages = []
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == PAGE_CACHE_VERSION:
+                    pages = data['pages']
+            except Exception as e:
+                print(f"网页缓存索引加载失败: {str(e)}，忽略已缓存的网页")
+        for link, digest, size, content_type, fetched_at in pages:
+            path = self._object_path(digest)
+            if os.path.exists(path):
+                key = canonical_url(link)
+                self._entries.pop(key, None)
+                self._entries[key] = [link, digest, os.path.getsize(path), content_type, fetched_at]
+        for _, digest, size, _, _ in self._entries.values():
+            if digest not in self._refs:
+                self.total_bytes += size
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+
+        objects_dir = os.path.join(self.directory, 'objects')
+        if os.path.isdir(objects_dir):
+            for prefix in os.scandir(objects_dir):
+                if not prefix.is_dir():
+                    continue
+                for entry in os.scandir(prefix.path):
+                    if entry.name[:-len('.gz')] not in self._refs:
+                        self._remove_file(entry.path)
+        self._evict()
+
+    def save(self):
+        """保存索引（仅在有改动时写入）"""
+        if not self._loaded:
+            return True
+        with self._lock:
+            if not self._dirty:
+                return True
+            pages = list(self._entries.values())
+            self._dirty = False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': PAGE_CACHE_VERSION, 'pages': pages}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+            return True
+        except Exception as e:
+            print(f"保存网页缓存索引失败: {str(e)}")
+            return False
+
+    def put(self, link, body, content_type=''):
+        """缓存一个网页，超出总字节数上限时移除最久没有使用的网页
+
+        Args:
+            link: 文章链接
+            body: 网页内容（解压后）
+            content_type: 响应头 Content-Type
+
+        Returns:
+            bool: 是否已缓存（压缩后仍超过 max_bytes 或写入失败时为 False）
+        """
+        self._ensure_loaded()
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            stored = digest in self._refs
+        if not stored:
+            data = gzip.compress(body, compresslevel=6)
+            if len(data) > self.max_bytes:
+                return False
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"写入网页缓存失败: {str(e)}")
+                return False
+
+        key = canonical_url(link)
+        with self._lock:
+            if not os.path.exists(path):
+                # 检查之后对象被移除了（同一内容的链接刚被淘汰），下次预取时再缓存
+                return False
+            size = os.path.getsize(path)
+            old = self._entries.pop(key, None)
+            if old is not None and old[1] == digest:
+                # 内容没有变化，只更新下载时间
+                self._refs[digest] -= 1
+            elif old is not None:
+                self._release(old[1])
+            if digest not in self._refs:
+                self.total_bytes += size
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            self._entries[key] = [link, digest, size, content_type, time.time()]
+            self._dirty = True
+            self._evict()
+        return True
+
+    def get(self, link):
+        """读取缓存的网页，并记为最近使用
+
+        Returns:
+            tuple: (网页内容, Content-Type)，没有缓存时为 None
+        """
+        self._ensure_loaded()
+        key = canonical_url(link)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self._dirty = True
+            digest, content_type = entry[1], entry[3]
+        try:
+            with gzip.open(self._object_path(digest), 'rb') as f:
+                return f.read(), content_type
+        except (OSError, EOFError) as e:
+            print(f"读取网页缓存失败: {str(e)}")
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                    self._release(digest)
+            return None
+
+    def open_path(self, link):
+        """把缓存的网页解压到 view 目录，返回可以在浏览器中打开的文件路径
+
+        HTML 网页插入 <base href="原链接">，页面中的相对链接和图片仍指向原网站。
+        view 目录只保留最近打开的一个文件。
+
+        Returns:
+            str: 文件的绝对路径，没有缓存时为 None
+        """
+        cached = self.get(link)
+        if cached is None:
+            return None
+        body, content_type = cached
+        mime = (content_type or 'text/html').split(';')[0].strip().lower()
+        extension = '.html' if mime in ('text/html', 'application/xhtml+xml') else mimetypes.guess_extension(mime) or '.html'
+        if extension == '.html':
+            base = b'<base href="%s">' % link.replace('"', '%22').encode('utf-8')
+            match = _HEAD_TAG.search(body, 0, 4096)
+            body = body[:match.end()] + base + body[match.end():] if match else base + body
+
+        view_dir = os.path.join(self.directory, 'view')
+        os.makedirs(view_dir, exist_ok=True)
+        for entry in os.scandir(view_dir):
+            self._remove_file(entry.path)
+        path = os.path.join(view_dir, hashlib.sha256(link.encode('utf-8')).hexdigest()[:16] + extension)
+        with open(path, 'wb') as f:
+            f.write(body)
+        return os.path.abspath(path)
+
+    def _release(self, digest):
+        """链接不再引用 digest，没有其他引用时删除对象文件（调用方持有锁）"""
+        count = self._refs.get(digest, 0) - 1
+        if count > 0:
+            self._refs[digest] = count
+            return
+        self._refs.pop(digest, None)
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            self.total_bytes -= os.path.getsize(path)
+            self._remove_file(path)
+
+    def _evict(self):
+        """移除最久没有使用的网页，直到总字节数不超过上限（调用方持有锁）"""
+        while self.total_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._release(entry[1])
+            self._dirty = True
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class PagePrefetcher:
+    """在后台预取最新文章的网页，存入 PageCache
+
+    刷新结束后调用 start，一个后台线程按顺序逐个下载（同时只有一个请求，
+    请求之间间隔 PREFETCH_PAUSE 秒），已经缓存的文章跳过。下一次刷新开始时调用 cancel，
+    预取不会和刷新争抢连接和带宽。
+    """
+
+    def __init__(self, cache, fetcher, limit=20):
+        """
+        Args:
+            cache: PageCache 实例
+            fetcher: RSSFetcher 或 AggregatorClient，使用它的连接池和超时设置
+            limit: 每次预取的文章数（按时间降序取最新的）
+        """
+        self.cache = cache
+        self.fetcher = fetcher
+        self.limit = limit
+        self.fetched = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, articles):
+        """在后台预取 articles（按时间降序）中最新的 limit 篇，之前的预取先停止"""
+        self.cancel()
+        self._stop = threading.Event()
+        self.fetched = 0
+        self.failed = 0
+        links = [article['link'] for article in articles[:self.limit] if article['link']]
+        self._thread = threading.Thread(target=self._run, args=(links, self._stop), daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """停止预取，正在下载的网页下载完后丢弃"""
+        self._stop.set()
+
+    def stop(self, timeout=1.0):
+        """停止预取并保存缓存索引（退出前调用）"""
+        self.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.cache.save()
+
+    def _run(self, links, stop):
+        for link in links:
+            if stop.is_set():
+                break
+            if link in self.cache:
+                continue
+            try:
+                body, content_type = self._download(link, stop)
+            except Exception:
+                self.failed += 1
+                continue
+            if body is not None and not stop.is_set() and self.cache.put(link, body, content_type):
+                self.fetched += 1
+            stop.wait(PREFETCH_PAUSE)
+        self.cache.save()
+
+    def _download(self, link, stop):
+        """下载网页，超过 MAX_PAGE_BYTES、不是 200 或被取消时返回 (None, None)"""
+        timeout = (self.fetcher.connect_timeout, self.fetcher.request_timeout)
+        # 网页有 MAX_PAGE_BYTES 上限，只请求解压输出能限制的格式
+        headers = {'Accept-Encoding': BOUNDED_ACCEPT_ENCODING}
+        with self.fetcher.session.get(link, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                self.failed += 1
+                return None, None
+            decoder = ContentDecoder(response.headers.get('Content-Encoding'), PREFETCH_CHUNK_SIZE)
+            body = bytearray()
+            for chunk in response.raw.stream(PREFETCH_CHUNK_SIZE, decode_content=False):
+                for data in decoder.decode(chunk):
+                    body += data
+                if len(body) > MAX_PAGE_BYTES or stop.is_set():
+                    return None, None
+            for data in decoder.flush():
+                body += data
+            if len(body) > MAX_PAGE_BYTES:
+                return None, None
+            return bytes(body), response.headers.get('Content-Type', '')
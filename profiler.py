@@ -0,0 +1,345 @@
+import cProfile
+import functools
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+# 报告中的阶段，没有归入任何阶段的计入 other
+STAGES = ('fetch', 'parse', 'filter', 'store', 'sort', 'render', 'other')
+
+# 按模块归类：文件名（不含 .py）或所在的包目录
+STAGE_MODULES = {
+    'fetch': (
+        'requests', 'urllib3', 'http', 'socket', 'ssl', 'selectors', 'asyncio', 'aiohttp', 'yarl', 'multidict',
+        'concurrent', 'charset_normalizer', 'idna', 'certifi', 'content_decoder', 'feed_metrics', 'host_scheduler',
+    ),
+    'parse': ('feedparser', 'sgmllib', 'xml', 'html', 'stream_parser', 'date_parser', 'calendar'),
+    'filter': ('dedup', 'text_search', 'feed_cache'),
+    'store': ('article_store', 'sqlite3'),
+    'sort': ('heapq',),
+    'render': ('gui', 'tkinter', 'colorama'),
+}
+
+# 项目模块中按函数归类：模块 -> {函数名: 阶段}；'~' 为内置函数
+STAGE_FUNCTIONS = {
+    'rss_core': {
+        'fetch_articles_from_feed': 'fetch', 'fetch_articles_from_feed_async': 'fetch', 'session': 'fetch',
+        '_iter_body': 'fetch', '_aiter_body': 'fetch', '_read_body': 'fetch',
+        '_iter_threaded': 'fetch', '_fetch_all_async': 'fetch', '_iter_async': 'fetch',
+        'parse_feed_records': 'parse', '_parse_feed': 'parse', '_stream_response': 'parse',
+        '_process_response': 'filter', '_skip_open_feed': 'filter', '_dedup': 'filter',
+        'article_sort_key': 'sort', 'sort_run': 'sort', 'merge_newest': 'sort', 'page': 'sort', 'from_runs': 'sort',
+        'pager': 'sort', 'relative_labels': 'render', 'format_time': 'render',
+    },
+    'main': {
+        'display_articles': 'render', 'display_batch': 'render', 'print_color': 'render', 'show_snapshot': 'render',
+    },
+    '~': {"<method 'sort' of 'list' objects>": 'sort'},
+}
+
+# tracemalloc 保存的调用栈深度：每多一层分配的开销都明显增加，只保存分配所在的行，
+# 再按该行所在函数的阶段归类（函数的阶段由 cProfile 的调用关系得出）
+PROFILE_FRAMES = 1
+
+# 报告中每个阶段列出的函数数、内存占用最多的位置数
+TOP_FUNCTIONS = 5
+TOP_ALLOCATIONS = 10
+
+# stop() 等待工作线程中进行中的调用结束的最长秒数（如刚放入结果、正在退出的刷新线程）
+THREAD_JOIN_TIMEOUT = 1.0
+
+
+def _module_parts(filename):
+    """文件名（不含 .py）和所在的各级目录名"""
+    if filename == '~':
+        return '~', ()
+    head, name = os.path.split(filename)
+    return os.path.splitext(name)[0], tuple(head.replace('\\', '/').split('/'))
+
+
+def classify(filename, function):
+    """按模块和函数名判断属于哪个阶段，无法判断时返回 None"""
+    module, dirs = _module_parts(filename)
+    stage = STAGE_FUNCTIONS.get(module, {}).get(function)
+    if stage is not None:
+        return stage
+    for stage, modules in STAGE_MODULES.items():
+        if module in modules or any(part in modules for part in dirs):
+            return stage
+    return None
+
+
+class RefreshProfiler:
+    """刷新流程的 CPU 与内存剖析
+
+    start() 之后当前线程和经 wrap() 包装的函数（刷新的工作线程、asyncio 线程，
+    start(fetcher) 时通过 fetcher.thread_wrapper 包装）都用 cProfile 记录，其他线程不受影响；
+    同时用 tracemalloc 记录内存分配；stop() 把各线程的结果合并，按模块和函数名把
+    时间和内存归入 fetch / parse / filter / store / sort / render 各阶段，
+    内置函数和无法判断的函数归入调用它最多的函数所在的阶段。
+    每个线程的 cProfile 在包装的函数返回时由该线程自己停止，只合并已经停止的结果；
+    stop() 时仍在运行的调用（如截止后被放弃的工作线程）不计入。
+
+    只在开启剖析时创建，不开启时刷新流程中没有任何额外的开销。
+    进程池中的解析（process_parse）不在剖析范围内，只表现为等待结果的时间。
+    """
+
+    def __init__(self, path='refresh_profile'):
+        """
+        Args:
+            path: 输出文件的路径前缀，写入 <path>.prof（pstats 格式）和 <path>.txt（报告）
+        """
+        self.path = path
+        self.stats = None
+        self.snapshot = None
+        self.peak_memory = 0
+        self.duration = None
+        # 剖析的线程数、stop() 时仍在运行而没有计入的线程数
+        self.thread_count = 0
+        self.running_threads = 0
+        # 各线程的 cProfile（第一个是调用 start() 的线程），正在运行包装的函数的 cProfile
+        self._profiles = []
+        self._running = set()
+        self._lock = threading.Condition()
+        self._local = threading.local()
+        self._profiling = False
+        self._start = None
+        self._tracing = False
+        self._fetcher = None
+
+    @property
+    def prof_path(self):
+        return self.path + '.prof'
+
+    @property
+    def report_path(self):
+        return self.path + '.txt'
+
+    def wrap(self, func):
+        """包装在其他线程中运行的函数，剖析期间调用时在该线程的 cProfile 下运行
+
+        同一个线程的多次调用共用一个 cProfile，每次调用返回时由该线程停止；
+        未剖析时、或已在剖析中的线程（如调用 start() 的线程）直接调用。
+        """
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            local = self._local
+            if not self._profiling or getattr(local, 'active', False):
+                return func(*args, **kwargs)
+            profile = getattr(local, 'profile', None)
+            with self._lock:
+                if profile is None:
+                    profile = local.profile = cProfile.Profile()
+                    self._profiles.append(profile)
+                self._running.add(profile)
+            local.active = True
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                local.active = False
+                with self._lock:
+                    self._running.discard(profile)
+                    self._lock.notify_all()
+
+        return run
+
+    def start(self, fetcher=None):
+        """开始剖析当前线程和经 wrap() 包装的函数
+
+        Args:
+            fetcher: 要剖析的 RSSFetcher，它的工作线程中运行的函数经 wrap() 包装
+        """
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start(PROFILE_FRAMES)
+        tracemalloc.reset_peak()
+        if fetcher is not None and hasattr(fetcher, 'thread_wrapper'):
+            self._fetcher = fetcher
+            fetcher.thread_wrapper = self.wrap
+        self._start = time.perf_counter()
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        self._local.active = True
+        self._profiling = True
+        profile.enable()
+
+    def stop(self):
+        """停止剖析，合并各线程的结果
+
+        最多等待 THREAD_JOIN_TIMEOUT 秒让工作线程中进行中的调用结束，仍在运行的不计入。
+
+        Returns:
+            pstats.Stats: 合并后的统计
+        """
+        self._profiles[0].disable()
+        self._profiling = False
+        self._local.active = False
+        if self._fetcher is not None:
+            self._fetcher.thread_wrapper = None
+            self._fetcher = None
+        self.duration = time.perf_counter() - self._start
+        with self._lock:
+            self._lock.wait_for(lambda: not self._running, THREAD_JOIN_TIMEOUT)
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        self.snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        if self._tracing:
+            tracemalloc.stop()
+        with self._lock:
+            profiles = [profile for profile in self._profiles if profile not in self._running]
+            self.running_threads = len(self._running)
+        self.thread_count = len(profiles)
+        self.stats = pstats.Stats(profiles[0])
+        if len(profiles) > 1:
+            self.stats.add(*profiles[1:])
+        return self.stats
+
+    def _function_stages(self):
+        """每个函数所属的阶段：先按模块和函数名，否则取调用它耗时最多的函数的阶段"""
+        entries = self.stats.stats
+        stages = {}
+
+        def stage_of(func, visiting):
+            if func in stages:
+                return stages[func]
+            stage = classify(func[0], func[2])
+            if stage is None and func not in visiting and func in entries:
+                visiting.add(func)
+                callers = entries[func][4]
+                for caller in sorted(callers, key=lambda caller: callers[caller][3], reverse=True):
+                    stage = stage_of(caller, visiting)
+                    if stage is not None:
+                        break
+                visiting.discard(func)
+            if stage is not None or not visiting:
+                stages[func] = stage
+            return stage
+
+        for func in entries:
+            stage_of(func, set())
+        return {func: stage or 'other' for func, stage in stages.items()}
+
+    def stage_times(self, function_stages=None):
+        """各阶段的时间（各线程相加，包括等待网络和锁的时间）"""
+        function_stages = function_stages or self._function_stages()
+        times = dict.fromkeys(STAGES, 0.0)
+        for func, (_, _, tottime, _, _) in self.stats.stats.items():
+            times[function_stages[func]] += tottime
+        return times
+
+    def stage_memory(self, function_stages=None):
+        """stop() 时各阶段仍占用的内存（字节），按分配所在的函数归类"""
+        function_stages = function_stages or self._function_stages()
+        # 文件 -> 按起始行排序的 (起始行, 函数名)，用于从行号找到函数
+        functions = {}
+        for filename, line, name in function_stages:
+            functions.setdefault(filename, []).append((line, name))
+        for entries in functions.values():
+            entries.sort()
+        cache = {}
+
+        def frame_stage(frame):
+            key = (frame.filename, frame.lineno)
+            if key not in cache:
+                func = None
+                for line, name in functions.get(frame.filename, ()):
+                    if line > frame.lineno:
+                        break
+                    func = (frame.filename, line, name)
+                stage = classify(frame.filename, func[2] if func else None)
+                if stage is None and func is not None:
+                    stage = function_stages[func]
+                    stage = None if stage == 'other' else stage
+                cache[key] = stage
+            return cache[key]
+
+        memory = dict.fromkeys(STAGES, 0)
+        for trace in self.snapshot.traces:
+            stage = 'other'
+            # 调用栈按从外到内排列，从最内层开始找（默认只保存一层）
+            for frame in reversed(trace.traceback):
+                found = frame_stage(frame)
+                if found is not None:
+                    stage = found
+                    break
+            memory[stage] += trace.size
+        return memory
+
+    def report(self, metrics=None, process_parse=False):
+        """生成文本报告
+
+        Args:
+            metrics: 本次刷新的 RefreshMetrics（fetcher.last_metrics），列出各源分阶段计时作为对照
+            process_parse: 是否在进程池中解析，是时在报告中注明
+        """
+        function_stages = self._function_stages()
+        times = self.stage_times(function_stages)
+        memory = self.stage_memory(function_stages)
+        total_time = sum(times.values()) or 1
+        total_memory = sum(memory.values()) or 1
+        lines = [
+            f"刷新性能分析  {time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"墙钟时间 {self.duration:.3f} s，剖析了 {self.thread_count} 个线程"
+            f"（各线程的时间相加，包括等待网络和锁的时间，并发时总和会超过墙钟时间）",
+            f"内存峰值 {self.peak_memory / 1024 / 1024:.1f} MB",
+            "剖析时刷新会慢几倍，分配内存较多的阶段（如 feedparser 解析）放大得更多，各阶段的比例仅供参考",
+        ]
+        if self.running_threads:
+            lines.append(f"{self.running_threads} 个工作线程在结束剖析时仍在运行（如截止后被放弃的工作线程），未计入")
+        if process_parse:
+            lines.append("开启了 process_parse：进程池中的解析不在剖析范围内，只计入等待结果的时间")
+        lines += ['', f"{'阶段':<8}{'时间 (s)':>12}{'占比':>8}{'内存 (KB)':>14}{'占比':>8}"]
+        for stage in STAGES:
+            lines.append(
+                f"{stage:<8}{times[stage]:>12.3f}{times[stage] / total_time:>8.1%}"
+                f"{memory[stage] / 1024:>14.1f}{memory[stage] / total_memory:>8.1%}"
+            )
+        lines.append("（内存为刷新结束时仍占用的部分，按分配时所在的阶段归类）")
+
+        if metrics is not None:
+            phases = metrics.summary()['phases']
+            lines += ['', "刷新指标中各阶段的耗时（各源相加）：",
+                      '  ' + '  '.join(f"{phase} {seconds:.3f}s" for phase, seconds in phases.items())]
+
+        lines += ['', "各阶段耗时最多的函数（自身时间）："]
+        for stage in STAGES:
+            funcs = sorted(
+                (func for func in self.stats.stats if function_stages[func] == stage),
+                key=lambda func: self.stats.stats[func][2], reverse=True
+            )[:TOP_FUNCTIONS]
+            if not funcs:
+                continue
+            lines.append(f"[{stage}]")
+            for func in funcs:
+                calls, tottime = self.stats.stats[func][1], self.stats.stats[func][2]
+                lines.append(f"  {tottime:>8.3f} s {calls:>8} 次  {pstats.func_std_string(func)}")
+
+        lines += ['', "仍占用内存最多的位置："]
+        for stat in self.snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:>10.1f} KB {stat.count:>8} 块  {frame.filename}:{frame.lineno}")
+
+        lines += ['', f"调用关系：python -m pstats {self.prof_path}，或用 snakeviz 等工具打开"]
+        return '\n'.join(lines) + '\n'
+
+    def save(self, metrics=None, process_parse=False):
+        """写入 <path>.prof 和 <path>.txt
+
+        Returns:
+            str: 报告文本，写入失败时仍返回报告
+        """
+        text = self.report(metrics, process_parse)
+        try:
+            self.stats.dump_stats(self.prof_path)
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        except Exception as e:
+            print(f"保存性能分析结果失败: {str(e)}")
+        return text
@@ -0,0 +1,265 @@
+import heapq
+import json
+import os
+import re
+import threading
+import time
+
+from date_parser import parse_date
+
+
+# sy:updatePeriod 对应的秒数
+PERIOD_SECONDS = {
+    'hourly': 3600,
+    'daily': 86400,
+    'weekly': 7 * 86400,
+    'monthly': 30 * 86400,
+    'yearly': 365 * 86400,
+}
+
+# 一次刷新出错后等待多少秒再重试
+ERROR_RETRY_DELAY = 60
+
+_MAX_AGE_RE = re.compile(r'max-age\s*=\s*(\d+)', re.IGNORECASE)
+
+
+def hint_interval(hints, now=None):
+    """根据源自带的提示和 HTTP 缓存头计算最短刷新间隔
+
+    Args:
+        hints: RSSFetcher.feed_hints 中的记录，包含 ttl / update_period / update_frequency /
+               cache_control / expires / date
+        now: 当前时间戳，默认为 time.time()
+
+    Returns:
+        float: 在此之前不必重新获取的秒数，没有提示时返回 0
+    """
+    if not hints:
+        return 0
+    if now is None:
+        now = time.time()
+
+    intervals = []
+    try:
+        if hints.get('ttl'):
+            # RSS ttl 单位为分钟
+            intervals.append(float(hints['ttl']) * 60)
+    except (TypeError, ValueError):
+        pass
+
+    period = PERIOD_SECONDS.get(str(hints.get('update_period', '')).strip().lower())
+    if period:
+        try:
+            frequency = max(int(hints.get('update_frequency') or 1), 1)
+        except (TypeError, ValueError):
+            frequency = 1
+        intervals.append(period / frequency)
+
+    cache_control = hints.get('cache_control') or ''
+    match = _MAX_AGE_RE.search(cache_control)
+    if match and 'no-cache' not in cache_control.lower():
+        intervals.append(float(match.group(1)))
+    elif hints.get('expires'):
+        expires = parse_date(hints['expires'])
+        if expires is not None:
+            base = parse_date(hints['date']) if hints.get('date') else None
+            intervals.append(max(expires - (base or now), 0))
+
+    return max(intervals, default=0)
+
+
+def learned_interval(timestamps):
+    """根据条目的发布时间估算刷新间隔（平均发文间隔的一半）
+
+    Args:
+        timestamps: 最近条目的发布时间戳
+
+    Returns:
+        float: 刷新间隔秒数，条目不足两篇时返回 None
+    """
+    if len(timestamps) < 2:
+        return None
+    gap = (max(timestamps) - min(timestamps)) / (len(timestamps) - 1)
+    return gap / 2
+
+
+class RefreshScheduler:
+    """自适应刷新调度器
+
+    为每个源维护一个刷新间隔：根据条目的发文频率学习，并且不短于源的 ttl、
+    sy:updatePeriod 以及 Cache-Control / Expires 给出的间隔。
+    到期时间放在优先队列里，每次只获取已经到期的源。
+    """
+
+    def __init__(self, fetcher, state_file=None):
+        """
+        初始化调度器
+
+        Args:
+            fetcher: RSSFetcher 实例
+            state_file: 调度状态文件，默认取配置中的 schedule_file
+        """
+        config = fetcher.config
+        self.fetcher = fetcher
+        self.state_file = state_file if state_file is not None else config.get('schedule_file', 'schedule.json')
+        self.min_interval = config.get('min_refresh_interval', 600)
+        self.max_interval = config.get('max_refresh_interval', 86400)
+        self.default_interval = min(max(3600, self.min_interval), self.max_interval)
+        self.state = {}
+        self._heap = []
+        self._scheduled = set()
+        self.load()
+
+    def load(self):
+        """加载调度状态"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.state = data
+        except Exception as e:
+            print(f"调度状态加载失败: {str(e)}，重新开始")
+            self.state = {}
+
+    def save(self):
+        """保存调度状态"""
+        if not self.state_file:
+            return True
+        try:
+            tmp_path = self.state_file + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_file)
+            return True
+        except Exception as e:
+            print(f"保存调度状态失败: {str(e)}")
+            return False
+
+    def _sync_feeds(self):
+        """把新加入 rss_feeds 的源放进队列，新源立即到期"""
+        for feed_url in self.fetcher.rss_feeds:
+            if feed_url not in self._scheduled:
+                next_due = self.state.get(feed_url, {}).get('next_due', 0)
+                heapq.heappush(self._heap, (next_due, feed_url))
+                self._scheduled.add(feed_url)
+
+    def next_due(self):
+        """最早到期的时间戳，队列为空时返回 None"""
+        self._sync_feeds()
+        return self._heap[0][0] if self._heap else None
+
+    def due_feeds(self, now=None):
+        """取出所有已到期的源"""
+        if now is None:
+            now = time.time()
+        self._sync_feeds()
+        feeds = set(self.fetcher.rss_feeds)
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, feed_url = heapq.heappop(self._heap)
+            self._scheduled.discard(feed_url)
+            if feed_url in feeds:
+                due.append(feed_url)
+        return due
+
+    def update_feed(self, feed_url, articles, now=None):
+        """根据本次获取结果更新源的刷新间隔，并重新放入队列
+
+        Args:
+            feed_url: RSS 源 URL
+            articles: 本次获取到的文章
+            now: 当前时间戳
+
+        Returns:
+            list: 上次之后新出现的文章
+        """
+        if now is None:
+            now = time.time()
+        entry = self.state.get(feed_url, {})
+        previous = entry.get('interval', self.default_interval)
+        latest = entry.get('latest', 0)
+
+        learned = learned_interval([article['timestamp'] for article in articles])
+        if learned is None:
+            # 时间范围内没有足够的条目，逐步放慢
+            interval = previous * 1.5
+        else:
+            # 平滑，避免一次突发更新让间隔大幅波动
+            interval = (previous + learned) / 2
+        interval = max(interval, hint_interval(self.fetcher.feed_hints.get(feed_url), now))
+        interval = min(max(interval, self.min_interval), self.max_interval)
+
+        new_articles = [article for article in articles if article['timestamp'] > latest]
+        if articles:
+            latest = max(latest, max(article['timestamp'] for article in articles))
+
+        self.state[feed_url] = {'interval': interval, 'next_due': now + interval, 'latest': latest}
+        heapq.heappush(self._heap, (now + interval, feed_url))
+        self._scheduled.add(feed_url)
+        return new_articles
+
+    def defer_feed(self, feed_url, now=None):
+        """本次没有取得结果的源：保留学到的间隔和最新时间，稍后重试
+
+        源熔断时等到熔断结束（breaker 的 open_until）再试，否则 ERROR_RETRY_DELAY 秒后重试。
+        """
+        if now is None:
+            now = time.time()
+        open_until = self.fetcher.breaker.info(feed_url).get('open_until', 0)
+        next_due = max(open_until, now + ERROR_RETRY_DELAY)
+        entry = dict(self.state.get(feed_url, {}))
+        entry['next_due'] = next_due
+        self.state[feed_url] = entry
+        heapq.heappush(self._heap, (next_due, feed_url))
+        self._scheduled.add(feed_url)
+
+    def run_once(self, on_new_articles=None):
+        """获取所有已到期的源
+
+        Args:
+            on_new_articles: 回调函数，参数为 (feed_url, 新文章列表)
+
+        Returns:
+            int: 本次获取的源数量
+        """
+        due = self.due_feeds()
+        if not due:
+            return 0
+        try:
+            for feed_url, articles in self.fetcher.iter_articles(due):
+                if self.fetcher.feed_failed(feed_url):
+                    # 失败的源产出空列表，不能据此放慢刷新间隔
+                    self.defer_feed(feed_url)
+                    continue
+                new_articles = self.update_feed(feed_url, articles)
+                if new_articles and on_new_articles:
+                    on_new_articles(feed_url, new_articles)
+        finally:
+            self.save()
+        return len(due)
+
+    def run(self, stop_event=None, on_new_articles=None):
+        """持续运行，直到 stop_event 被设置
+
+        某一次刷新出错时打印错误，ERROR_RETRY_DELAY 秒后继续，不会停止后台刷新。
+
+        Args:
+            stop_event: threading.Event，为 None 时一直运行
+            on_new_articles: 回调函数，参数为 (feed_url, 新文章列表)
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.run_once(on_new_articles)
+            except Exception as e:
+                # 没有处理完的源仍按原来的到期时间留在队列中，下次重试
+                print(f"后台刷新出错: {str(e)}")
+                stop_event.wait(ERROR_RETRY_DELAY)
+                continue
+            next_due = self.next_due()
+            wait = self.min_interval if next_due is None else next_due - time.time()
+            # 至少等待 1 秒，最多 60 秒检查一次配置中新增的源
+            stop_event.wait(min(max(wait, 1), 60))
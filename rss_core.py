@@ -1,12 +1,64 @@
-import feedparser
-import requests
 import json
 import os
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import re
+import calendar
+import time
+import queue
+import socket
+import threading
+import heapq
+import itertools
+from functools import lru_cache
+
+
+from article import Article
+from date_parser import parse_date, format_relative
+from feed_cache import FeedCache
+from article_store import ArticleStore
+from host_scheduler import HostScheduler
+from stream_parser import StreamFeedParser, StreamParseError, clean_summary
+from circuit_breaker import CircuitBreaker
+from content_decoder import ContentDecoder, ContentDecodingError, ACCEPT_ENCODING, BOUNDED_ACCEPT_ENCODING
+from dedup import DedupIndex
+from feed_metrics import FeedTiming, RefreshMetrics, reset_connect_time, connect_time
+
+# 流式解析时每次读取的字节数
+STREAM_CHUNK_SIZE = 16384
+
+# 等待结果时检查取消和截止时间的间隔（秒）
+STOP_POLL_INTERVAL = 0.1
+
+# 截止时间之后单个请求的超时余量（秒）
+DEADLINE_GRACE = 1.0
+
+# 搜索最多返回的文章数
+SEARCH_LIMIT = 500
+
+class FeedTooLargeError(Exception):
+    """响应体超过 max_feed_bytes"""
+
+
+class RefreshCancelled(Exception):
+    """刷新已取消或超过截止时间，中止下载"""
+
+
+# 异步抓取模式依赖 aiohttp（可选），第一次使用 async 模式时由 load_aiohttp 导入
+aiohttp = None
+
+
+def load_aiohttp():
+    """导入 aiohttp（导入较慢，启动时不加载），未安装时返回 None"""
+    global aiohttp
+    if aiohttp is None:
+        try:
+            import aiohttp as module
+        except ImportError:
+            return None
+        aiohttp = module
+    return aiohttp
 
 
 def load_config():
@@ -24,7 +76,38 @@ def load_config():
         ],
         'weeks_limit': 1,
         'max_workers': 5,
-        'request_timeout': 30
+        'request_timeout': 30,
+        'connect_timeout': 10,
+        'cache_file': 'feed_cache.json',
+        'snapshot_file': 'snapshot.json',
+        'fetch_mode': 'thread',
+        'max_concurrency': 100,
+        'pool_connections': 10,
+        'pool_maxsize': 10,
+        'per_host_limit': 2,
+        'db_file': 'articles.db',
+        'stream_parse': False,
+        'max_feed_bytes': 10 * 1024 * 1024,
+        'process_parse': False,
+        'parse_processes': 0,
+        'schedule_file': 'schedule.json',
+        'min_refresh_interval': 600,
+        'max_refresh_interval': 86400,
+        'health_file': 'feed_health.json',
+        'breaker_threshold': 3,
+        'breaker_base_delay': 300,
+        'breaker_max_delay': 86400,
+        'refresh_deadline': 0,
+        'dedup': True,
+        'dedup_max_entries': 50000,
+        'prefetch_pages': 0,
+        'page_cache_dir': 'page_cache',
+        'page_cache_max_bytes': 100 * 1024 * 1024,
+        'metrics_file': '',
+        'max_articles': 0,
+        'server_url': '',
+        'server_host': '127.0.0.1',
+        'server_port': 8765
     }
     
     if os.path.exists(config_path):
@@ -54,8 +137,9 @@ def save_config(config):
         return False
 
 
+@lru_cache(maxsize=4096)
 def get_domain(url):
-    """从 URL 中提取域名"""
+    """从 URL 中提取域名（结果经过缓存，同一个源的 URL 只解析一次）"""
     if not url.startswith(('http://', 'https://')):
         parsed = urlparse('http://' + url)
     else:
@@ -67,77 +151,23 @@ def format_time(published_str):
     """格式化时间为相对时间
     
     Args:
-        published_str (str): 时间字符串，支持多种格式
+        published_str (str): 时间字符串，支持多种格式（见 date_parser.parse_date）
         
     Returns:
         str: 相对时间字符串（如"3天前"、"2小时前"）或日期
     """
     if not published_str:
         return ""
-        
-    published_time = None
     
-    # 尝试多种解析方式
-    try:
-        published_time = parsedate_to_datetime(published_str)
-    except:
-        try:
-            # 尝试使用 feedparser 的时间解析
-            parsed = feedparser.parse(published_str)
-            if parsed and isinstance(parsed, dict) and 'published_parsed' in parsed:
-                published_time = datetime(*parsed['published_parsed'][:6])
-        except:
-            pass
-    
-    # 如果所有解析方式都失败，尝试直接解析 ISO 格式
-    if published_time is None:
-        try:
-            # 处理 ISO 8601 格式 (如: 2026-01-09T00:11:26Z)
-            if 'T' in published_str:
-                match = re.match(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', published_str)
-                if match:
-                    published_time = datetime.fromisoformat(match.group(1))
-        except:
-            pass
-    
-    # 如果成功解析时间，计算相对时间
-    if published_time:
-        try:
-            # 如果有时区信息，使用时区；否则使用本地时间
-            if hasattr(published_time, 'tzinfo') and published_time.tzinfo:
-                now = datetime.now(published_time.tzinfo)
-            else:
-                now = datetime.now()
-            
-            delta = now - published_time
-            
-            total_seconds = int(delta.total_seconds())
-            days = total_seconds // 86400
-            hours = (total_seconds % 86400) // 3600
-            minutes = (total_seconds % 3600) // 60
-            
-            if days > 0:
-                if days >= 7:
-                    weeks = days // 7
-                    return f"{weeks}周前"
-                return f"{days}天前"
-            elif hours > 0:
-                return f"{hours}小时前"
-            elif minutes > 0:
-                return f"{minutes}分钟前"
-            else:
-                return "刚刚"
-        except:
-            pass
+    # 解析结果有 LRU 缓存，重复显示时不会重复解析
+    timestamp = parse_date(published_str)
+    if timestamp is not None:
+        return format_relative(timestamp)
     
     # 如果所有方式都失败，尝试提取日期部分
-    try:
-        # 尝试提取 YYYY-MM-DD 格式的日期
-        match = re.search(r'(\d{4}-\d{2}-\d{2})', published_str)
-        if match:
-            return match.group(1)
-    except:
-        pass
+    match = re.search(r'(\d{4}-\d{2}-\d{2})', published_str)
+    if match:
+        return match.group(1)
     
     # 最后返回原始字符串，但限制长度
     if len(published_str) > 20:
@@ -145,6 +175,173 @@ def format_time(published_str):
     return published_str
 
 
+def parse_feed_records(content, cutoff):
+    """用 feedparser 解析 RSS 内容，返回截止时间之后的条目
+    
+    模块级函数，可以提交到进程池：输入原始字节，输出紧凑的元组。
+    
+    Args:
+        content: 响应体
+        cutoff: 截止时间戳（UTC 秒）
+        
+    Returns:
+        tuple: ([(guid, title, link, published, timestamp, summary), ...], 更新频率提示, 统计)
+               提示为 ttl / sy:updatePeriod / sy:updateFrequency 的原始值，
+               统计为 {'parse': 解析秒数, 'filter': 筛选秒数, 'entries': 条目总数}
+    """
+    import feedparser
+    
+    records = []
+    start = time.perf_counter()
+    feed = feedparser.parse(content)
+    parsed = time.perf_counter()
+    channel = feed.get('feed', {})
+    hints = {
+        key: channel[name]
+        for key, name in (
+            ('ttl', 'ttl'),
+            ('update_period', 'sy_updateperiod'),
+            ('update_frequency', 'sy_updatefrequency'),
+        )
+        if channel.get(name)
+    }
+    
+    if 'entries' in feed:
+        for entry in feed.entries:
+            # 优先使用 published_parsed，其次使用 updated_parsed（均为 UTC）
+            parsed_time = None
+            if hasattr(entry, 'published_parsed') and entry.published_parsed:
+                parsed_time = entry.published_parsed
+            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+                parsed_time = entry.updated_parsed
+            
+            published = entry.get('published', entry.get('updated', ''))
+            if parsed_time:
+                timestamp = calendar.timegm(parsed_time)
+            else:
+                # feedparser 不认识的日期格式
+                timestamp = parse_date(published)
+            
+            if timestamp is not None and timestamp >= cutoff:
+                link = entry.get('link', '')
+                records.append((
+                    entry.get('id') or link, entry.get('title', ''), link, published, timestamp,
+                    clean_summary(entry.get('summary', ''))
+                ))
+    
+    stats = {
+        'parse': parsed - start,
+        'filter': time.perf_counter() - parsed,
+        'entries': len(feed.get('entries', [])),
+    }
+    return records, hints, stats
+
+
+def article_sort_key(article):
+    """文章排序键，按发布时间降序（最新的在前），没有时间戳的排在最后
+    
+    Args:
+        article: 文章字典
+        
+    Returns:
+        float: 发布时间戳的相反数
+    """
+    timestamp = article.get('timestamp')
+    if timestamp is None:
+        return float('inf')
+    return -timestamp
+
+
+def sort_run(articles, count=None):
+    """把一个源的文章整理为按时间降序
+    
+    源几乎总是按时间降序列出条目，已有序时原样返回（只检查一遍）；
+    乱序时只需要前 count 篇就用堆取出这几篇，否则排序整个源。
+    
+    Args:
+        articles: 一个源的文章列表
+        count: 只需要最新的多少篇，None 表示全部
+        
+    Returns:
+        list: 按时间降序的文章列表
+    """
+    keys = [article_sort_key(article) for article in articles]
+    if all(a <= b for a, b in zip(keys, keys[1:])):
+        return articles
+    if count is not None and count < len(articles):
+        return heapq.nsmallest(count, articles, key=article_sort_key)
+    return sorted(articles, key=article_sort_key)
+
+
+def merge_newest(runs, limit=None, offset=0, presorted=False):
+    """k 路归并各源的文章，按时间降序取第 offset 篇起的 limit 篇
+    
+    用堆归并已按时间降序的各源列表，只归并到 offset + limit 篇为止，
+    不需要把全部文章合并成一个列表再排序。
+    
+    Args:
+        runs: 各源的文章列表
+        limit: 最多返回的文章数，None 表示全部
+        offset: 跳过最新的多少篇
+        presorted: runs 是否已经由 sort_run 整理过
+        
+    Returns:
+        list: 文章列表
+    """
+    end = None if limit is None else offset + limit
+    if not presorted:
+        runs = [sort_run(run, end) for run in runs]
+    runs = [run for run in runs if run]
+    if len(runs) == 1:
+        return list(runs[0][offset:end])
+    return list(itertools.islice(heapq.merge(*runs, key=article_sort_key), offset, end))
+
+
+class ArticlePager:
+    """按时间降序分页浏览文章，只读取需要的页
+    
+    文章来自各源的列表时用 merge_newest 归并到所需页为止；来自文章库时按页查询。
+    page_size 为 0 时只有一页，包含全部文章。
+    """
+    
+    def __init__(self, page_size, total, fetch):
+        """
+        Args:
+            page_size: 每页的文章数，0 表示不分页
+            total: 文章总数
+            fetch: 读取函数，参数为 (offset, limit)，limit 为 None 表示全部
+        """
+        self.page_size = page_size or 0
+        self.total = total
+        self._fetch = fetch
+    
+    @classmethod
+    def from_runs(cls, runs, page_size):
+        """由各源的文章列表创建，乱序的源先整理一次，之后每页只做归并"""
+        runs = [sort_run(run) for run in runs if run]
+        return cls(
+            page_size, sum(len(run) for run in runs),
+            lambda offset, limit: merge_newest(runs, limit, offset, presorted=True)
+        )
+    
+    @property
+    def pages(self):
+        """页数，没有文章时为 1"""
+        if not self.page_size:
+            return 1
+        return max((self.total + self.page_size - 1) // self.page_size, 1)
+    
+    def offset(self, page):
+        """第 page 页（从 0 开始）第一篇文章的位置"""
+        return page * self.page_size
+    
+    def page(self, page):
+        """读取第 page 页（从 0 开始）"""
+        if not self.page_size:
+            return self._fetch(0, None)
+        return self._fetch(self.offset(page), self.page_size)
+
+
 class RSSFetcher:
     """RSS 文章获取器"""
     
@@ -162,30 +359,413 @@ class RSSFetcher:
             
         self.rss_feeds = self.config.get('rss_feeds', [])
         self.weeks_limit = self.config.get('weeks_limit', 1)
+        # 每页显示的文章数，0 表示不分页
+        self.max_articles = self.config.get('max_articles', 0)
         self.max_workers = self.config.get('max_workers', 5)
+        # request_timeout 为读取超时，连接超时单独设置
         self.request_timeout = self.config.get('request_timeout', 30)
+        self.connect_timeout = self.config.get('connect_timeout', 10)
+        # 抓取模式：'thread'（线程池）或 'async'（asyncio + aiohttp）
+        self.fetch_mode = self.config.get('fetch_mode', 'thread')
+        self.max_concurrency = self.config.get('max_concurrency', 100)
+        # 每个主机同时进行的最大请求数（0 表示不限制）
+        self.per_host_limit = self.config.get('per_host_limit', 2)
+        # 流式解析：边下载边解析 RSS 2.0 / Atom，条目早于截止时间后停止读取
+        self.stream_parse = self.config.get('stream_parse', False)
+        # 单个源响应体的字节数上限（流式解析时读到上限即停止，否则视为失败）
+        self.max_feed_bytes = self.config.get('max_feed_bytes', 10 * 1024 * 1024)
+        # 有大小上限时只请求解压输出能限制的格式
+        self.accept_encoding = BOUNDED_ACCEPT_ENCODING if self.max_feed_bytes else ACCEPT_ENCODING
+        # 在进程池中解析（feedparser 是纯 Python 的 CPU 密集操作），0 表示按 CPU 核数
+        self.process_parse = self.config.get('process_parse', False)
+        self.parse_processes = self.config.get('parse_processes', 0)
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+        
+        # 共享连接池，第一次请求时创建（见 session 属性）
+        self._session = None
+        self._session_lock = threading.Lock()
+        
+        # 条件请求缓存（ETag / Last-Modified / 内容哈希）
+        self.cache = FeedCache(self.config.get('cache_file', 'feed_cache.json'))
+        
+        # 本地文章库，为空时不保存历史文章
+        db_file = self.config.get('db_file', 'articles.db')
+        self.store = ArticleStore(db_file) if db_file else None
+        
+        # 跨源去重：同一篇文章只保留第一次见到它的源的那一份；
+        # 所有者随文章保存在文章库中，第一次去重时恢复，重新启动后仍然有效
+        self.dedup = None
+        if self.config.get('dedup', True):
+            max_entries = self.config.get('dedup_max_entries', 50000)
+            loader = (lambda: self.store.dedup_entries(max_entries)) if self.store else None
+            self.dedup = DedupIndex(max_entries, loader)
+        
+        # 按源熔断：连续失败后指数退避，熔断期间不再请求
+        self.breaker = CircuitBreaker(
+            self.config.get('health_file', 'feed_health.json'),
+            threshold=self.config.get('breaker_threshold', 3),
+            base_delay=self.config.get('breaker_base_delay', 300),
+            max_delay=self.config.get('breaker_max_delay', 86400)
+        )
+        
+        # 刷新截止时间（秒，0 表示不限制）与取消
+        self.refresh_deadline = self.config.get('refresh_deadline', 0)
+        self._deadline_at = None
+        self._cancel_event = threading.Event()
+        self._async_stop = None
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+        # 上次刷新截止或取消时仍未完成的源
+        self.late_feeds = []
+        
+        # 各源最近一次响应的更新频率提示，供 RefreshScheduler 使用
+        self.feed_hints = {}
         
-        # 进度回调函数
+        # 每次刷新的计时汇总，metrics_file 非空时刷新结束后写入（.prom 为 Prometheus 文本格式）
+        self.metrics_file = self.config.get('metrics_file', '')
+        self.last_metrics = None
+        self._metrics = None
+        
+        # 进度回调函数与事件回调函数
         self.progress_callback = None
+        self.event_callback = None
+        
+        # 包装在刷新的工作线程中运行的函数（如 RefreshProfiler.wrap），为 None 时直接运行
+        self.thread_wrapper = None
+    
+    @property
+    def session(self):
+        """共享连接池，多次刷新之间复用 keep-alive 连接
+        
+        第一次请求时才导入 requests 并创建，启动时不需要等待。
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from feed_metrics import TimedHTTPAdapter
+                    
+                    session = requests.Session()
+                    adapter = TimedHTTPAdapter(
+                        pool_connections=self.config.get('pool_connections', 10),
+                        pool_maxsize=self.config.get('pool_maxsize', 10)
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    # 声明支持的压缩格式，响应体由 ContentDecoder 边下载边解压
+                    session.headers['Accept-Encoding'] = self.accept_encoding
+                    self._session = session
+        return self._session
     
     def set_progress_callback(self, callback):
         """设置进度回调函数
         
         Args:
             callback: 回调函数，接收参数 (feed_url, status, progress)
-                     status: 'processing', 'completed', 'error'
+                     status: 'processing', 'completed', 'error',
+                             'open'（源已熔断，本次跳过，详情见 breaker.info），
+                             'late'（刷新截止或取消时仍未完成）
                      progress: 进度百分比 (0-100)
         """
         self.progress_callback = callback
     
+    def set_event_callback(self, callback):
+        """设置事件回调函数，接收结构化的刷新事件
+        
+        Args:
+            callback: 回调函数，接收一个事件字典，'type' 字段为：
+                     'refresh_start'（feed_count、mode），
+                     'feed_start'（feed_url），
+                     'feed_done'（FeedTiming.as_dict() 的全部字段：status、各阶段耗时、字节数、条目数等），
+                     'refresh_done'（summary，即 RefreshMetrics.summary()）
+                     回调可能在工作线程中调用
+        """
+        self.event_callback = callback
+    
+    def close(self):
+        """关闭连接池、解析进程池和文章库"""
+        if self._session is not None:
+            self._session.close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        if self.store:
+            self.store.close()
+    
     def _update_progress(self, feed_url, status, progress):
         """更新进度"""
         if self.progress_callback:
             self.progress_callback(feed_url, status, progress)
     
+    def _emit(self, event_type, **fields):
+        """发送结构化事件"""
+        if self.event_callback:
+            self.event_callback(dict(fields, type=event_type))
+    
+    def _in_worker(self, func):
+        """要在工作线程中运行的函数，设置了 thread_wrapper 时经它包装"""
+        wrapper = self.thread_wrapper
+        return func if wrapper is None else wrapper(func)
+    
+    def _start_feed(self, feed_url):
+        """开始获取一个源，返回它的计时"""
+        self._emit('feed_start', feed_url=feed_url)
+        return FeedTiming(feed_url)
+    
+    def _finish_feed(self, timing, status, error=None):
+        """结束一个源的计时，记入本次刷新的汇总"""
+        timing.finish(status, error)
+        metrics = self._metrics
+        # 被放弃的工作线程可能在下一次刷新开始后才结束，不计入新的汇总
+        if metrics is not None and timing.started_at >= metrics.started_at:
+            metrics.add(timing)
+        self._emit('feed_done', **timing.as_dict())
+    
+    def _skip_open_feed(self, feed_url, cutoff, timing):
+        """源处于熔断期时跳过请求，返回缓存中的文章；未熔断时返回 None"""
+        if self.breaker.allow(feed_url):
+            return None
+        self._update_progress(feed_url, 'open', 0)
+        cached = self.cache.lookup(feed_url, cutoff)
+        articles = [article for article in cached['articles'] if article['timestamp'] >= cutoff] if cached else []
+        articles, _ = self._dedup(feed_url, articles, timing)
+        timing.articles = len(articles)
+        self._finish_feed(timing, 'open')
+        return articles
+    
+    def _dedup(self, feed_url, articles, timing):
+        """去掉其他源已经有的同一篇文章（链接规范化后相同或标题近似），去掉的篇数记入 timing
+        
+        Returns:
+            tuple: (去重后的文章, 去重键)，未启用去重时去重键为 None
+        """
+        if self.dedup is None:
+            return articles, None
+        with timing.phase('filter'):
+            kept, keys = self.dedup.filter_with_keys(feed_url, articles)
+        timing.duplicates = len(articles) - len(kept)
+        return kept, keys
+    
+    def _record_failure(self, feed_url, message, timing):
+        """记录一次失败，连续失败达到阈值时熔断"""
+        self._update_progress(feed_url, 'error', 0)
+        print(message)
+        self._finish_feed(timing, 'error', message)
+        if self.breaker.record_failure(feed_url, message) == CircuitBreaker.OPEN:
+            self._update_progress(feed_url, 'open', 0)
+    
+    def _check_size(self, size):
+        """响应体超过 max_feed_bytes 时抛出 FeedTooLargeError"""
+        if self.max_feed_bytes and size > self.max_feed_bytes:
+            raise FeedTooLargeError(f"响应体超过 {self.max_feed_bytes} 字节")
+    
+    def _iter_body(self, response, timing, cancelled=None):
+        """逐块读取原始响应体并增量解压
+        
+        传输的字节数（压缩后）记入 timing.wire_bytes，压缩格式记入 timing.encoding。
+        解压后的数据块不超过 STREAM_CHUNK_SIZE，调用方检查 max_feed_bytes 时
+        压缩比很高的响应也会在超过上限后立即中止。
+        
+        Args:
+            response: requests 的流式响应
+            timing: 本次获取的 FeedTiming
+            cancelled: 本次刷新的取消事件，每读一块检查一次，已设置时抛出 RefreshCancelled
+                       （cancel() 关闭套接字后读到的连接结束不会被当作完整的响应体）
+        
+        Yields:
+            bytes: 解压后的数据块
+        """
+        # Content-Length 是压缩后的长度，超过上限时解压后只会更大
+        self._check_size(int(response.headers.get('Content-Length') or 0))
+        decoder = ContentDecoder(response.headers.get('Content-Encoding'), STREAM_CHUNK_SIZE)
+        timing.encoding = decoder.encoding
+        for chunk in response.raw.stream(STREAM_CHUNK_SIZE, decode_content=False):
+            if cancelled is not None and cancelled.is_set():
+                raise RefreshCancelled()
+            timing.wire_bytes += len(chunk)
+            yield from decoder.decode(chunk)
+        if cancelled is not None and cancelled.is_set():
+            raise RefreshCancelled()
+        yield from decoder.flush()
+    
+    async def _aiter_body(self, response, timing):
+        """_iter_body 的 aiohttp 版本（会话关闭了自动解压）"""
+        self._check_size(response.content_length or 0)
+        decoder = ContentDecoder(response.headers.get('Content-Encoding'), STREAM_CHUNK_SIZE)
+        timing.encoding = decoder.encoding
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            timing.wire_bytes += len(chunk)
+            for data in decoder.decode(chunk):
+                yield data
+        for data in decoder.flush():
+            yield data
+    
+    def _read_body(self, chunks, timing, body=b''):
+        """读取解压后的响应体，超过 max_feed_bytes 立即中止
+        
+        Args:
+            chunks: 解压后的数据块迭代器
+            timing: 本次获取的 FeedTiming，读取耗时计入 download
+            body: 已经读到的数据
+        """
+        body = bytearray(body)
+        with timing.phase('download'):
+            for chunk in chunks:
+                body += chunk
+                timing.bytes = len(body)
+                self._check_size(len(body))
+        return bytes(body)
+    
+    def _get_parse_pool(self):
+        """获取解析进程池（首次使用时创建）"""
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+                
+                self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes or os.cpu_count())
+            return self._parse_pool
+    
+    def _parse_feed(self, feed_url, content, cutoff, timing):
+        """解析 RSS 内容，返回截止时间之后的条目
+        
+        开启 process_parse 时在进程池中解析，下载线程只等待结果，不占用 GIL。
+        
+        Args:
+            feed_url: RSS 源 URL
+            content: 响应体
+            cutoff: 截止时间戳（UTC 秒）
+            timing: 本次获取的 FeedTiming，记录解析、筛选耗时和条目数
+            
+        Returns:
+            tuple: (文章列表, 更新频率提示)，文章的 timestamp 字段为发布时间戳（UTC 秒）
+        """
+        if self.process_parse:
+            records, hints, stats = self._get_parse_pool().submit(parse_feed_records, content, cutoff).result()
+        else:
+            records, hints, stats = parse_feed_records(content, cutoff)
+        timing.add('parse', stats['parse'])
+        timing.add('filter', stats['filter'])
+        timing.entries = stats['entries']
+        
+        source = get_domain(feed_url)
+        articles = [
+            Article(guid, title, link, published, source, timestamp, summary)
+            for guid, title, link, published, timestamp, summary in records
+        ]
+        return articles, hints
+    
+    def _process_response(self, feed_url, status_code, headers, content, cutoff, timing, articles=None, hints=None):
+        """处理 RSS 源的响应，返回截止时间之后的文章
+        
+        源返回 304 或响应体哈希与上次一致时直接使用缓存的文章，不再解析。
+        其他源已经有的同一篇文章（见 dedup.DedupIndex）被去掉，不返回也不写入文章库。
+        文章同时写入文章库，已存在且未变化的文章不会产生写入。
+        源的更新频率提示（ttl、sy:updatePeriod、Cache-Control、Expires）记录在 feed_hints 中。
+        
+        Args:
+            feed_url: RSS 源 URL
+            status_code: HTTP 状态码
+            headers: 响应头
+            content: 响应体（流式解析时为已读取的部分）
+            cutoff: 截止时间戳（UTC 秒）
+            timing: 本次获取的 FeedTiming，结束时记入本次刷新的汇总
+            articles: 流式解析已得到的文章，为 None 时按需解析 content
+            hints: 流式解析已得到的更新频率提示
+            
+        Returns:
+            list: 文章列表
+        """
+        cached = self.cache.lookup(feed_url, cutoff)
+        timing.http_status = status_code
+        
+        if status_code == 304:
+            # 源未更新，没有新文章；截止时间后移时去掉缓存中已经过期的文章
+            status = 'not_modified'
+            articles = cached['articles'] if cached else []
+            hints = cached.get('hints', {}) if cached else {}
+            with timing.phase('filter'):
+                articles = [article for article in articles if article['timestamp'] >= cutoff]
+        else:
+            status = 'ok'
+            content_hash = FeedCache.hash_content(content)
+            if articles is None:
+                if cached and cached.get('content_hash') == content_hash:
+                    # 服务器不支持校验值，但内容未变化
+                    status = 'unchanged'
+                    articles = cached['articles']
+                    hints = cached.get('hints', {})
+                else:
+                    articles, hints = self._parse_feed(feed_url, content, cutoff, timing)
+            with timing.phase('filter'):
+                articles = [article for article in articles if article['timestamp'] >= cutoff]
+            self.cache.update(
+                feed_url,
+                etag=headers.get('ETag'),
+                last_modified=headers.get('Last-Modified'),
+                content_hash=content_hash,
+                cutoff=cutoff,
+                articles=articles,
+                hints=hints or {}
+            )
+        
+        # 缓存中保留该源的全部文章，返回和入库的是去重之后的
+        articles, keys = self._dedup(feed_url, articles, timing)
+        self.feed_hints[feed_url] = dict(
+            hints or {},
+            cache_control=headers.get('Cache-Control'),
+            expires=headers.get('Expires'),
+            date=headers.get('Date')
+        )
+        if self.store:
+            with timing.phase('store'):
+                self.store.upsert(feed_url, articles, keys)
+        timing.articles = len(articles)
+        self._finish_feed(timing, status)
+        return articles
+    
+    def _stream_response(self, feed_url, headers, chunks, cutoff, timing):
+        """边下载边解析响应，条目早于截止时间或超过 max_feed_bytes 后停止读取
+        
+        不是 RSS 2.0 / Atom 或解析出错时，读完剩余内容交给 feedparser。
+        
+        Args:
+            feed_url: RSS 源 URL
+            headers: 响应头
+            chunks: 响应体数据块迭代器
+            cutoff: 截止时间戳（UTC 秒）
+            timing: 本次获取的 FeedTiming；边下载边解析时解析耗时计入 parse，其余计入 download
+            
+        Returns:
+            list: 文章列表
+        """
+        parser = StreamFeedParser(get_domain(feed_url), cutoff, self.max_feed_bytes)
+        start = time.perf_counter()
+        try:
+            try:
+                for chunk in chunks:
+                    with timing.phase('parse'):
+                        done = parser.feed(chunk)
+                    if done:
+                        break
+                with timing.phase('parse'):
+                    articles = parser.close()
+            finally:
+                timing.add('download', time.perf_counter() - start - timing.phases['parse'])
+                timing.bytes = parser.bytes_read
+                timing.entries = parser.entries
+        except StreamParseError:
+            # 回退到 feedparser，读完剩余内容
+            content = self._read_body(chunks, timing, parser.data)
+            return self._process_response(feed_url, 200, headers, content, cutoff, timing)
+        return self._process_response(feed_url, 200, headers, parser.data, cutoff, timing, articles, parser.hints)
+    
     def fetch_articles_from_feed(self, feed_url, one_week_ago):
         """从单个 RSS 源获取文章
         
+        带上缓存的 ETag / Last-Modified 发送条件请求，源返回 304 或响应体哈希
+        与上次一致时直接使用缓存的文章，不再解析。
+        
         Args:
             feed_url: RSS 源 URL
             one_week_ago: 时间截止点
@@ -194,88 +774,558 @@ class RSSFetcher:
             list: 文章列表
         """
         articles = []
+        cutoff = one_week_ago.timestamp()
+        # 记下本次刷新的取消事件，被放弃的工作线程晚些结束时不会影响下一次刷新
+        cancelled = self._cancel_event
+        if cancelled.is_set():
+            return articles
+        timing = self._start_feed(feed_url)
+        skipped = self._skip_open_feed(feed_url, cutoff, timing)
+        if skipped is not None:
+            return skipped
         self._update_progress(feed_url, 'processing', 0)
         
+        shutdown = None
         try:
-            response = requests.get(feed_url, timeout=self.request_timeout)
-            response.raise_for_status()
-            feed = feedparser.parse(response.content)
-            
-            if 'entries' in feed:
-                for entry in feed.entries:
-                    # 优先使用 published_parsed，其次使用 updated_parsed
-                    published_time = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_time = datetime(*entry.published_parsed[:6])
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        published_time = datetime(*entry.updated_parsed[:6])
-                    
-                    if published_time and published_time >= one_week_ago:
-                        article = {
-                            'title': entry.get('title', ''),
-                            'link': entry.get('link', ''),
-                            'published': entry.get('published', entry.get('updated', '')),
-                            'source': get_domain(feed_url)
-                        }
-                        articles.append(article)
-            
+            headers = self.cache.request_headers(feed_url, cutoff)
+            reset_connect_time()
+            start = time.perf_counter()
+            with self.session.get(
+                feed_url, headers=headers, timeout=self._timeouts(), stream=True
+            ) as response:
+                # 收到响应头为止的耗时（含建立连接）
+                timing.add('ttfb', time.perf_counter() - start)
+                timing.add('connect', connect_time())
+                timing.http_status = response.status_code
+                shutdown = self._socket_shutdown(response)
+                if shutdown is not None:
+                    with self._inflight_lock:
+                        self._inflight.add(shutdown)
+                if cancelled.is_set():
+                    raise RefreshCancelled()
+                if response.status_code != 304:
+                    response.raise_for_status()
+                chunks = self._iter_body(response, timing, cancelled)
+                if self.stream_parse and response.status_code != 304:
+                    articles = self._stream_response(feed_url, response.headers, chunks, cutoff, timing)
+                else:
+                    articles = self._process_response(
+                        feed_url, response.status_code, response.headers,
+                        self._read_body(chunks, timing), cutoff, timing
+                    )
+            self.breaker.record_success(feed_url)
             self._update_progress(feed_url, 'completed', 100)
             
-        except requests.RequestException as e:
-            self._update_progress(feed_url, 'error', 0)
-            print(f"网络请求错误 {feed_url}: {str(e)}")
         except Exception as e:
-            self._update_progress(feed_url, 'error', 0)
-            print(f"解析 {feed_url} 出错：{str(e)}")
+            if cancelled.is_set():
+                # 刷新已取消或超过截止时间，下载被中止，不计为失败
+                return []
+            # 此时 requests 已经导入（session 属性），这里只是取出异常类
+            from requests import RequestException
+            from urllib3.exceptions import HTTPError as URLLibHTTPError
+            
+            if isinstance(e, (RequestException, URLLibHTTPError, FeedTooLargeError, ContentDecodingError)):
+                self._record_failure(feed_url, f"网络请求错误 {feed_url}: {str(e)}", timing)
+            else:
+                self._record_failure(feed_url, f"解析 {feed_url} 出错：{str(e)}", timing)
+        finally:
+            if shutdown is not None:
+                with self._inflight_lock:
+                    self._inflight.discard(shutdown)
         
         return articles
     
-    def fetch_all_articles(self):
-        """从所有 RSS 源获取文章
+    async def fetch_articles_from_feed_async(self, session, feed_url, one_week_ago):
+        """从单个 RSS 源异步获取文章（asyncio 模式）
         
+        Args:
+            session: aiohttp.ClientSession
+            feed_url: RSS 源 URL
+            one_week_ago: 时间截止点
+            
         Returns:
-            list: 所有文章列表
+            list: 文章列表
         """
+        import asyncio
+        
         articles = []
-        one_week_ago = datetime.now() - timedelta(weeks=self.weeks_limit)
+        cutoff = one_week_ago.timestamp()
+        timing = self._start_feed(feed_url)
+        skipped = self._skip_open_feed(feed_url, cutoff, timing)
+        if skipped is not None:
+            return skipped
+        self._update_progress(feed_url, 'processing', 0)
         
-        total_feeds = len(self.rss_feeds)
-        completed_feeds = 0
+        # 解析、去重和写入文章库在默认线程池中进行，事件循环上只处理网络读写，
+        # 一个源的解析不会让其他进行中的请求停下来
+        loop = asyncio.get_running_loop()
+        
+        def parse_chunk(parser, chunk):
+            with timing.phase('parse'):
+                return parser.feed(chunk)
+        
+        def close_parser(parser):
+            with timing.phase('parse'):
+                return parser.close()
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_feed = {
-                executor.submit(self.fetch_articles_from_feed, feed_url, one_week_ago): feed_url 
-                for feed_url in self.rss_feeds
-            }
+        try:
+            headers = self.cache.request_headers(feed_url, cutoff)
+            start = time.perf_counter()
+            # 建立连接的耗时由 _trace_config 记入 timing
+            async with session.get(feed_url, headers=headers, trace_request_ctx=timing) as response:
+                timing.add('ttfb', time.perf_counter() - start)
+                timing.http_status = response.status
+                if response.status != 304:
+                    response.raise_for_status()
+                stream_articles = None
+                stream_hints = None
+                start = time.perf_counter()
+                chunks = self._aiter_body(response, timing)
+                if self.stream_parse and response.status != 304:
+                    parser = StreamFeedParser(get_domain(feed_url), cutoff, self.max_feed_bytes)
+                    try:
+                        async for chunk in chunks:
+                            if await loop.run_in_executor(None, self._in_worker(parse_chunk), parser, chunk):
+                                break
+                        stream_articles = await loop.run_in_executor(None, self._in_worker(close_parser), parser)
+                        stream_hints = parser.hints
+                        content = parser.data
+                    except StreamParseError:
+                        # 回退到 feedparser，读完剩余内容
+                        body = bytearray(parser.data)
+                        async for chunk in chunks:
+                            body += chunk
+                            self._check_size(len(body))
+                        content = bytes(body)
+                    finally:
+                        await chunks.aclose()
+                    timing.entries = parser.entries
+                    timing.add('download', time.perf_counter() - start - timing.phases['parse'])
+                else:
+                    body = bytearray()
+                    async for chunk in chunks:
+                        body += chunk
+                        timing.bytes = len(body)
+                        self._check_size(len(body))
+                    content = bytes(body)
+                    timing.add('download', time.perf_counter() - start)
+                timing.bytes = len(content)
+                # 开启 process_parse 时线程池中的线程只等待解析进程的结果
+                articles = await loop.run_in_executor(
+                    None, self._in_worker(self._process_response),
+                    feed_url, response.status, response.headers, content, cutoff, timing,
+                    stream_articles, stream_hints
+                )
+            self.breaker.record_success(feed_url)
+            self._update_progress(feed_url, 'completed', 100)
             
-            for future in as_completed(future_to_feed):
-                feed_url = future_to_feed[future]
+        except (aiohttp.ClientError, asyncio.TimeoutError, FeedTooLargeError, ContentDecodingError) as e:
+            self._record_failure(feed_url, f"网络请求错误 {feed_url}: {str(e) or type(e).__name__}", timing)
+        except Exception as e:
+            self._record_failure(feed_url, f"解析 {feed_url} 出错：{str(e)}", timing)
+        
+        return articles
+    
+    def _iter_threaded(self, one_week_ago, feed_urls):
+        """使用线程池从所有 RSS 源获取文章，每完成一个源产出一次
+        
+        由 HostScheduler 决定提交顺序，同一主机同时进行的请求不超过 per_host_limit，
+        等待中的源不会占用工作线程。到达刷新截止时间、调用 cancel() 或调用方提前停止迭代时，
+        不再提交新请求，中止进行中的下载，未完成的源记入 late_feeds。
+        
+        Yields:
+            tuple: (feed_url, 文章列表)
+        """
+        total_feeds = len(feed_urls)
+        completed_feeds = 0
+        scheduler = HostScheduler(feed_urls, self.per_host_limit, get_domain)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        future_to_feed = {}
+        fetch = self._in_worker(self.fetch_articles_from_feed)
+        
+        def submit_ready():
+            while len(future_to_feed) < self.max_workers:
+                feed_url = scheduler.next_ready()
+                if feed_url is None:
+                    break
+                future = executor.submit(fetch, feed_url, one_week_ago)
+                future_to_feed[future] = feed_url
+        
+        try:
+            submit_ready()
+            while future_to_feed and not self._should_stop():
+                done, _ = wait(future_to_feed, timeout=self._wait_timeout(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    feed_url = future_to_feed.pop(future)
+                    scheduler.release(feed_url)
+                    try:
+                        feed_articles = future.result()
+                        completed_feeds += 1
+                        progress = (completed_feeds / total_feeds) * 100
+                        self._update_progress(feed_url, 'completed', progress)
+                        yield feed_url, feed_articles
+                    except Exception as e:
+                        print(f"处理 {feed_url} 的结果时出错：{str(e)}")
+                submit_ready()
+        finally:
+            late = list(future_to_feed.values()) + scheduler.drain()
+            if late:
+                # 放弃未完成的源：中止进行中的下载，工作线程读到连接结束后自行退出
+                self._cancel_event.set()
+                self._abort_inflight()
+                self._mark_late(late)
+            # 不等待工作线程，截止或取消后立即返回
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _fetch_all_async(self, one_week_ago, feed_urls, on_batch):
+        """使用 asyncio 在单个线程内并发获取所有 RSS 源
+        
+        同时进行的请求数由 max_concurrency 限制，同一主机的请求数由 per_host_limit 限制，
+        本次刷新内的请求共享一个连接池。到达刷新截止时间或调用 cancel() 时取消未完成的请求，
+        未完成的源记入 late_feeds。
+        
+        Args:
+            one_week_ago: 时间截止点
+            feed_urls: 要获取的源
+            on_batch: 每完成一个源调用一次，参数为 (feed_url, 文章列表)
+        """
+        # asyncio 只在 async 模式下用到，不在启动时导入
+        import asyncio
+        
+        total_feeds = len(feed_urls)
+        completed_feeds = 0
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        host_semaphores = {}
+        if self.per_host_limit:
+            for feed_url in feed_urls:
+                host_semaphores.setdefault(get_domain(feed_url), asyncio.Semaphore(self.per_host_limit))
+        timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.request_timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        trace_config = self._trace_config()
+        
+        # cancel() 可能从其他线程调用，通过 call_soon_threadsafe 通知事件循环
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        self._async_stop = lambda: loop.call_soon_threadsafe(stop.set)
+        if self._cancel_event.is_set():
+            stop.set()
+        
+        # 关闭 aiohttp 的自动解压，由 ContentDecoder 边下载边解压并统计传输字节数
+        async with aiohttp.ClientSession(
+            timeout=timeout, connector=connector, trace_configs=[trace_config],
+            headers={'Accept-Encoding': self.accept_encoding}, auto_decompress=False
+        ) as session:
+            async def fetch_one(feed_url):
+                host_semaphore = host_semaphores.get(get_domain(feed_url))
+                # 先占主机名额再占全局名额，排队的源不会占用全局并发
+                if host_semaphore is not None:
+                    await host_semaphore.acquire()
                 try:
-                    feed_articles = future.result()
-                    articles.extend(feed_articles)
-                    completed_feeds += 1
-                    progress = (completed_feeds / total_feeds) * 100
-                    self._update_progress(feed_url, 'completed', progress)
-                except Exception as e:
-                    print(f"处理 {feed_url} 的结果时出错：{str(e)}")
-        
-        # 按相对时间降序排序（最新的在前）
-        def get_seconds_ago(article):
-            pub = article.get('published', '')
-            if not pub:
-                return float('inf')
+                    async with semaphore:
+                        feed_articles = await self.fetch_articles_from_feed_async(
+                            session, feed_url, one_week_ago
+                        )
+                finally:
+                    if host_semaphore is not None:
+                        host_semaphore.release()
+                return feed_url, feed_articles
+            
+            task_to_feed = {asyncio.ensure_future(fetch_one(feed_url)): feed_url for feed_url in feed_urls}
+            pending = set(task_to_feed)
+            stop_task = asyncio.ensure_future(stop.wait())
             try:
-                pub_time = parsedate_to_datetime(pub)
-                # 转换为本地时间
-                if hasattr(pub_time, 'tzinfo') and pub_time.tzinfo:
-                    now = datetime.now(pub_time.tzinfo)
-                else:
-                    now = datetime.now()
-                delta = now - pub_time
-                return delta.total_seconds()
-            except:
-                return float('inf')
+                while pending and not stop.is_set():
+                    remaining = self._remaining()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    done, _ = await asyncio.wait(
+                        pending | {stop_task}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task is stop_task:
+                            continue
+                        pending.discard(task)
+                        try:
+                            feed_url, feed_articles = task.result()
+                            completed_feeds += 1
+                            progress = (completed_feeds / total_feeds) * 100
+                            self._update_progress(feed_url, 'completed', progress)
+                            on_batch(feed_url, feed_articles)
+                        except Exception as e:
+                            print(f"处理结果时出错：{str(e)}")
+            finally:
+                self._async_stop = None
+                stop_task.cancel()
+                if pending:
+                    self._mark_late([task_to_feed[task] for task in pending])
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+    
+    @staticmethod
+    def _trace_config():
+        """aiohttp 请求跟踪：把建立连接的耗时记入请求的 FeedTiming（trace_request_ctx）"""
+        async def on_connection_create_start(session, context, params):
+            context.connect_start = time.perf_counter()
+        
+        async def on_connection_create_end(session, context, params):
+            timing = context.trace_request_ctx
+            if timing is not None:
+                timing.add('connect', time.perf_counter() - context.connect_start)
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+    
+    def _iter_async(self, one_week_ago, feed_urls):
+        """在后台线程中运行 asyncio 抓取，逐个产出完成的源"""
+        import asyncio
+        
+        batches = queue.Queue()
+        done = object()
+        finished = False
+        
+        def run():
+            try:
+                asyncio.run(self._fetch_all_async(
+                    one_week_ago, feed_urls, lambda feed_url, articles: batches.put((feed_url, articles))
+                ))
+            except Exception as e:
+                print(f"异步获取出错：{str(e)}")
+            finally:
+                batches.put(done)
+        
+        thread = threading.Thread(target=self._in_worker(run), daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is done:
+                    finished = True
+                    break
+                yield batch
+        finally:
+            if not finished:
+                # 调用方提前停止迭代，取消剩余请求
+                self.cancel()
+            thread.join()
+    
+    def feed_failed(self, feed_url):
+        """本次刷新中该源是否没有取得结果（请求或解析失败、被取消或未完成）
+        
+        这样的源由 iter_articles 产出空列表，并不表示源中没有文章，
+        调用方应继续使用该源之前的文章（快照、上次刷新的结果）。
+        """
+        metrics = self._metrics
+        status = metrics.status(feed_url) if metrics is not None else None
+        return status in (None, 'error', 'late')
+    
+    def _remaining(self):
+        """距离刷新截止时间的秒数，没有截止时间时返回 None"""
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - time.monotonic()
+    
+    def _should_stop(self):
+        """本次刷新是否已被取消或已到截止时间"""
+        if self._cancel_event.is_set():
+            return True
+        remaining = self._remaining()
+        return remaining is not None and remaining <= 0
+    
+    def _wait_timeout(self):
+        """等待下一个源完成的超时，保证能及时响应取消和截止时间"""
+        remaining = self._remaining()
+        if remaining is None:
+            return STOP_POLL_INTERVAL
+        return max(min(remaining, STOP_POLL_INTERVAL), 0)
+    
+    def _timeouts(self):
+        """本次请求的 (连接超时, 读取超时)
+        
+        有截止时间时不超过剩余秒数加 DEADLINE_GRACE，保证先由刷新循环判定超时并放弃该源，
+        请求本身的超时只用来回收被放弃的工作线程。
+        """
+        remaining = self._remaining()
+        if remaining is None:
+            return self.connect_timeout, self.request_timeout
+        limit = max(remaining, 0) + DEADLINE_GRACE
+        return min(self.connect_timeout, limit), min(self.request_timeout, limit)
+    
+    @staticmethod
+    def _socket_shutdown(response):
+        """返回关闭响应所用套接字读取方向的函数，可以从其他线程调用；取不到套接字时返回 None"""
+        raw = response.raw
+        if hasattr(raw, 'shutdown'):
+            # urllib3 2.3 起提供
+            return raw.shutdown
+        # 更早的 urllib3：套接字在 http.client 响应的文件对象中
+        sock = getattr(getattr(getattr(raw, '_fp', None), 'fp', None), 'raw', None)
+        sock = getattr(sock, '_sock', None)
+        if sock is None:
+            return None
+        return lambda: sock.shutdown(socket.SHUT_RDWR)
+    
+    def _abort_inflight(self):
+        """中止进行中的下载，阻塞在读取上的工作线程会立即读到连接结束
+        
+        只关闭套接字的读取方向，不调用 response.close()：工作线程正在读取时
+        close() 要等读取的锁，会一直阻塞到读取超时。响应仍由工作线程自己关闭。
+        """
+        with self._inflight_lock:
+            shutdowns = list(self._inflight)
+        for shutdown in shutdowns:
+            try:
+                shutdown()
+            except Exception:
+                pass
+    
+    def _mark_late(self, feed_urls):
+        """记录截止或取消时仍未完成的源"""
+        for feed_url in feed_urls:
+            self.late_feeds.append(feed_url)
+            self._update_progress(feed_url, 'late', 0)
+            self._finish_feed(FeedTiming(feed_url), 'late')
+    
+    def cancel(self):
+        """取消正在进行的刷新
+        
+        不再发起新请求，中止进行中的下载，已经完成的源照常返回，
+        未完成的源记入 late_feeds。可以从其他线程调用。
+        """
+        self._cancel_event.set()
+        stop = self._async_stop
+        if stop is not None:
+            stop()
+        self._abort_inflight()
+    
+    def iter_articles(self, feed_urls=None, deadline=None):
+        """从所有 RSS 源获取文章，每完成一个源立即产出该源的文章
+        
+        fetch_mode 为 'async' 且安装了 aiohttp 时使用 asyncio 抓取，
+        否则使用线程池。进度回调与 fetch_all_articles 相同。
+        到达截止时间或调用 cancel() 后停止，未完成的源记入 late_feeds，
+        并通过进度回调以 'late' 状态通知。
+        
+        Args:
+            feed_urls: 只获取这些源，None 表示 rss_feeds 中的全部
+            deadline: 本次刷新的截止秒数，None 时使用配置 refresh_deadline，0 表示不限制
+        
+        Yields:
+            tuple: (feed_url, 文章列表)，文章按时间降序排列；失败的源产出空列表，
+                   可以用 feed_failed 与确实没有文章的源区分
+        """
+        one_week_ago = datetime.now() - timedelta(weeks=self.weeks_limit)
+        if feed_urls is None:
+            feed_urls = self.rss_feeds
+        if deadline is None:
+            deadline = self.refresh_deadline
+        
+        self._cancel_event = threading.Event()
+        self._deadline_at = time.monotonic() + deadline if deadline else None
+        self.late_feeds = []
+        
+        if self.fetch_mode == 'async' and load_aiohttp() is not None:
+            mode = 'async'
+            batches = self._iter_async(one_week_ago, feed_urls)
+        else:
+            if self.fetch_mode == 'async':
+                print("未安装 aiohttp，使用线程池模式获取")
+            mode = 'thread'
+            batches = self._iter_threaded(one_week_ago, feed_urls)
+        metrics = self._metrics = RefreshMetrics(mode, len(feed_urls))
+        self._emit('refresh_start', feed_count=len(feed_urls), mode=mode)
+        
+        try:
+            for feed_url, feed_articles in batches:
+                # 源几乎总是已按时间降序，sort_run 只检查一遍，乱序时才排序
+                yield feed_url, sort_run(feed_articles)
+        finally:
+            batches.close()
+            self._deadline_at = None
+            self.cache.save()
+            self.breaker.save()
+            self.last_metrics = metrics.finish()
+            if self.metrics_file:
+                metrics.save(self.metrics_file)
+            self._emit('refresh_done', summary=metrics.summary())
+    
+    def load_articles(self, limit=None, offset=0):
+        """从文章库读取时间范围内的文章，不访问网络
+        
+        Args:
+            limit: 最多返回的文章数，None 表示全部
+            offset: 跳过最新的多少篇
+        
+        Returns:
+            list: 文章列表，按时间降序排列；未启用文章库时返回空列表
+        """
+        if not self.store:
+            return []
+        one_week_ago = datetime.now() - timedelta(weeks=self.weeks_limit)
+        return self.store.query(since=one_week_ago.timestamp(), feed_urls=self.rss_feeds, limit=limit, offset=offset)
+    
+    def pager(self, runs, page_size=None):
+        """分页浏览刷新结果
+        
+        启用文章库时按页从库中查询时间范围内的文章（包括本次请求失败的源之前保存的文章），
+        否则对各源的文章做 k 路归并。
+        
+        Args:
+            runs: 本次刷新各源的文章列表（iter_articles 产出的文章）
+            page_size: 每页的文章数，默认取配置 max_articles，0 表示不分页
+        
+        Returns:
+            ArticlePager
+        """
+        if page_size is None:
+            page_size = self.max_articles
+        if not self.store:
+            return ArticlePager.from_runs(runs, page_size)
+        one_week_ago = datetime.now() - timedelta(weeks=self.weeks_limit)
+        total = self.store.count(since=one_week_ago.timestamp(), feed_urls=self.rss_feeds)
+        return ArticlePager(page_size, total, lambda offset, limit: self.load_articles(limit, offset))
+    
+    @property
+    def searchable(self):
+        """能否在全部历史文章中搜索（启用了文章库）"""
+        return bool(self.store)
+    
+    def search(self, query, limit=SEARCH_LIMIT):
+        """在文章库中全文搜索当前订阅的文章（标题、摘要、来源），不限时间范围，不访问网络
+        
+        Args:
+            query: 搜索词，多个词以空格分隔，全部匹配才返回
+            limit: 最多返回的文章数
+        
+        Returns:
+            list: 文章列表，按时间降序排列；未启用文章库时返回空列表
+        """
+        if not self.store:
+            return []
+        return self.store.search(query, feed_urls=self.rss_feeds, limit=limit)
+    
+    def fetch_all_articles(self, deadline=None, limit=None, offset=0):
+        """从所有 RSS 源获取文章
+        
+        启用文章库时，刷新结果写入文章库后再从库中按时间范围读取，
+        本次请求失败的源也能返回已保存的文章。否则 k 路归并各源的文章，
+        只取需要的部分，不对全部文章排序。
+        
+        Args:
+            deadline: 本次刷新的截止秒数，见 iter_articles；超时未完成的源记入 late_feeds
+            limit: 最多返回的文章数，默认取配置 max_articles，0 表示全部
+            offset: 跳过最新的多少篇，与 limit 一起用于分页
+        
+        Returns:
+            list: 文章列表，按时间降序排列（最新的在前）
+        """
+        runs = [feed_articles for feed_url, feed_articles in self.iter_articles(deadline=deadline)]
         
-        articles.sort(key=get_seconds_ago)
+        if limit is None:
+            limit = self.max_articles
+        if self.store:
+            return self.load_articles(limit or None, offset)
         
-        return articles
\ No newline at end of file
+        return merge_newest(runs, limit or None, offset)
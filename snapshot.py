@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+
+from article import Article
+
+
+# 每个源最多保存的文章数（按时间降序取最新的）
+SNAPSHOT_FEED_LIMIT = 200
+
+# 快照格式版本，格式变化时旧快照直接忽略
+SNAPSHOT_VERSION = 1
+
+
+class ArticleSnapshot:
+    """上次刷新结果的快照，用于启动时立即显示文章
+
+    按源保存最新的 SNAPSHOT_FEED_LIMIT 篇文章，每篇只保存显示需要的字段
+    （标题、链接、发布时间、来源、时间戳），不保存摘要，读取比条件请求缓存快得多。
+    启动时先显示快照，后台刷新完成一个源就用新结果替换该源的快照文章。
+
+    文件格式：
+        {"version": 1, "saved_at": 时间戳,
+         "feeds": {源 URL: [[标题, 链接, 发布时间, 来源, 时间戳], ...]}}
+    """
+
+    def __init__(self, path='snapshot.json'):
+        """
+        Args:
+            path: 快照文件路径，为空时不读写
+        """
+        self.path = path
+        self.saved_at = None
+        self._runs = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._loaded = False
+
+    def load(self, cutoff=None, feed_urls=None):
+        """读取快照
+
+        Args:
+            cutoff: 只保留不早于该时间戳（UTC 秒）的文章
+            feed_urls: 只保留这些源的文章，None 表示全部
+
+        Returns:
+            dict: 源 URL -> 文章列表（按时间降序），没有快照或读取失败时为空字典
+        """
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SNAPSHOT_VERSION:
+                return {}
+            runs = {}
+            for feed_url, rows in data['feeds'].items():
+                if feed_urls is not None and feed_url not in feed_urls:
+                    continue
+                run = [
+                    Article(link, title, link, published, source, timestamp)
+                    for title, link, published, source, timestamp in rows
+                    if cutoff is None or (timestamp or 0) >= cutoff
+                ]
+                if run:
+                    runs[feed_url] = run
+        except Exception as e:
+            print(f"快照文件加载失败: {str(e)}，忽略快照")
+            return {}
+        with self._lock:
+            # 读取之前已经 update 的源以新结果为准
+            self._runs = {**runs, **self._runs}
+            self.saved_at = data.get('saved_at')
+        return runs
+
+    def update(self, feed_url, articles):
+        """用一个源本次刷新的文章（按时间降序）替换它在快照中的文章"""
+        with self._lock:
+            self._runs[feed_url] = list(articles[:SNAPSHOT_FEED_LIMIT])
+            self._dirty = True
+
+    def save(self, feed_urls=None):
+        """保存快照（仅在有改动时写入）
+
+        Args:
+            feed_urls: 当前订阅的源，已经删除的源不再保存；None 表示全部保留
+        """
+        if not self.path:
+            return True
+        if not self._loaded:
+            # 保留本次没有刷新的源在快照中的文章
+            self.load()
+        with self._lock:
+            if not self._dirty:
+                return True
+            if feed_urls is not None:
+                feed_urls = set(feed_urls)
+                self._runs = {feed_url: run for feed_url, run in self._runs.items() if feed_url in feed_urls}
+            feeds = {
+                feed_url: [
+                    [article['title'], article['link'], article['published'], article['source'], article['timestamp']]
+                    for article in run
+                ]
+                for feed_url, run in self._runs.items()
+            }
+            self._dirty = False
+        data = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'feeds': feeds}
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.saved_at = data['saved_at']
+            return True
+        except Exception as e:
+            print(f"保存快照失败: {str(e)}")
+            return False
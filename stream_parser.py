@@ -0,0 +1,191 @@
+import html
+import re
+import xml.etree.ElementTree as ET
+
+from article import Article
+from date_parser import parse_date
+
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+SY_NS = '{http://purl.org/rss/1.0/modules/syndication/}'
+
+# 频道级更新频率提示：标签 -> hints 中的键
+HINT_TAGS = {
+    'ttl': 'ttl',
+    SY_NS + 'updatePeriod': 'update_period',
+    SY_NS + 'updateFrequency': 'update_frequency',
+}
+
+
+# 文章摘要保留的字符数（用于搜索，不用于阅读）
+SUMMARY_LENGTH = 300
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def clean_summary(text):
+    """把条目描述转为纯文本摘要：去掉 HTML 标签、解码实体、合并空白并截断"""
+    if not text:
+        return ''
+    text = html.unescape(_TAG_RE.sub(' ', text))
+    return _SPACE_RE.sub(' ', text).strip()[:SUMMARY_LENGTH]
+
+
+class StreamParseError(Exception):
+    """流式解析无法处理该源（格式错误或不是 RSS 2.0 / Atom），需要回退到 feedparser"""
+
+
+class StreamFeedParser:
+    """RSS 2.0 / Atom 增量解析器
+
+    边下载边解析，遇到连续 old_entry_limit 篇早于截止时间的条目即停止读取，
+    已读取的字节数超过 max_bytes 时同样停止。大多数源按时间倒序排列条目，
+    内存和解析时间只与新条目数量相关，与归档大小无关。
+
+    用法::
+
+        parser = StreamFeedParser(source, cutoff)
+        for chunk in chunks:
+            if parser.feed(chunk):
+                break
+        articles = parser.close()
+    """
+
+    def __init__(self, source, cutoff, max_bytes=None, old_entry_limit=3):
+        """
+        初始化解析器
+
+        Args:
+            source: 文章来源（域名）
+            cutoff: 截止时间戳（UTC 秒）
+            max_bytes: 最多读取的字节数，None 表示不限制
+            old_entry_limit: 连续遇到多少篇旧条目后停止
+        """
+        self.source = source
+        self.cutoff = cutoff
+        self.max_bytes = max_bytes
+        self.old_entry_limit = old_entry_limit
+        self.articles = []
+        self.hints = {}
+        self.chunks = []
+        self.bytes_read = 0
+        # 已读到的条目数（含早于截止时间的）
+        self.entries = 0
+        self.truncated = False
+        self._old_entries = 0
+        self._format = None
+        self._done = False
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+
+    @property
+    def data(self):
+        """已读取的原始字节"""
+        return b''.join(self.chunks)
+
+    def feed(self, chunk):
+        """输入一段数据
+
+        Returns:
+            bool: 已经可以停止读取时返回 True
+        """
+        if self._done:
+            return True
+        self.chunks.append(chunk)
+        self.bytes_read += len(chunk)
+        try:
+            self._parser.feed(chunk)
+            self._handle_events()
+        except ET.ParseError as e:
+            raise StreamParseError(str(e))
+        if not self._done and self.max_bytes and self.bytes_read >= self.max_bytes:
+            self.truncated = True
+            self._done = True
+        return self._done
+
+    def close(self):
+        """结束解析，返回截止时间之后的文章"""
+        if not self._done:
+            try:
+                self._parser.close()
+                self._handle_events()
+            except ET.ParseError as e:
+                raise StreamParseError(str(e))
+        if self._format is None:
+            raise StreamParseError('未识别的源格式')
+        return self.articles
+
+    def _handle_events(self):
+        for event, elem in self._parser.read_events():
+            if self._done:
+                return
+            if event == 'start':
+                if self._format is None:
+                    if elem.tag == 'rss':
+                        self._format = 'rss'
+                    elif elem.tag == ATOM_NS + 'feed':
+                        self._format = 'atom'
+                    else:
+                        raise StreamParseError(f'不支持的源格式: {elem.tag}')
+                continue
+
+            if elem.tag in HINT_TAGS and elem.text and elem.text.strip():
+                self.hints[HINT_TAGS[elem.tag]] = elem.text.strip()
+            elif self._format == 'rss' and elem.tag == 'item':
+                self._add_entry(*self._rss_fields(elem))
+                elem.clear()
+            elif self._format == 'atom' and elem.tag == ATOM_NS + 'entry':
+                self._add_entry(*self._atom_fields(elem))
+                elem.clear()
+
+    def _add_entry(self, guid, title, link, published, summary):
+        self.entries += 1
+        if not published:
+            return
+        timestamp = parse_date(published)
+        if timestamp is None:
+            # 日期格式不认识，交给 feedparser
+            raise StreamParseError(f'无法解析的日期: {published}')
+
+        if timestamp < self.cutoff:
+            self._old_entries += 1
+            if self._old_entries >= self.old_entry_limit:
+                self._done = True
+            return
+
+        self._old_entries = 0
+        self.articles.append(Article(guid or link, title, link, published, self.source, timestamp, clean_summary(summary)))
+
+    @staticmethod
+    def _text(elem, tag):
+        return (elem.findtext(tag) or '').strip()
+
+    def _rss_fields(self, item):
+        published = (
+            self._text(item, 'pubDate')
+            or self._text(item, DC_NS + 'date')
+            or self._text(item, ATOM_NS + 'updated')
+        )
+        return (
+            self._text(item, 'guid'),
+            self._text(item, 'title'),
+            self._text(item, 'link'),
+            published,
+            self._text(item, 'description'),
+        )
+
+    def _atom_fields(self, entry):
+        link = ''
+        for link_elem in entry.findall(ATOM_NS + 'link'):
+            if link_elem.get('rel', 'alternate') == 'alternate':
+                link = link_elem.get('href', '')
+                break
+        published = self._text(entry, ATOM_NS + 'published') or self._text(entry, ATOM_NS + 'updated')
+        return (
+            self._text(entry, ATOM_NS + 'id'),
+            self._text(entry, ATOM_NS + 'title'),
+            link,
+            published,
+            self._text(entry, ATOM_NS + 'summary') or self._text(entry, ATOM_NS + 'content'),
+        )
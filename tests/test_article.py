@@ -0,0 +1,63 @@
+import pickle
+
+from article import Article
+
+
+def old_dict():
+    """文章以前的字典形式"""
+    return {
+        'guid': 'https://example.com/1',
+        'title': '标题',
+        'link': 'https://example.com/1',
+        'published': '2024-01-02 03:04',
+        'source': '示例',
+        'timestamp': 1704164640.0,
+        'summary': '摘要',
+    }
+
+
+def test_equals_old_dict():
+    data = old_dict()
+    article = Article.from_dict(data)
+    assert article == data
+    assert data == article
+    assert dict(article) == data
+    assert article == Article(**data)
+
+
+def test_differs_from_changed_dict():
+    article = Article.from_dict(old_dict())
+    changed = dict(old_dict(), title='其他标题')
+    assert article != changed
+    assert article != Article.from_dict(changed)
+    assert article != dict(old_dict(), extra='多出的字段')
+    assert article != 'https://example.com/1'
+
+
+def test_mapping_access():
+    article = Article.from_dict(old_dict())
+    assert article['title'] == '标题'
+    assert article.get('missing') is None
+    assert 'summary' in article
+    assert '__init__' not in article
+    try:
+        article['__init__']
+    except KeyError:
+        pass
+    else:
+        raise AssertionError('非字段的名称应抛出 KeyError')
+
+
+def test_unhashable_like_dict():
+    article = Article.from_dict(old_dict())
+    try:
+        hash(article)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('Article 应与字典一样不可哈希')
+
+
+def test_pickle_round_trip():
+    article = Article.from_dict(old_dict())
+    assert pickle.loads(pickle.dumps(article)) == article
@@ -0,0 +1,70 @@
+import re
+
+
+# 英文单词/数字，以及连续的中日韩文字
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+')
+
+
+def _runs(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def tokenize(text):
+    """把文本切分为索引词
+
+    英文和数字按单词切分；连续的中文切成相邻两字的二元组，再加上最后一个字，
+    使每个字都是某个词的开头，单字查询可以用前缀匹配。
+
+    Args:
+        text: 文本
+
+    Returns:
+        list: 索引词列表，保持原文顺序
+    """
+    tokens = []
+    for run in _runs(text or ''):
+        if run.isascii():
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+    return tokens
+
+
+def index_text(article):
+    """文章的索引文本：标题、摘要和来源的索引词，以空格分隔"""
+    return ' '.join(tokenize(' '.join((
+        article.get('title', ''),
+        article.get('summary', ''),
+        article.get('source', ''),
+    ))))
+
+
+def match_query(query):
+    """把用户输入转为 SQLite FTS 查询，所有词都要匹配
+
+    中文词按二元组短语匹配，单字和英文单词按前缀匹配。
+
+    Returns:
+        str: MATCH 表达式，查询中没有可搜索的词时返回 None
+    """
+    terms = []
+    for run in _runs(query or ''):
+        if run.isascii() or len(run) == 1:
+            terms.append(f'"{run}"*')
+        else:
+            terms.append('"' + ' '.join(run[i:i + 2] for i in range(len(run) - 1)) + '"')
+    return ' AND '.join(terms) or None
+
+
+def matches(article, query):
+    """文章是否匹配查询（不使用索引，用于少量文章的过滤）"""
+    runs = _runs(query or '')
+    if not runs:
+        return False
+    text = ' '.join((
+        article.get('title', ''),
+        article.get('summary', ''),
+        article.get('source', ''),
+    )).lower()
+    return all(run in text for run in runs)